@@ -0,0 +1,114 @@
+"""
+Общий headless-браузер (Playwright, Firefox) для бэкендов, которым нужен рендер.
+
+Браузер запускается один раз на процесс в том же фоновом event loop, что и
+_http, и переиспользуется всеми секциями: на каждую страницу — свой контекст.
+Картинки, шрифты, медиа и сторонние скрипты отбрасываются ещё на уровне
+маршрутизации, а готовность страницы определяется по селектору ссылок на статьи,
+а не по domcontentloaded.
+"""
+from __future__ import annotations
+import asyncio
+import atexit
+import time
+from urllib.parse import urlsplit
+
+import _http
+import _metrics
+
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media", "imageset", "texttrack"}
+DEFAULT_TIMEOUT_MS = 30000
+
+_playwright = None
+_browser = None
+_launch_lock = None  # asyncio.Lock, создаётся внутри loop
+
+def _site(host: str) -> str:
+    """washingtonpost.com для www.washingtonpost.com и подобных."""
+    return ".".join(host.split(".")[-2:])
+
+async def _ensure_browser() -> bool:
+    """Запускает браузер, если его ещё нет; True — если запуск был сейчас."""
+    global _playwright, _browser, _launch_lock
+    if _launch_lock is None:
+        _launch_lock = asyncio.Lock()
+    async with _launch_lock:
+        if _browser is not None and _browser.is_connected():
+            return False
+        from playwright.async_api import async_playwright
+        if _playwright is None:
+            _playwright = await async_playwright().start()
+        _browser = await _playwright.firefox.launch(headless=True)
+        return True
+
+async def _arender(url: str, wait_for: str | None, timeout_ms: int) -> tuple[str, dict]:
+    launched = await _ensure_browser()
+    site = _site(urlsplit(url).hostname or "")
+    stats = {"browser.launches": int(launched), "browser.pages": 1,
+             "browser.requests": 0, "browser.blocked": 0, "browser.bytes": 0}
+
+    async def route(r):
+        req = r.request
+        host = urlsplit(req.url).hostname or ""
+        third_party = _site(host) != site
+        if req.resource_type in BLOCKED_RESOURCE_TYPES or (req.resource_type == "script" and third_party):
+            stats["browser.blocked"] += 1
+            await r.abort()
+        else:
+            stats["browser.requests"] += 1
+            await r.continue_()
+
+    def on_response(resp):
+        try:
+            stats["browser.bytes"] += int(resp.headers.get("content-length") or 0)
+        except ValueError:
+            pass
+
+    context = await _browser.new_context()
+    try:
+        await context.route("**/*", route)
+        page = await context.new_page()
+        page.on("response", on_response)
+        await page.goto(url, timeout=timeout_ms, wait_until="commit")
+        if wait_for:
+            try:
+                await page.wait_for_selector(wait_for, state="attached", timeout=timeout_ms)
+            except Exception:
+                stats["browser.wait_timeouts"] = 1
+        else:
+            await page.wait_for_load_state("domcontentloaded", timeout=timeout_ms)
+        html = await page.content()
+    finally:
+        await context.close()
+    return html, stats
+
+def render(url: str, wait_for: str | None = None, timeout_ms: int = DEFAULT_TIMEOUT_MS) -> str:
+    """
+    Открывает url в общем браузере и возвращает HTML, как только на странице
+    появится wait_for (CSS-селектор); если не появился за timeout_ms — то, что есть.
+    """
+    t0 = time.monotonic()
+    html, stats = _http.run(_arender(url, wait_for, timeout_ms))
+    for k, v in stats.items():
+        _metrics.incr(k, v)
+    _metrics.incr("browser.render_s", time.monotonic() - t0)
+    return html
+
+async def _aclose() -> None:
+    global _playwright, _browser
+    if _browser is not None:
+        await _browser.close()
+        _browser = None
+    if _playwright is not None:
+        await _playwright.stop()
+        _playwright = None
+
+def close() -> None:
+    if _browser is None and _playwright is None:
+        return
+    try:
+        _http.run(_aclose())
+    except Exception:
+        pass
+
+atexit.register(close)
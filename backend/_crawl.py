@@ -0,0 +1,201 @@
+"""
+Состояние обхода сайта между прогонами (.cache/crawl.sqlite).
+
+  frontier — URL, которые осталось скачать: новые ссылки с индексных страниц и
+             статьи, которые пора перепроверить. Строка удаляется, только когда
+             статья разобрана и сохранена, так что прерванный прогон (срок,
+             429, падение) продолжается со следующего с того же места;
+  seen     — индекс скачанных статей по каноническому URL: dateModified,
+             разобранная запись и когда её проверяли.
+
+Новая ссылка, которую не удалось скачать MAX_ATTEMPTS прогонов подряд,
+остаётся во фронтире надгробием (attempts >= MAX_ATTEMPTS): её больше не
+пробуют, а discover не ставит её заново, когда она снова попадётся на индексе.
+
+Ссылка, уже лежащая в seen, повторно не качается, пока не подойдёт срок
+перепроверки: RECHECK_FRACTION от возраста статьи (по dateModified, иначе
+datePublished), но не чаще RECHECK_MIN_S и не реже RECHECK_MAX_S — свежие
+статьи правят часто, архивные почти никогда (та же эвристика, что у
+HTTP-кэшей для Last-Modified). Статья считается изменившейся, только если
+сменился её dateModified; выходные файлы собираются из seen без сети.
+"""
+from __future__ import annotations
+import json
+import re
+import time
+from typing import Iterator
+from urllib.parse import urlsplit, urlunsplit
+
+import _dates
+import _store
+
+DB_NAME = "crawl.sqlite"
+MAX_ATTEMPTS = 5              # после стольких неудач подряд URL больше не пробуют
+RECHECK_FRACTION = 0.1
+RECHECK_MIN_S = 6 * 3600.0
+RECHECK_MAX_S = 30 * 86400.0
+
+# kind: 0 — новая ссылка, 1 — перепроверка (новые качаются первыми)
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS frontier (
+    site       TEXT NOT NULL,
+    url        TEXT NOT NULL,
+    kind       INTEGER NOT NULL,
+    added_at   REAL NOT NULL,
+    tried_at   REAL NOT NULL DEFAULT 0,
+    attempts   INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    PRIMARY KEY (site, url)
+);
+CREATE INDEX IF NOT EXISTS frontier_order ON frontier(site, kind, attempts, added_at);
+CREATE TABLE IF NOT EXISTS seen (
+    site          TEXT NOT NULL,
+    url           TEXT NOT NULL,
+    date_modified TEXT,
+    published     REAL NOT NULL,
+    item          TEXT NOT NULL,
+    first_seen    REAL NOT NULL,
+    checked_at    REAL NOT NULL,
+    recheck_at    REAL NOT NULL,
+    PRIMARY KEY (site, url)
+);
+CREATE INDEX IF NOT EXISTS seen_recheck ON seen(site, recheck_at);
+CREATE INDEX IF NOT EXISTS seen_published ON seen(site, published DESC);
+"""
+
+def _conn():
+    return _store.connect(DB_NAME, SCHEMA)
+
+def canonical_url(url: str) -> str:
+    """
+    Схема и хост в нижнем регистре, без #fragment и utm_-меток в query. Путь —
+    как его отдаёт сайт (схлопываются только //): по этому адресу статья и
+    качается, а добавленный или убранный слэш на конце может дать редирект или 404.
+    """
+    parts = urlsplit(url.strip())
+    path = re.sub(r"/{2,}", "/", parts.path) or "/"
+    query = "&".join(p for p in parts.query.split("&") if p and not p.lower().startswith("utm_"))
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, query, ""))
+
+def _ts(value: str | None) -> float | None:
+    d = _dates.parse(value) if value else None
+    return d.timestamp() if d else None
+
+def recheck_interval(item: dict, now: float) -> float:
+    changed = _ts(item.get("date_modified")) or _ts(item.get("date_published")) or now
+    return min(max((now - changed) * RECHECK_FRACTION, RECHECK_MIN_S), RECHECK_MAX_S)
+
+def discover(site: str, urls, now: float | None = None) -> int:
+    """
+    Ставит во фронтир ссылки, которых нет ни во фронтире (в том числе
+    надгробием), ни в seen. Возвращает, сколько новых.
+    """
+    now = time.time() if now is None else now
+    conn = _conn()
+    added = 0
+    conn.execute("BEGIN")
+    try:
+        for url in dict.fromkeys(canonical_url(u) for u in urls):
+            if conn.execute("SELECT 1 FROM seen WHERE site = ? AND url = ?", (site, url)).fetchone():
+                continue
+            added += conn.execute(
+                "INSERT OR IGNORE INTO frontier (site, url, kind, added_at) VALUES (?, ?, 0, ?)",
+                (site, url, now)).rowcount
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    return added
+
+def schedule_rechecks(site: str, now: float | None = None) -> int:
+    """Переносит во фронтир статьи, которым подошёл срок перепроверки."""
+    now = time.time() if now is None else now
+    return _conn().execute(
+        "INSERT OR IGNORE INTO frontier (site, url, kind, added_at) "
+        "SELECT site, url, 1, ? FROM seen WHERE site = ? AND recheck_at <= ?",
+        (now, site, now)).rowcount
+
+def next_batch(site: str, n: int, started: float) -> list[str]:
+    """До n URL, которые в этом прогоне (с момента started) ещё не пробовали."""
+    rows = _conn().execute(
+        "SELECT url FROM frontier WHERE site = ? AND tried_at < ? AND attempts < ? "
+        "ORDER BY kind, attempts, added_at LIMIT ?", (site, started, MAX_ATTEMPTS, n)).fetchall()
+    return [r[0] for r in rows]
+
+def done(site: str, url: str, item: dict, now: float | None = None) -> bool:
+    """
+    Сохраняет разобранную статью и снимает URL с фронтира в одной транзакции.
+    True — статья новая или сменился её dateModified; иначе сохранённая запись
+    (с прежним scraped_at) не трогается, сдвигается только срок перепроверки.
+    """
+    now = time.time() if now is None else now
+    conn = _conn()
+    conn.execute("BEGIN")
+    try:
+        row = conn.execute("SELECT date_modified, first_seen FROM seen WHERE site = ? AND url = ?",
+                           (site, url)).fetchone()
+        changed = row is None or row[0] != item.get("date_modified")
+        if changed:
+            published = _ts(item.get("date_published")) or (row[1] if row else now)
+            conn.execute(
+                "INSERT OR REPLACE INTO seen (site, url, date_modified, published, item, first_seen, "
+                "checked_at, recheck_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (site, url, item.get("date_modified"), published, json.dumps(item, ensure_ascii=False),
+                 row[1] if row else now, now, now + recheck_interval(item, now)))
+        else:
+            conn.execute("UPDATE seen SET checked_at = ?, recheck_at = ? WHERE site = ? AND url = ?",
+                         (now, now + recheck_interval(item, now), site, url))
+        conn.execute("DELETE FROM frontier WHERE site = ? AND url = ?", (site, url))
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    return changed
+
+def failed(site: str, url: str, error: str, now: float | None = None) -> bool:
+    """
+    Неудачная попытка; True — после MAX_ATTEMPTS неудач URL больше не пробуют.
+    Новая ссылка остаётся надгробием, перепроверка известной статьи снимается
+    с фронтира и переносится на следующий срок.
+    """
+    now = time.time() if now is None else now
+    conn = _conn()
+    conn.execute("BEGIN")
+    try:
+        conn.execute("UPDATE frontier SET attempts = attempts + 1, tried_at = ?, last_error = ? "
+                     "WHERE site = ? AND url = ?", (now, error[:200], site, url))
+        row = conn.execute("SELECT kind, attempts FROM frontier WHERE site = ? AND url = ?",
+                           (site, url)).fetchone()
+        dropped = row is not None and row[1] >= MAX_ATTEMPTS
+        if dropped and row[0] == 1:
+            conn.execute("DELETE FROM frontier WHERE site = ? AND url = ?", (site, url))
+            conn.execute("UPDATE seen SET recheck_at = ? + (recheck_at - checked_at) WHERE site = ? AND url = ?",
+                         (now, site, url))
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    return dropped
+
+def items(site: str, limit: int | None = None) -> Iterator[dict]:
+    """Сохранённые статьи, от новых к старым; читаются по одной."""
+    cur = _conn().execute("SELECT item FROM seen WHERE site = ? ORDER BY published DESC, url LIMIT ?",
+                          (site, -1 if limit is None else limit))
+    for (item,) in cur:
+        yield json.loads(item)
+
+def last_changed(site: str, limit: int | None = None) -> float | None:
+    """Самый поздний dateModified (иначе datePublished) среди limit самых свежих статей."""
+    rows = _conn().execute("SELECT date_modified, published FROM seen WHERE site = ? "
+                           "ORDER BY published DESC, url LIMIT ?", (site, -1 if limit is None else limit))
+    return max((_ts(dm) or published for dm, published in rows), default=None)
+
+def stats(site: str) -> dict:
+    conn = _conn()
+    return {
+        "frontier": conn.execute("SELECT COUNT(*) FROM frontier WHERE site = ? AND attempts < ?",
+                                 (site, MAX_ATTEMPTS)).fetchone()[0],
+        "dropped": conn.execute("SELECT COUNT(*) FROM frontier WHERE site = ? AND attempts >= ?",
+                                (site, MAX_ATTEMPTS)).fetchone()[0],
+        "seen": conn.execute("SELECT COUNT(*) FROM seen WHERE site = ?", (site,)).fetchone()[0],
+    }
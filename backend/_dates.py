@@ -0,0 +1,164 @@
+"""
+Разбор дат для всех бэкендов.
+
+Форматы, которые встречаются на сайтах:
+
+  • ISO 8601: '2025-07-22T13:30:00Z', '2025-07-20T10:00:00-04:00', '2025-07-22'
+    (Atlantic, Pitchfork, JSON-LD);
+  • месяц словом: 'July 21, 2025', 'Feb. 26, 2024', 'Sept. 3, 2025',
+    'Mar 25, 2025 6:00 AM' (GQ, New Yorker, Vulture, WIRED);
+  • 'MM.DD.YYYY HH:MM AM' (WIRED);
+  • по-русски: '11 июля, 2025, 17:21';
+  • дата в URL: /2025/07/21/ и 2025-07-21 (NYT, WaPo), /07/21/2025/ (Semafor).
+
+ISO 8601 разбирает datetime.fromisoformat (на C); остальные форматы —
+заранее скомпилированные регулярные выражения, без перебора strptime с
+исключениями; неверные числа (31 февраля, 13-й месяц) отсекаются проверкой, а
+не ValueError. Результат parse() запоминается (lru_cache): на индексах одни и
+те же строки дат повторяются из прогона в прогон и внутри страницы.
+
+Если дату получить не удалось и бэкенд подставляет datetime.now(), это
+учитывается в _metrics (dates.fallback_now.<источник>) и попадает в отчёт
+generate.py — такие записи будут «прыгать» наверх ленты.
+"""
+from __future__ import annotations
+import calendar
+import re
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+
+import _metrics
+
+MONTHS_EN = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12,
+}
+MONTHS_RU = {
+    'января': 1, 'февраля': 2, 'марта': 3, 'апреля': 4, 'мая': 5, 'июня': 6,
+    'июля': 7, 'августа': 8, 'сентября': 9, 'октября': 10, 'ноября': 11, 'декабря': 12,
+}
+
+_ISO_RE = re.compile(
+    r"(\d{4})-(\d{2})-(\d{2})"
+    r"(?:[T ](\d{2}):(\d{2})(?::(\d{2})(?:[.,]\d+)?)?)?"
+    r"\s*(Z|[+-]\d{2}(?::?\d{2})?)?$", re.I)
+_EN_RE = re.compile(
+    r"([A-Za-z]+)\.?\s+(\d{1,2}),?\s+(\d{4})"
+    r"(?:,?\s+(\d{1,2}):(\d{2})\s*([AaPp]\.?[Mm]\.?)?)?")
+_DOTTED_RE = re.compile(r"(\d{2})\.(\d{2})\.(\d{4})(?:\s+(\d{1,2}):(\d{2})\s*([AaPp][Mm])?)?")
+_RU_RE = re.compile(r"(\d{1,2})\s+([а-яА-ЯёЁ]+)[,]?\s*(\d{4})[,]?\s*(\d{1,2})?:?(\d{2})?")
+
+_URL_RES = {
+    "ymd": re.compile(r"(\d{4})[/-](\d{2})[/-](\d{2})"),
+    "mdy": re.compile(r"/(\d{2})/(\d{2})/(\d{4})/"),
+}
+
+_DAYS_IN_MONTH = (0, 31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+def _build(year: int, month: int | None, day: int, hour: int = 0, minute: int = 0, second: int = 0,
+           tz: timezone = timezone.utc) -> datetime | None:
+    if not month or not 1 <= month <= 12 or not 1 <= year <= 9999:
+        return None
+    if not 1 <= day <= _DAYS_IN_MONTH[month] or (month == 2 and day == 29 and not calendar.isleap(year)):
+        return None
+    if not (0 <= hour <= 23 and 0 <= minute <= 59 and 0 <= second <= 59):
+        return None
+    return datetime(year, month, day, hour, minute, second, tzinfo=tz)
+
+def _hour12(hour: int, ampm: str | None) -> int:
+    if not ampm:
+        return hour
+    pm = ampm[0] in "pP"
+    if hour == 12:
+        return 12 if pm else 0
+    return hour + 12 if pm else hour
+
+def _tz(spec: str | None) -> timezone | None:
+    if not spec or spec in "Zz":
+        return timezone.utc
+    sign = -1 if spec[0] == "-" else 1
+    digits = spec[1:].replace(":", "")
+    hours, minutes = int(digits[:2]), int(digits[2:4] or 0)
+    if hours > 23 or minutes > 59:
+        return None
+    return timezone(sign * timedelta(hours=hours, minutes=minutes))
+
+@lru_cache(maxsize=4096)
+def parse(text: str, default_hour: int = 0) -> datetime | None:
+    """
+    Дата из строки с сайта (см. форматы в описании модуля); None, если формат
+    не распознан. Без часового пояса — UTC, без времени — default_hour:00.
+    """
+    s = text.strip()
+    if not s:
+        return None
+    head = s[0]
+    if head.isdigit():
+        if len(s) >= 10 and s[4] == "-" and s[7] == "-":
+            # обычный случай — строгий ISO из JSON-LD и <time datetime>; прочее (пробел
+            # перед поясом, 31 февраля) fromisoformat не примет, и решит _ISO_RE
+            try:
+                d = datetime.fromisoformat(s)
+            except ValueError:
+                d = None
+            if d is not None:
+                if d.tzinfo is None or d.microsecond or len(s) == 10:
+                    d = d.replace(hour=default_hour if len(s) == 10 else d.hour, microsecond=0,
+                                  tzinfo=d.tzinfo or timezone.utc)
+                return d
+        m = _ISO_RE.match(s)
+        if m:
+            y, mo, d, hh, mi, ss, tz = m.groups()
+            zone = _tz(tz)
+            if zone is None:
+                return None
+            if hh is None:
+                return _build(int(y), int(mo), int(d), default_hour, tz=zone)
+            return _build(int(y), int(mo), int(d), int(hh), int(mi), int(ss or 0), tz=zone)
+        m = _DOTTED_RE.match(s)
+        if m:
+            mo, d, y, hh, mi, ampm = m.groups()
+            if hh is None:
+                return _build(int(y), int(mo), int(d), default_hour)
+            return _build(int(y), int(mo), int(d), _hour12(int(hh), ampm), int(mi))
+        m = _RU_RE.match(s)
+        if m:
+            d, month, y, hh, mi = m.groups()
+            return _build(int(y), MONTHS_RU.get(month.lower()), int(d),
+                          int(hh) if hh else default_hour, int(mi or 0))
+        return None
+    m = _EN_RE.match(s)
+    if m:
+        month, d, y, hh, mi, ampm = m.groups()
+        mo = MONTHS_EN.get(month[:3].lower())
+        if hh is None:
+            return _build(int(y), mo, int(d), default_hour)
+        return _build(int(y), mo, int(d), _hour12(int(hh), ampm), int(mi))
+    return None
+
+def from_url(url: str, order: str = "ymd", hour: int = 12) -> datetime | None:
+    """Дата из URL статьи: order='ymd' — /2025/07/21/ или 2025-07-21, 'mdy' — /07/21/2025/."""
+    m = _URL_RES[order].search(url)
+    if not m:
+        return None
+    a, b, c = map(int, m.groups())
+    if order == "mdy":
+        return _build(c, a, b, hour)
+    return _build(a, b, c, hour)
+
+def now(source: str) -> datetime:
+    """datetime.now(UTC) вместо неизвестной даты — с учётом в отчёте (dates.fallback_now.<source>)."""
+    _metrics.incr(f"dates.fallback_now.{source}")
+    return datetime.now(timezone.utc)
+
+def parse_or_now(text: str | None, source: str, default_hour: int = 0) -> datetime:
+    """parse(), а если даты нет или она не разобралась — now(source)."""
+    if text:
+        d = parse(text, default_hour)
+        if d is not None:
+            return d
+        print(f"[WARN] Не удалось распарсить дату: '{text.strip()}'")
+    return now(source)
+
+def from_url_or_now(url: str, source: str, order: str = "ymd") -> datetime:
+    return from_url(url, order) or now(source)
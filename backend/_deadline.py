@@ -0,0 +1,64 @@
+"""
+Срок выполнения бэкенда.
+
+generate.py открывает для каждого in-process бэкенда область со сроком
+(scope); скрипту в отдельном процессе срок передаётся в PARSER_DEADLINE
+(секунды эпохи). Ожидания в общих модулях не выходят за срок: _http.run (а
+через него и браузер) ждёт не дольше оставшегося времени, после срока сетевые
+вызовы и запись лент бросают DeadlineExceeded. Так зависшая навигация не
+держит весь прогон, а опоздавший бэкенд не затирает прежнюю ленту неполной.
+"""
+from __future__ import annotations
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import _metrics
+
+DEADLINE_ENV = "PARSER_DEADLINE"
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+def _from_env() -> float | None:
+    try:
+        return float(os.environ[DEADLINE_ENV])
+    except (KeyError, ValueError):
+        return None
+
+_process_deadline = _from_env()
+_current: ContextVar[float | None] = ContextVar("parser_deadline", default=None)
+
+@contextmanager
+def scope(seconds: float | None):
+    """Срок для кода внутри with: через seconds секунд; None — без срока."""
+    token = _current.set(None if seconds is None else time.time() + seconds)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+def deadline() -> float | None:
+    """Срок (секунды эпохи) текущего бэкенда; None — не задан."""
+    return _current.get() or _process_deadline
+
+def remaining(cap: float | None = None) -> float | None:
+    """
+    Сколько секунд осталось (не больше cap); None — срока нет и cap не задан.
+    Если срок уже вышел — DeadlineExceeded.
+    """
+    d = deadline()
+    if d is None:
+        return cap
+    left = d - time.time()
+    if left <= 0:
+        expired()
+    return left if cap is None else min(cap, left)
+
+def check() -> None:
+    remaining()
+
+def expired() -> None:
+    _metrics.incr("deadline.exceeded")
+    raise DeadlineExceeded("Срок выполнения бэкенда истёк")
@@ -0,0 +1,89 @@
+"""
+Постоянный кэш метаданных статей (URL → dict), общий для бэкендов.
+
+wired и pitchfork ходят на страницу каждой статьи ради одного <time>; дата
+публикации не меняется, поэтому достаточно сходить один раз. Записи живут
+PARSER_DETAILS_TTL_DAYS (по умолчанию 90 дней) и не больше
+PARSER_DETAILS_MAX_ROWS штук (по умолчанию 5000, вытесняются давно
+использованные).
+"""
+from __future__ import annotations
+import json
+import os
+import time
+from typing import Callable, Iterable
+
+import _metrics
+import _store
+
+DB_NAME = "details.sqlite"
+TTL_S = float(os.environ.get("PARSER_DETAILS_TTL_DAYS", "90")) * 86400
+MAX_ROWS = int(os.environ.get("PARSER_DETAILS_MAX_ROWS", "5000"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS details (
+    url       TEXT PRIMARY KEY,
+    data      TEXT NOT NULL,
+    stored_at REAL NOT NULL,
+    used_at   REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS details_used_at ON details(used_at);
+"""
+
+def _conn():
+    return _store.connect(DB_NAME, SCHEMA)
+
+def get(url: str) -> dict | None:
+    conn = _conn()
+    row = conn.execute("SELECT data, stored_at FROM details WHERE url = ?", (url,)).fetchone()
+    if row is None or time.time() - row[1] > TTL_S:
+        return None
+    conn.execute("UPDATE details SET used_at = ? WHERE url = ?", (time.time(), url))
+    return json.loads(row[0])
+
+def put(url: str, data: dict) -> None:
+    now = time.time()
+    _conn().execute(
+        "INSERT OR REPLACE INTO details (url, data, stored_at, used_at) VALUES (?, ?, ?, ?)",
+        (url, json.dumps(data, ensure_ascii=False), now, now),
+    )
+
+def prune() -> int:
+    """Удаляет просроченные записи и всё сверх MAX_ROWS (по давности использования)."""
+    conn = _conn()
+    removed = conn.execute("DELETE FROM details WHERE stored_at < ?", (time.time() - TTL_S,)).rowcount
+    removed += conn.execute(
+        "DELETE FROM details WHERE url IN ("
+        "  SELECT url FROM details ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+        (MAX_ROWS,),
+    ).rowcount
+    if removed:
+        _metrics.incr("details.evictions", removed)
+    return removed
+
+def lookup_many(urls: Iterable[str], fetch: Callable[[list[str]], dict[str, dict | None]]) -> dict[str, dict | None]:
+    """
+    Возвращает {url: data} для всех urls. Из сети (через fetch) запрашиваются
+    только те, которых нет в кэше; fetch получает список и возвращает
+    {url: data | None}. None не кэшируется — такая статья будет запрошена снова.
+    """
+    urls = list(dict.fromkeys(urls))
+    result: dict[str, dict | None] = {}
+    missing = []
+    for url in urls:
+        data = get(url)
+        if data is None:
+            missing.append(url)
+        else:
+            result[url] = data
+    _metrics.incr("details.hits", len(result))
+    _metrics.incr("details.misses", len(missing))
+    if missing:
+        fetched = fetch(missing)
+        for url in missing:
+            data = fetched.get(url)
+            result[url] = data
+            if data is not None:
+                put(url, data)
+        prune()
+    return result
@@ -0,0 +1,116 @@
+"""
+Декларативное извлечение полей из карточек на индексной странице.
+
+Бэкенд описывает сайт один раз — селектор карточки и селекторы полей:
+
+    SPEC = _extract.Spec("div.SummaryItemWrapper-ircKXK", {
+        "title": "a.SummaryItemHedLink-cxRzVg",         # текст (get_text(strip=True))
+        "link":  "a.SummaryItemHedLink-cxRzVg@href",    # значение атрибута
+        "image": "img.responsive-image__image@src",
+    })
+    for row in SPEC.extract(soup):                      # {"title": ..., "link": ..., "image": ...}
+
+Селекторы компилируются один раз при создании Spec: простые (тег, .class,
+[attr=value] — см. _parse.simple_parts) и цепочки простых через пробел
+превращаются в проверку атрибутов тега и его предков, остальные — в
+soupsieve.compile(). Поля карточки достаются за один обход её
+поддерева: каждый тег проверяется только теми селекторами, что ещё не нашли
+совпадение, и обход останавливается, когда найдены все. Результат тот же, что
+у select_one() по каждому полю: первое совпадение в порядке документа, None —
+если его нет.
+"""
+from __future__ import annotations
+from typing import Callable, Iterator
+
+import soupsieve
+from bs4 import BeautifulSoup, Tag
+
+import _parse
+
+def _simple_matcher(parts) -> Callable[[Tag], bool]:
+    name, classes, attrs = parts
+
+    def match(tag: Tag) -> bool:
+        if name is not None and tag.name != name:
+            return False
+        if classes:
+            have = tag.get("class") or ()
+            if any(c not in have for c in classes):
+                return False
+        for attr, value in attrs.items():
+            v = tag.get(attr)
+            if v is None or (value is not True and v != value):
+                return False
+        return True
+    return match
+
+def matcher(selector: str) -> Callable[[Tag], bool]:
+    """Предикат «тег подходит под селектор» (как soupsieve.match, но быстрее для простых)."""
+    steps = [_parse.simple_parts(part) for part in selector.split()]
+    if not steps or any(p is None for p in steps):
+        return soupsieve.compile(selector).match
+    *ancestors, last = [_simple_matcher(p) for p in steps]
+    if not ancestors:
+        return last
+
+    # Только комбинатор-пробел («потомок»): предков проверяем справа налево
+    def match(tag: Tag) -> bool:
+        if not last(tag):
+            return False
+        pending = len(ancestors) - 1
+        parent = tag.parent
+        while parent is not None and pending >= 0:
+            if isinstance(parent, Tag) and ancestors[pending](parent):
+                pending -= 1
+            parent = parent.parent
+        return pending < 0
+    return match
+
+class Spec:
+    """Описание карточек сайта: item — селектор карточки, fields — {поле: "селектор[@атрибут]"}."""
+
+    def __init__(self, item: str, fields: dict[str, str]):
+        self.item = item
+        self._item_selector = soupsieve.compile(item)
+        # Поля с одинаковым селектором (текст и href одной ссылки) ищутся один раз
+        self._selectors: list[str] = []
+        self._fields: list[tuple[str, int, str | None]] = []
+        for field, spec in fields.items():
+            selector, _, attr = spec.partition("@")
+            selector = selector.strip()
+            if selector not in self._selectors:
+                self._selectors.append(selector)
+            self._fields.append((field, self._selectors.index(selector), attr.strip() or None))
+        self._matchers = [matcher(s) for s in self._selectors]
+
+    def items(self, soup: BeautifulSoup | Tag) -> list[Tag]:
+        return self._item_selector.select(soup)
+
+    def extract_item(self, item: Tag) -> dict[str, str | None]:
+        found: list[Tag | None] = [None] * len(self._matchers)
+        pending = list(range(len(self._matchers)))
+        for tag in item.descendants:
+            if not isinstance(tag, Tag):
+                continue
+            for i in pending:
+                if self._matchers[i](tag):
+                    found[i] = tag
+            if any(found[i] is not None for i in pending):
+                pending = [i for i in pending if found[i] is None]
+                if not pending:
+                    break
+        row: dict[str, str | None] = {}
+        for field, i, attr in self._fields:
+            tag = found[i]
+            if tag is None:
+                row[field] = None
+            elif attr is None:
+                row[field] = tag.get_text(strip=True)
+            else:
+                value = tag.get(attr)
+                row[field] = " ".join(value) if isinstance(value, list) else value
+        return row
+
+    def extract(self, soup: BeautifulSoup | Tag) -> Iterator[dict[str, str | None]]:
+        for item in self.items(soup):
+            yield self.extract_item(item)
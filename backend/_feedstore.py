@@ -0,0 +1,265 @@
+"""
+Постоянное хранилище элементов лент и инкрементальная сборка RSS.
+
+Feed повторяет ту часть API FeedGenerator, которой пользуются бэкенды
+(title/link/description/language/id, add_entry(), rss_file()), но элементы
+не собираются в дерево заново на каждом прогоне. Вызовы на записи
+(fe.title(...), fe.pubDate(...) и т. д.) запоминаются, и при rss_file():
+
+  • запись ищется в .cache/feeds.sqlite по guid (fe.id или ссылка);
+  • если вызовы не изменились — только отмечается, что запись ещё на странице;
+  • новая или изменившаяся запись один раз прогоняется через feedgen, и готовый
+    <item> сохраняется в хранилище;
+  • файл ленты собирается из сохранённых <item> последних window записей.
+
+Так сериализация стоит пропорционально числу новых записей, а записи, ушедшие
+со страницы, остаются в ленте (и в истории) до вытеснения окном.
+Размер окна — аргумент Feed(window=...) или PARSER_FEED_WINDOW (по умолчанию 50).
+"""
+from __future__ import annotations
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from feedgen.entry import FeedEntry
+from feedgen.feed import FeedGenerator
+from lxml import etree
+
+import _deadline
+import _httpcache
+import _metrics
+import _store
+
+DB_NAME = "feeds.sqlite"
+DEFAULT_WINDOW = int(os.environ.get("PARSER_FEED_WINDOW", "50"))
+# Дата не входит в хэш записи: многие бэкенды подставляют datetime.now(), если на
+# странице её нет, и иначе каждая запись «менялась» бы на каждом прогоне.
+# Дата фиксируется при первом появлении записи.
+DATE_CALLS = ("pubDate", "published")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS feed_items (
+    feed       TEXT NOT NULL,
+    guid       TEXT NOT NULL,
+    hash       TEXT NOT NULL,
+    calls      TEXT NOT NULL,
+    xml        TEXT NOT NULL,
+    published  REAL NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen  REAL NOT NULL,
+    PRIMARY KEY (feed, guid)
+);
+CREATE INDEX IF NOT EXISTS feed_items_order ON feed_items(feed, published DESC, first_seen DESC);
+CREATE TABLE IF NOT EXISTS feed_meta (
+    feed       TEXT PRIMARY KEY,
+    changed_at REAL NOT NULL
+);
+"""
+
+# Пространства имён, которые feedgen объявляет на <rss>; в сохранённых <item> они лишние
+_ROOT_NSMAP = {"atom": "http://www.w3.org/2005/Atom", "content": "http://purl.org/rss/1.0/modules/content/"}
+_ROOT_NS_RE = re.compile("|".join(f' xmlns:{p}="{re.escape(u)}"' for p, u in _ROOT_NSMAP.items()))
+
+def _conn():
+    return _store.connect(DB_NAME, SCHEMA)
+
+def _as_datetime(value):
+    # в calls даты лежат как str(datetime); строки в формате RFC 822 feedgen примет и так
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return value
+
+class Entry:
+    """Запись ленты: запоминает вызовы в стиле FeedEntry, чтобы сравнивать их между прогонами."""
+
+    _METHODS = ("id", "guid", "title", "link", "description", "content", "author",
+                "category", "enclosure", "pubDate", "published", "updated", "comments", "source")
+
+    def __init__(self):
+        self.calls: list[tuple[str, tuple, dict]] = []
+
+    def __getattr__(self, name):
+        if name not in Entry._METHODS:
+            raise AttributeError(name)
+
+        def record(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+            return self
+        return record
+
+    def _first(self, name):
+        for n, args, kwargs in self.calls:
+            if n == name:
+                return args, kwargs
+        return None
+
+    # Не guid()/published(): эти имена — вызовы FeedEntry, их нужно записывать
+    def key(self) -> str | None:
+        for name in ("id", "guid"):
+            found = self._first(name)
+            if found and found[0]:
+                return str(found[0][0])
+        found = self._first("link")
+        if found:
+            args, kwargs = found
+            return kwargs.get("href") or (args[0] if args else None)
+        return None
+
+    def published_ts(self) -> float | None:
+        for name in DATE_CALLS:
+            found = self._first(name)
+            if found and found[0] and isinstance(found[0][0], datetime):
+                return found[0][0].timestamp()
+        return None
+
+    def serialize(self) -> str:
+        return json.dumps(self.calls, default=str, sort_keys=True, ensure_ascii=False)
+
+    def digest(self) -> str:
+        """Хэш содержимого без даты: см. DATE_CALLS."""
+        calls = [c for c in self.calls if c[0] not in DATE_CALLS]
+        data = json.dumps(calls, default=str, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+    def keep_dates(self, stored_calls: str) -> None:
+        """Подставляет даты из сохранённой версии записи вместо сегодняшних."""
+        dates = [(n, [_as_datetime(a) for a in args], kwargs)
+                 for n, args, kwargs in json.loads(stored_calls) if n in DATE_CALLS]
+        if dates:
+            self.calls = [c for c in self.calls if c[0] not in DATE_CALLS] + [tuple(d) for d in dates]
+
+    def render(self) -> str:
+        """<item> так, как его вывел бы FeedGenerator."""
+        fe = FeedEntry()
+        for name, args, kwargs in self.calls:
+            getattr(fe, name)(*args, **kwargs)
+        item = fe.rss_entry()
+        # Под корнем с теми же префиксами, что у feedgen, иначе lxml выведет ns0:encoded
+        etree.Element("rss", nsmap=_ROOT_NSMAP).append(item)
+        xml = etree.tostring(item, encoding="unicode")
+        head, sep, rest = xml.partition(">")
+        return _ROOT_NS_RE.sub("", head) + sep + rest
+
+class Feed:
+    """Лента с постоянным хранилищем записей; см. описание модуля."""
+
+    def __init__(self, name: str, window: int | None = None):
+        self.name = name
+        self.window = window or DEFAULT_WINDOW
+        self._fg = FeedGenerator()
+        self._entries: list[Entry] = []
+
+    # Поля канала — как у FeedGenerator
+    def __getattr__(self, name):
+        if name in ("id", "title", "link", "description", "language", "subtitle", "lastBuildDate"):
+            return getattr(self._fg, name)
+        raise AttributeError(name)
+
+    def add_entry(self) -> Entry:
+        entry = Entry()
+        self._entries.append(entry)
+        return entry
+
+    def upsert(self) -> dict[str, int]:
+        """Сохраняет записи текущего прогона; возвращает счётчики new/changed/unchanged."""
+        conn = _conn()
+        now = time.time()
+        stats = {"new": 0, "changed": 0, "unchanged": 0}
+        conn.execute("BEGIN")
+        try:
+            for entry in self._entries:
+                key = entry.key()
+                if not key:
+                    continue
+                digest = entry.digest()
+                row = conn.execute("SELECT hash, calls FROM feed_items WHERE feed = ? AND guid = ?",
+                                   (self.name, key)).fetchone()
+                if row is not None and row[0] == digest:
+                    conn.execute("UPDATE feed_items SET last_seen = ? WHERE feed = ? AND guid = ?",
+                                 (now, self.name, key))
+                    stats["unchanged"] += 1
+                    continue
+                if row is None:
+                    conn.execute(
+                        "INSERT INTO feed_items (feed, guid, hash, calls, xml, published, first_seen, last_seen) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (self.name, key, digest, entry.serialize(), entry.render(),
+                         entry.published_ts() or now, now, now),
+                    )
+                    stats["new"] += 1
+                else:
+                    entry.keep_dates(row[1])
+                    conn.execute(
+                        "UPDATE feed_items SET hash = ?, calls = ?, xml = ?, last_seen = ? "
+                        "WHERE feed = ? AND guid = ?",
+                        (digest, entry.serialize(), entry.render(), now, self.name, key),
+                    )
+                    stats["changed"] += 1
+            if stats["new"] or stats["changed"]:
+                conn.execute("INSERT OR REPLACE INTO feed_meta (feed, changed_at) VALUES (?, ?)",
+                             (self.name, now))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        for k, v in stats.items():
+            _metrics.incr(f"feedstore.{k}", v)
+        _metrics.incr("items.changed", stats["new"] + stats["changed"])  # для _schedule
+        return stats
+
+    def items_xml(self) -> list[str]:
+        rows = _conn().execute(
+            "SELECT xml FROM feed_items WHERE feed = ? ORDER BY published DESC, first_seen DESC LIMIT ?",
+            (self.name, self.window),
+        ).fetchall()
+        return [r[0] for r in rows]
+
+    def changed_at(self) -> datetime | None:
+        """Когда в ленте последний раз появилась новая или изменённая запись."""
+        row = _conn().execute("SELECT changed_at FROM feed_meta WHERE feed = ?", (self.name,)).fetchone()
+        return datetime.fromtimestamp(row[0], timezone.utc) if row else None
+
+    def rss_bytes(self, encoding: str = "UTF-8") -> bytes:
+        """
+        Документ ленты: канал от FeedGenerator и сохранённые <item> из окна.
+        lastBuildDate — время последнего изменения записей, а не текущее: без
+        изменений файл выходит байт в байт тем же, и generate.py его не трогает.
+        """
+        changed_at = self.changed_at()
+        if changed_at is not None:
+            self._fg.lastBuildDate(changed_at)
+        doc = self._fg.rss_str(pretty=False, encoding=encoding, xml_declaration=True)
+        items = self.items_xml()
+        _metrics.incr("feedstore.items_written", len(items))
+        items = "".join(items).encode(encoding)
+        head, sep, tail = doc.rpartition(b"</channel>")
+        if not sep:
+            # пустой канал feedgen выводит как <channel>...</channel> всегда, но на всякий случай
+            raise ValueError("Unexpected feedgen output: no </channel>")
+        return head + items + sep + tail
+
+    def rss_file(self, filename: str, encoding: str = "UTF-8") -> str:
+        """Сохраняет записи прогона и атомарно перезаписывает файл ленты."""
+        _deadline.check()  # опоздавший бэкенд не подменяет прежнюю ленту
+        _metrics.incr("items.produced", len(self._entries))
+        with _metrics.phase("render"):
+            self.upsert()
+            data = self.rss_bytes(encoding=encoding)
+        directory = os.path.dirname(os.path.abspath(filename))
+        with _metrics.phase("write"):
+            fd, tmp = tempfile.mkstemp(dir=directory, prefix=".feed_", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp, filename)
+            except BaseException:
+                if os.path.exists(tmp):
+                    os.unlink(tmp)
+                raise
+        _httpcache.written(filename)
+        return filename
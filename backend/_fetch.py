@@ -0,0 +1,255 @@
+"""
+Ступенчатая загрузка страниц: обычный HTTP → cloudscraper → headless-браузер.
+
+Начинаем с самого дешёвого способа и переходим к следующему, только если ответ
+похож на блокировку (403/429/503, страница-челлендж) или в нём нет ожидаемой
+разметки (expect). Какой способ сработал для хоста в последний раз, хранится в
+.cache/fetch_tiers.sqlite — следующий прогон начинает сразу с него. Раз в
+PARSER_TIER_RETRY_HOURS (по умолчанию 24 ч) снова пробуем с самого дешёвого,
+чтобы не застрять на браузере навсегда.
+
+Результат любого способа — httpx.Response, так что бэкенду всё равно, чем
+страница была получена (extensions["tier"] подскажет).
+
+В пределах одного прогона (new_run() — начало прогона) одинаковые загрузки
+объединяются по нормализованному URL: nyt и nytmag читают одну и ту же
+страницу, и в сеть она уходит один раз, даже если бэкенды идут параллельно.
+parsed() так же делит между ними разобранное дерево. Счётчики: fetch.requests —
+все вызовы fetch(), fetch.coalesced — сколько из них обошлись без сети,
+parse.shared — сколько разборов сэкономлено.
+"""
+from __future__ import annotations
+import os
+import re
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import httpx
+
+import _deadline
+import _http
+import _metrics
+import _parse
+import _store
+
+TIERS = ("http", "cloudscraper", "browser")
+DB_NAME = "fetch_tiers.sqlite"
+RETRY_CHEAPER_S = float(os.environ.get("PARSER_TIER_RETRY_HOURS", "24")) * 3600
+BLOCKED_STATUSES = {401, 403, 429, 503}
+CHALLENGE_RE = re.compile(
+    r"cf-chl-|challenge-platform|Just a moment\.\.\.|Attention Required!|px-captcha|"
+    r"captcha-delivery|Access Denied|Please enable JS and disable any ad blocker",
+    re.I,
+)
+MIN_LENGTH = 2048
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS host_tiers (
+    host       TEXT PRIMARY KEY,
+    tier       TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+class FetchBlocked(Exception):
+    """Ни один способ не вернул нормальную страницу."""
+
+_scraper = None
+_scraper_lock = threading.Lock()
+
+# Загрузки и разобранные деревья текущего прогона: ключ → Future (см. _shared)
+_run_lock = threading.Lock()
+_run_fetches: dict[str, Future] = {}
+_run_soups: dict[tuple, Future] = {}
+
+def new_run() -> None:
+    """Начало прогона: забываем страницы, загруженные в предыдущем."""
+    with _run_lock:
+        _run_fetches.clear()
+        _run_soups.clear()
+
+def normalize_url(url: str) -> str:
+    """Ключ для объединения загрузок: регистр схемы и хоста, порт по умолчанию, порядок параметров, #фрагмент."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and (scheme, parts.port) not in (("http", 80), ("https", 443)):
+        host = f"{host}:{parts.port}"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, parts.path or "/", query, ""))
+
+def _shared(cache: dict, key, make):
+    """
+    make() один раз на ключ за прогон; параллельные вызовы с тем же ключом ждут
+    первого. Возвращает (значение, True если оно уже было). Ошибка отдаётся тем,
+    кто ждал, но не запоминается — следующий вызов попробует снова.
+    """
+    with _run_lock:
+        fut = cache.get(key)
+        owner = fut is None
+        if owner:
+            fut = cache[key] = Future()
+    if not owner:
+        try:
+            return fut.result(timeout=_deadline.remaining()), True
+        except FutureTimeout:
+            if fut.done():
+                raise
+            _deadline.expired()
+    try:
+        value = make()
+    except BaseException as e:
+        with _run_lock:
+            cache.pop(key, None)
+        fut.set_exception(e)
+        raise
+    fut.set_result(value)
+    return value, False
+
+def _copy(resp: httpx.Response, key: str) -> httpx.Response:
+    # Каждому бэкенду — свой объект: они выставляют response.encoding, а после
+    # обращения к .text httpx этого уже не позволяет. Тело общее (bytes).
+    headers = {"content-type": resp.headers["content-type"]} if "content-type" in resp.headers else {}
+    return httpx.Response(
+        resp.status_code,
+        headers=headers,
+        content=resp.content,
+        request=resp.request,
+        extensions={**resp.extensions, "run_key": key},
+    )
+
+def _conn():
+    return _store.connect(DB_NAME, SCHEMA)
+
+def remembered_tier(host: str) -> str | None:
+    row = _conn().execute("SELECT tier, updated_at FROM host_tiers WHERE host = ?", (host,)).fetchone()
+    if row is None or row[0] not in TIERS or time.time() - row[1] > RETRY_CHEAPER_S:
+        return None
+    return row[0]
+
+def remember_tier(host: str, tier: str) -> None:
+    _conn().execute(
+        "INSERT OR REPLACE INTO host_tiers (host, tier, updated_at) VALUES (?, ?, ?)",
+        (host, tier, time.time()),
+    )
+
+def blocked_reason(resp: httpx.Response, expect: str | None = None) -> str | None:
+    """Почему ответ не годится (None — годится)."""
+    if resp.status_code in BLOCKED_STATUSES:
+        return f"status {resp.status_code}"
+    if resp.status_code >= 400:
+        return f"status {resp.status_code}"
+    # Не трогаем resp.text: после него бэкенд уже не сможет выставить response.encoding
+    text = resp.content.decode(resp.encoding or "utf-8", errors="replace")
+    if len(text) < MIN_LENGTH:
+        return "empty page"
+    if expect and re.search(expect, text):
+        return None
+    if CHALLENGE_RE.search(text):
+        return "challenge page"
+    if expect:
+        return "expected markup not found"
+    return None
+
+def _via_cloudscraper(url: str, timeout: float) -> httpx.Response:
+    global _scraper
+    with _scraper_lock:
+        if _scraper is None:
+            import cloudscraper
+            _scraper = cloudscraper.create_scraper()
+    r = _scraper.get(url, timeout=_deadline.remaining(timeout))
+    _metrics.incr("http.requests")
+    _metrics.incr("http.bytes_decoded", len(r.content))
+    return httpx.Response(
+        r.status_code,
+        headers={"content-type": r.headers.get("content-type", "text/html; charset=utf-8")},
+        content=r.content,
+        request=httpx.Request("GET", url),
+    )
+
+def _via_browser(url: str, wait_for: str | None, timeout: float) -> httpx.Response:
+    import _browser
+    html = _browser.render(url, wait_for=wait_for, timeout_ms=int(timeout * 1000))
+    return httpx.Response(
+        200,
+        headers={"content-type": "text/html; charset=utf-8"},
+        content=html.encode("utf-8"),
+        request=httpx.Request("GET", url),
+    )
+
+def fetch(url: str, expect: str | None = None, wait_for: str | None = None,
+          conditional: bool = False, max_tier: str = "browser", timeout: float = 30.0) -> httpx.Response:
+    """
+    Загружает url самым дешёвым из работающих способов; повторная загрузка того
+    же URL в этом прогоне берётся из памяти (см. описание модуля).
+
+    expect   — регулярное выражение, которое должно найтись в нормальной странице
+               (например, класс карточки статьи);
+    wait_for — CSS-селектор для браузерного способа (см. _browser.render);
+    conditional — для HTTP-способа идти через кэш валидаторов (_httpcache).
+
+    Бросает FetchBlocked, если все способы вплоть до max_tier не помогли —
+    бэкенд упадёт и оставит прежнюю ленту вместо пустой.
+    """
+    _metrics.incr("fetch.requests")
+    key = normalize_url(url)
+    with _metrics.phase("fetch"):
+        resp, reused = _shared(_run_fetches, key,
+                               lambda: _fetch_tiers(url, expect, wait_for, conditional, max_tier, timeout))
+        if reused:
+            if blocked_reason(resp, expect) is not None:
+                # Другой бэкенд ждал от страницы другого — загружаем сами
+                return _copy(_fetch_tiers(url, expect, wait_for, conditional, max_tier, timeout), key)
+            _metrics.incr("fetch.coalesced")
+    return _copy(resp, key)
+
+def parsed(resp: httpx.Response, only: str | None = None):
+    """
+    _parse.soup(resp.text, only), общий для всех бэкендов, получивших эту
+    страницу через fetch() в этом прогоне. Дерево только для чтения: его
+    одновременно обходят несколько бэкендов.
+    """
+    key = resp.extensions.get("run_key")
+    if key is None:
+        return _parse.soup(resp.text, only=only)
+    soup, reused = _shared(_run_soups, (key, only, resp.encoding),
+                           lambda: _parse.soup(resp.text, only=only))
+    if reused:
+        _metrics.incr("parse.shared")
+    return soup
+
+def _fetch_tiers(url: str, expect: str | None, wait_for: str | None, conditional: bool,
+                 max_tier: str, timeout: float) -> httpx.Response:
+    host = urlsplit(url).hostname or ""
+    tiers = TIERS[:TIERS.index(max_tier) + 1]
+    start = remembered_tier(host)
+    if start not in tiers:
+        start = tiers[0]
+    reasons = []
+    for tier in tiers[tiers.index(start):]:
+        try:
+            if tier == "http":
+                resp = _http.get(url, timeout=timeout, conditional=conditional)
+            elif tier == "cloudscraper":
+                resp = _via_cloudscraper(url, timeout)
+            else:
+                resp = _via_browser(url, wait_for, timeout)
+        except _deadline.DeadlineExceeded:
+            raise  # следующий способ тоже не успеет
+        except Exception as e:
+            reasons.append(f"{tier}: {type(e).__name__}: {e}")
+            _metrics.incr("fetch.escalations")
+            continue
+        reason = blocked_reason(resp, expect)
+        if reason is None:
+            _metrics.incr(f"fetch.tier.{tier}")
+            if tier != remembered_tier(host):
+                remember_tier(host, tier)
+            resp.extensions = {**resp.extensions, "tier": tier}
+            return resp
+        reasons.append(f"{tier}: {reason}")
+        _metrics.incr("fetch.escalations")
+    _metrics.incr("fetch.blocked")
+    raise FetchBlocked(f"{url}: " + "; ".join(reasons))
@@ -0,0 +1,253 @@
+"""
+Общий HTTP-клиент для всех бэкендов.
+
+Один httpx.AsyncClient на процесс (пул соединений, keep-alive, HTTP/2 при
+наличии h2, gzip/brotli, таймауты по умолчанию) крутится в фоновом event loop.
+Бэкенды остаются синхронными: get() ждёт один ответ, get_many() качает пачку
+параллельно. Когда generate.py запускает бэкенды в одном интерпретаторе, все
+они ходят через одни и те же соединения.
+
+Статистика (запросы, байты, новые/переиспользованные соединения) пишется в _metrics.
+get(..., conditional=True) ходит через кэш валидаторов (_httpcache).
+Ожидание в run() ограничено сроком бэкенда (_deadline).
+"""
+from __future__ import annotations
+import asyncio
+import atexit
+import concurrent.futures
+import os
+import threading
+import weakref
+from typing import Iterable
+from urllib.parse import urlsplit
+
+import httpx
+
+import _deadline
+import _httpcache
+import _metrics
+
+try:
+    import h2  # noqa: F401 — нужен httpx для http2=True
+    HTTP2 = True
+except ImportError:
+    HTTP2 = False
+
+UA = ("Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 "
+      "(KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36")
+
+DEFAULT_HEADERS = {
+    "User-Agent": UA,
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+DEFAULT_TIMEOUT = httpx.Timeout(20.0, connect=10.0)
+DEFAULT_LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=16, keepalive_expiry=60.0)
+
+_lock = threading.Lock()
+_loop: asyncio.AbstractEventLoop | None = None
+_client: httpx.AsyncClient | None = None
+_streams: "weakref.WeakSet" = weakref.WeakSet()
+# Ограничения частоты запросов по хостам (запросов в секунду); см. set_rate_limit
+_rates: dict[str, float] = {}
+_next_slot: dict[str, float] = {}
+
+def _ensure_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="parser-http", daemon=True).start()
+            _loop = loop
+        return _loop
+
+def run(coro):
+    """
+    Выполняет корутину в общем event loop и ждёт результат (вызывать из обычных
+    потоков). Не дольше срока бэкенда: после него корутина отменяется и
+    бросается _deadline.DeadlineExceeded.
+    """
+    try:
+        left = _deadline.remaining()
+    except _deadline.DeadlineExceeded:
+        coro.close()
+        raise
+    fut = asyncio.run_coroutine_threadsafe(coro, _ensure_loop())
+    try:
+        return fut.result(timeout=left)
+    except concurrent.futures.TimeoutError:
+        if fut.done():
+            raise  # TimeoutError из самой корутины
+        fut.cancel()
+        _deadline.expired()
+
+def client() -> httpx.AsyncClient:
+    """Общий клиент; создаётся лениво, запросы выполняет только фоновый loop."""
+    global _client
+    _ensure_loop()
+    with _lock:
+        if _client is None:
+            _client = httpx.AsyncClient(
+                http2=HTTP2,
+                headers=DEFAULT_HEADERS,
+                timeout=DEFAULT_TIMEOUT,
+                limits=DEFAULT_LIMITS,
+                follow_redirects=True,
+            )
+        return _client
+
+def set_rate_limit(host: str, per_second: float | None) -> None:
+    """
+    Не больше per_second запросов в секунду к host — для всех get()/get_many()
+    в процессе. None или 0 снимает ограничение.
+    """
+    if per_second:
+        _rates[host] = per_second
+    else:
+        _rates.pop(host, None)
+
+async def _throttle(url: str) -> None:
+    # Вызывается только из фонового loop, поэтому без блокировок
+    host = urlsplit(url).hostname or ""
+    rate = _rates.get(host)
+    if not rate:
+        return
+    now = asyncio.get_running_loop().time()
+    slot = max(now, _next_slot.get(host, 0.0))
+    _next_slot[host] = slot + 1.0 / rate
+    if slot > now:
+        await asyncio.sleep(slot - now)
+
+async def aget(url: str, headers: dict | None = None, timeout: float | None = None) -> httpx.Response:
+    await _throttle(url)
+    kwargs = {"headers": headers}
+    if timeout is not None:
+        kwargs["timeout"] = timeout
+    resp = await client().get(url, **kwargs)
+    await resp.aread()
+    return resp
+
+def _record(resp: httpx.Response) -> None:
+    _metrics.incr("http.requests")
+    _metrics.incr("http.bytes", resp.num_bytes_downloaded)
+    _metrics.incr("http.bytes_decoded", len(resp.content))
+    stream = resp.extensions.get("network_stream")
+    if stream is not None:
+        try:
+            reused = stream in _streams
+            _streams.add(stream)
+        except TypeError:
+            return
+        _metrics.incr("http.connections_reused" if reused else "http.connections_new")
+
+def _revalidated(url: str, entry: dict | None, resp: httpx.Response) -> httpx.Response:
+    """
+    Обрабатывает ответ на условный запрос: 304 превращается в 200 с телом из кэша
+    и пометкой extensions["not_modified"], новый 200 кладётся в кэш. В обоих
+    случаях extensions["validators"] — (etag, last_modified) этого содержимого.
+    """
+    if resp.status_code == 304 and entry is not None:
+        _metrics.incr("http_cache.hits")
+        _httpcache.touch(url)
+        headers = {"content-type": entry["content_type"]} if entry["content_type"] else {}
+        return httpx.Response(
+            200,
+            headers=headers,
+            content=_httpcache.body(entry),
+            request=resp.request,
+            extensions={**resp.extensions, "not_modified": True,
+                        "validators": (entry["etag"], entry["last_modified"])},
+        )
+    _metrics.incr("http_cache.misses")
+    if resp.status_code == 200:
+        validators = (resp.headers.get("etag"), resp.headers.get("last-modified"))
+        _httpcache.store(url, *validators, resp.headers.get("content-type"), resp.content)
+        resp.extensions["validators"] = validators
+    return resp
+
+def get(url: str, headers: dict | None = None, timeout: float | None = None,
+        conditional: bool = False) -> httpx.Response:
+    """
+    Синхронный GET через общий клиент. Тело уже прочитано.
+    conditional=True — запрос с валидаторами из _httpcache (для индексных страниц).
+    """
+    with _metrics.phase("fetch"):
+        entry = None
+        if conditional:
+            entry = _httpcache.lookup(url)
+            headers = {**(headers or {}), **_httpcache.validators(entry)}
+        client()
+        try:
+            resp = run(aget(url, headers=headers, timeout=timeout))
+        except Exception:
+            _metrics.incr("http.errors")
+            raise
+        _record(resp)
+        if conditional:
+            resp = _revalidated(url, entry, resp)
+        return resp
+
+def unchanged(resp: httpx.Response, *outputs: str) -> bool:
+    """
+    True, если сервер ответил 304, все выходные файлы ленты на месте и каждый
+    из них был успешно записан из этого же содержимого (те же валидаторы) —
+    тогда разбор и перегенерацию можно пропустить. Иначе валидаторы ответа
+    запоминаются для outputs и закрепляются, когда лента будет записана
+    (_httpcache.written): прогон, упавший после 200, не оставит устаревшую
+    ленту «свежей».
+    """
+    validators = resp.extensions.get("validators")
+    if (resp.extensions.get("not_modified") and validators is not None
+            and all(os.path.exists(p) and _httpcache.written_with(p) == validators for p in outputs)):
+        _metrics.incr("items.changed", 0)  # лента та же — тоже наблюдение для _schedule
+        return True
+    if validators is not None and any(validators):
+        for p in outputs:
+            _httpcache.expect(p, validators)
+    return False
+
+def get_many(urls: Iterable[str], headers: dict | None = None, timeout: float | None = None,
+             concurrency: int = 8, conditional: bool = False) -> list[httpx.Response | Exception]:
+    """
+    Параллельно качает urls (не больше concurrency одновременно, с учётом
+    set_rate_limit). Порядок ответов совпадает с порядком urls; ошибки
+    возвращаются как исключения.
+    """
+    urls = list(urls)
+    if not urls:
+        return []
+    entries = [_httpcache.lookup(u) for u in urls] if conditional else [None] * len(urls)
+    client()
+
+    async def _gather():
+        sem = asyncio.Semaphore(max(concurrency, 1))
+
+        async def one(u, entry):
+            h = {**(headers or {}), **_httpcache.validators(entry)} if conditional else headers
+            async with sem:
+                return await aget(u, headers=h, timeout=timeout)
+
+        return await asyncio.gather(*(one(u, e) for u, e in zip(urls, entries)), return_exceptions=True)
+
+    with _metrics.phase("fetch"):
+        results = run(_gather())
+    for i, r in enumerate(results):
+        if isinstance(r, httpx.Response):
+            _record(r)
+            if conditional:
+                results[i] = _revalidated(urls[i], entries[i], r)
+        else:
+            _metrics.incr("http.errors")
+    return results
+
+def close() -> None:
+    global _client
+    with _lock:
+        c, _client = _client, None
+    if c is not None and _loop is not None and _loop.is_running():
+        try:
+            run(c.aclose())
+        except Exception:
+            pass
+
+atexit.register(close)
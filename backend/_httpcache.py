@@ -0,0 +1,134 @@
+"""
+Кэш валидаторов (ETag / Last-Modified) для индексных страниц.
+
+Для каждого URL храним валидаторы и сжатое тело последнего ответа 200.
+Следующий запрос уходит с If-None-Match / If-Modified-Since; на 304 тело
+берётся из кэша, а бэкенд может вообще не перестраивать ленту
+(см. _http.unchanged). Размер ограничен PARSER_HTTP_CACHE_MB (по умолчанию 64 МБ),
+лишнее вытесняется по давности использования.
+
+304 сам по себе не значит, что ленту можно не перестраивать: прошлый прогон
+мог получить 200, но упасть до записи ленты. Поэтому для каждого выходного
+файла хранятся валидаторы ответа, из которого он был успешно записан
+(таблица outputs): _http.unchanged() отмечает их как ожидающие (expect), а
+запись ленты (_feedstore, _rss) подтверждает (written).
+"""
+from __future__ import annotations
+import os
+import threading
+import time
+import zlib
+
+import _metrics
+import _store
+
+DB_NAME = "http_cache.sqlite"
+MAX_BYTES = int(float(os.environ.get("PARSER_HTTP_CACHE_MB", "64")) * 1024 * 1024)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS http_cache (
+    url           TEXT PRIMARY KEY,
+    etag          TEXT,
+    last_modified TEXT,
+    content_type  TEXT,
+    body          BLOB NOT NULL,
+    size          INTEGER NOT NULL,
+    stored_at     REAL NOT NULL,
+    used_at       REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS http_cache_used_at ON http_cache(used_at);
+CREATE TABLE IF NOT EXISTS outputs (
+    path          TEXT PRIMARY KEY,
+    etag          TEXT,
+    last_modified TEXT,
+    written_at    REAL NOT NULL
+);
+"""
+
+# путь выходного файла → валидаторы ответа, из которого его сейчас строят
+_expected: dict[str, tuple] = {}
+_expected_lock = threading.Lock()
+
+def _conn():
+    return _store.connect(DB_NAME, SCHEMA)
+
+def lookup(url: str) -> dict | None:
+    row = _conn().execute(
+        "SELECT etag, last_modified, content_type, body FROM http_cache WHERE url = ?", (url,)
+    ).fetchone()
+    if row is None:
+        return None
+    etag, last_modified, content_type, body = row
+    return {"etag": etag, "last_modified": last_modified, "content_type": content_type, "body": body}
+
+def validators(entry: dict | None) -> dict:
+    """Заголовки условного запроса для записи кэша (пустой dict, если валидаторов нет)."""
+    headers = {}
+    if entry:
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+def body(entry: dict) -> bytes:
+    return zlib.decompress(entry["body"])
+
+def touch(url: str) -> None:
+    _conn().execute("UPDATE http_cache SET used_at = ? WHERE url = ?", (time.time(), url))
+
+def store(url: str, etag: str | None, last_modified: str | None, content_type: str | None,
+          content: bytes) -> None:
+    """Сохраняет ответ 200; без валидаторов запись бесполезна и удаляется."""
+    conn = _conn()
+    if not (etag or last_modified):
+        conn.execute("DELETE FROM http_cache WHERE url = ?", (url,))
+        return
+    packed = zlib.compress(content, 6)
+    now = time.time()
+    conn.execute(
+        "INSERT OR REPLACE INTO http_cache "
+        "(url, etag, last_modified, content_type, body, size, stored_at, used_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        (url, etag, last_modified, content_type, packed, len(packed), now, now),
+    )
+    _metrics.incr("http_cache.stores")
+    evict(MAX_BYTES)
+
+def evict(max_bytes: int) -> int:
+    """Удаляет самые давно использованные записи, пока кэш больше max_bytes."""
+    conn = _conn()
+    total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM http_cache").fetchone()[0]
+    removed = 0
+    if total <= max_bytes:
+        return 0
+    for url, size in conn.execute("SELECT url, size FROM http_cache ORDER BY used_at").fetchall():
+        if total <= max_bytes:
+            break
+        conn.execute("DELETE FROM http_cache WHERE url = ?", (url,))
+        total -= size
+        removed += 1
+    _metrics.incr("http_cache.evictions", removed)
+    return removed
+
+def expect(path: str, validators: tuple) -> None:
+    """Файл path строится из ответа с такими валидаторами (etag, last_modified)."""
+    with _expected_lock:
+        _expected[os.path.abspath(path)] = validators
+
+def written(path: str) -> None:
+    """Файл path успешно записан: валидаторы из expect() становятся его текущими."""
+    path = os.path.abspath(path)
+    with _expected_lock:
+        validators = _expected.pop(path, None)
+    if validators is not None:
+        _conn().execute(
+            "INSERT OR REPLACE INTO outputs (path, etag, last_modified, written_at) VALUES (?, ?, ?, ?)",
+            (path, *validators, time.time()),
+        )
+
+def written_with(path: str) -> tuple | None:
+    """Валидаторы ответа, из которого path записан последний раз; None — неизвестно."""
+    row = _conn().execute("SELECT etag, last_modified FROM outputs WHERE path = ?",
+                          (os.path.abspath(path),)).fetchone()
+    return tuple(row) if row else None
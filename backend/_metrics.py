@@ -0,0 +1,86 @@
+"""
+Счётчики прогона для бэкендов.
+
+Каждый счётчик пишется сразу в два места: в общий итог процесса и в область
+текущего бэкенда (scope), если generate.py её открыл. Области живут в contextvars,
+поэтому бэкенды, запущенные параллельно в потоках, не смешивают свои цифры.
+
+Если скрипт запущен отдельным процессом, generate.py передаёт путь в
+PARSER_METRICS_FILE — при выходе туда сбрасывается итог процесса.
+
+Время фаз бэкенда (fetch/parse/render/write) копится в счётчиках
+phase.<фаза>_s через phase(); общие модули (_fetch, _http, _parse, _feedstore,
+_rss) размечают свои фазы сами, бэкендам ничего делать не нужно.
+"""
+from __future__ import annotations
+import atexit
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+METRICS_FILE_ENV = "PARSER_METRICS_FILE"
+
+_lock = threading.Lock()
+_totals: dict[str, float] = {}
+_current: ContextVar[dict | None] = ContextVar("parser_metrics_scope", default=None)
+_phase: ContextVar[str | None] = ContextVar("parser_metrics_phase", default=None)
+
+PHASES = ("fetch", "parse", "render", "write")
+
+def incr(key: str, n: float = 1) -> None:
+    scope = _current.get()
+    with _lock:
+        _totals[key] = _totals.get(key, 0) + n
+        if scope is not None:
+            scope[key] = scope.get(key, 0) + n
+
+@contextmanager
+def scope():
+    """Открывает область счётчиков для одного бэкенда; отдаёт её словарь."""
+    counters: dict[str, float] = {}
+    token = _current.set(counters)
+    try:
+        yield counters
+    finally:
+        _current.reset(token)
+
+@contextmanager
+def phase(name: str):
+    """
+    Засекает время фазы в phase.<name>_s. Вложенная фаза отдельно не считается —
+    время идёт внешней (fetch → _http.get учитывается один раз).
+    """
+    if _phase.get() is not None:
+        yield
+        return
+    token = _phase.set(name)
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        _phase.reset(token)
+        incr(f"phase.{name}_s", time.perf_counter() - t0)
+
+def snapshot() -> dict[str, float]:
+    with _lock:
+        return dict(_totals)
+
+def merge(dst: dict[str, float], src: dict[str, float]) -> dict[str, float]:
+    for k, v in src.items():
+        dst[k] = dst.get(k, 0) + v
+    return dst
+
+def _dump_on_exit() -> None:
+    path = os.environ.get(METRICS_FILE_ENV)
+    if not path:
+        return
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(snapshot(), f)
+    except OSError:
+        pass
+
+atexit.register(_dump_on_exit)
@@ -0,0 +1,108 @@
+"""
+Разбор HTML для бэкендов.
+
+soup() по умолчанию использует lxml (в разы быстрее html.parser) и умеет строить
+дерево только для нужных поддеревьев: бэкенд описывает их простыми селекторами
+вида 'ol.paginated-feed-list-wrapper', 'div.summary-list__item' или
+'script[type=application/ld+json]', а всё остальное отбрасывается ещё при разборе
+(SoupStrainer). Парсер можно сменить через PARSER_HTML_PARSER (lxml, html.parser,
+html5lib — последний SoupStrainer не поддерживает).
+
+jsonld() достаёт блоки <script type="application/ld+json"> прямо из текста
+страницы, без дерева вовсе: статье, у которой всё нужное есть в JSON-LD, DOM
+не нужен.
+"""
+from __future__ import annotations
+import json
+import os
+import re
+from functools import lru_cache
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+import _metrics
+
+try:
+    import lxml  # noqa: F401
+    DEFAULT_PARSER = "lxml"
+except ImportError:
+    DEFAULT_PARSER = "html.parser"
+
+PARSER = os.environ.get("PARSER_HTML_PARSER") or DEFAULT_PARSER
+
+_JSONLD_RE = re.compile(
+    r"<script\b[^>]*?\btype\s*=\s*[\"']?application/ld\+json[\"']?[^>]*>(.*?)</script\s*>",
+    re.IGNORECASE | re.DOTALL,
+)
+
+# tag, затем .class и [attr] / [attr=value] в любом количестве
+_SIMPLE_RE = re.compile(r"^([a-zA-Z][\w-]*)?((?:\.[\w-]+|\[[\w-]+(?:=[^\]]+)?\])*)$")
+_PART_RE = re.compile(r"\.([\w-]+)|\[([\w-]+)(?:=([^\]]+))?\]")
+
+def _has_class(name: str):
+    # Сравниваем по отдельному классу: SoupStrainer в новых bs4 видит class целиком
+    return re.compile(rf"(^|\s){re.escape(name)}(\s|$)")
+
+def simple_parts(selector: str) -> tuple[str | None, list[str], dict] | None:
+    """
+    Разбирает простой селектор (тег, .class, [attr], [attr=value] — без
+    комбинаторов и псевдоклассов) в (tag, classes, attrs); None — селектор не простой.
+    В attrs значение True означает «атрибут есть».
+    """
+    m = _SIMPLE_RE.match(selector.strip())
+    if not m or not selector.strip():
+        return None
+    tag, rest = m.group(1), m.group(2)
+    classes: list[str] = []
+    attrs: dict = {}
+    for cls, attr, value in _PART_RE.findall(rest):
+        if cls:
+            classes.append(cls)
+        else:
+            attrs[attr] = value.strip("\"'") if value else True
+    return tag, classes, attrs
+
+@lru_cache(maxsize=None)
+def strainer(selector: str) -> SoupStrainer:
+    """SoupStrainer по простому селектору (без комбинаторов и псевдоклассов)."""
+    parts = simple_parts(selector)
+    if parts is None:
+        raise ValueError(f"Unsupported selector for SoupStrainer: {selector!r}")
+    tag, classes, attrs = parts
+    if len(classes) > 1:
+        raise ValueError(f"Only one class per selector is supported: {selector!r}")
+    if classes:
+        attrs = {**attrs, "class": _has_class(classes[0])}
+    return SoupStrainer(tag, attrs=attrs)
+
+def soup(html: str | bytes, only: str | None = None, parser: str | None = None) -> BeautifulSoup:
+    """
+    BeautifulSoup с быстрым парсером. only — селектор поддеревьев, которые
+    нужно построить (см. strainer); None — всё дерево.
+    """
+    parser = parser or PARSER
+    with _metrics.phase("parse"):
+        if only is None or parser == "html5lib":
+            return BeautifulSoup(html, parser)
+        return BeautifulSoup(html, parser, parse_only=strainer(only))
+
+def jsonld(html: str) -> list[dict]:
+    """
+    Объекты JSON-LD страницы по порядку: блоки-массивы и @graph разворачиваются,
+    блоки с битым JSON пропускаются.
+    """
+    found: list[dict] = []
+    with _metrics.phase("parse"):
+        for m in _JSONLD_RE.finditer(html):
+            try:
+                data = json.loads(m.group(1).strip() or "{}")
+            except json.JSONDecodeError:
+                continue
+            for obj in data if isinstance(data, list) else [data]:
+                if not isinstance(obj, dict):
+                    continue
+                found.append(obj)
+                graph = obj.get("@graph")
+                if isinstance(graph, list):
+                    found.extend(g for g in graph if isinstance(g, dict))
+    return found
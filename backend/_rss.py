@@ -0,0 +1,124 @@
+"""
+Потоковая запись RSS 2.0 без дерева всего документа (lxml.etree.xmlfile).
+
+feedgen строит lxml-дерево ленты целиком и сериализует его одним куском — для
+лент с полными текстами статей это весь корпус в памяти, причём дважды (дерево
+и готовая строка). RssWriter пишет элементы в файл по мере поступления: в памяти
+только текущий <item>.
+
+Вывод байт в байт совпадает с FeedGenerator.rss_file() для тех полей, которые
+здесь поддержаны (порядок элементов, пространства имён, объявление XML, формат
+дат, <guid isPermaLink="false">, description + content:encoded).
+
+    with _rss.RssWriter("feed.xml", title=..., link=..., description=...) as w:
+        for it in items:
+            w.item(title=..., link=..., guid=..., description=..., content=..., pubdate=...)
+"""
+from __future__ import annotations
+import os
+import tempfile
+from datetime import datetime, timezone
+from email.utils import format_datetime
+
+from lxml import etree
+
+import _deadline
+import _httpcache
+import _metrics
+
+NSMAP = {"atom": "http://www.w3.org/2005/Atom", "content": "http://purl.org/rss/1.0/modules/content/"}
+CONTENT_ENCODED = "{%s}encoded" % NSMAP["content"]
+DOCS = "http://www.rssboard.org/rss-specification"
+GENERATOR = "python-feedgen"  # как у feedgen: ленты до и после перехода не отличаются
+
+def rfc2822(d: datetime) -> str:
+    """Дата в формате RSS, как feedgen.util.formatRFC2822 (без зависимости от локали)."""
+    return format_datetime(d)
+
+class RssWriter:
+    """Контекстный менеджер: пишет во временный файл и атомарно подменяет path на выходе."""
+
+    def __init__(self, path: str, title: str, link: str, description: str,
+                 language: str | None = None, encoding: str = "UTF-8", last_build: datetime | None = None):
+        """
+        last_build — lastBuildDate канала; лучше передавать время последнего
+        изменения записей, чтобы лента без изменений не менялась. None — сейчас.
+        """
+        self.path = path
+        self.last_build = last_build
+        self.channel = {"title": title, "link": link, "description": description, "language": language}
+        self.encoding = encoding
+        self.count = 0
+
+    def __enter__(self) -> "RssWriter":
+        _deadline.check()  # опоздавший бэкенд не подменяет прежнюю ленту
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, self._tmp = tempfile.mkstemp(dir=directory, prefix=".rss_", suffix=".tmp")
+        self._file = os.fdopen(fd, "wb")
+        self._xf_ctx = etree.xmlfile(self._file, encoding=self.encoding)
+        self._xf = self._xf_ctx.__enter__()
+        self._xf.write_declaration()
+        self._rss = self._xf.element("rss", {"version": "2.0"}, nsmap=NSMAP)
+        self._rss.__enter__()
+        self._channel = self._xf.element("channel")
+        self._channel.__enter__()
+        ch = self.channel
+        self._text("title", ch["title"])
+        self._text("link", ch["link"])
+        self._text("description", ch["description"])
+        self._text("docs", DOCS)
+        self._text("generator", GENERATOR)
+        if ch["language"]:
+            self._text("language", ch["language"])
+        self._text("lastBuildDate", rfc2822(self.last_build or datetime.now(timezone.utc)))
+        return self
+
+    def _text(self, tag: str, text: str, attrib: dict | None = None) -> None:
+        with self._xf.element(tag, attrib or {}):
+            self._xf.write(text)
+
+    def item(self, title: str | None = None, link: str | None = None, description: str | None = None,
+             content: str | None = None, guid: str | None = None, authors: list[str] | None = None,
+             pubdate: datetime | None = None) -> None:
+        """
+        Один <item>. Правила те же, что у FeedEntry.rss_entry(): при description и
+        content тело уходит в content:encoded, без description — в description.
+        authors — уже готовые строки RSS (e-mail с именем), как в feedgen.
+        """
+        if not (title or description or content is not None):
+            raise ValueError("Required fields not set")
+        with _metrics.phase("render"), self._xf.element("item"):
+            if title:
+                self._text("title", title)
+            if link:
+                self._text("link", link)
+            if description and content is not None:
+                self._text("description", description)
+                self._text(CONTENT_ENCODED, content)
+            elif description:
+                self._text("description", description)
+            elif content is not None:
+                self._text("description", content)
+            for a in authors or []:
+                self._text("author", a)
+            if guid:
+                self._text("guid", guid, {"isPermaLink": "false"})
+            if pubdate is not None:
+                self._text("pubDate", rfc2822(pubdate))
+        self._xf.flush()
+        self.count += 1
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        _metrics.incr("items.produced", self.count)
+        with _metrics.phase("write"):
+            try:
+                self._channel.__exit__(exc_type, exc, tb)
+                self._rss.__exit__(exc_type, exc, tb)
+                self._xf_ctx.__exit__(exc_type, exc, tb)
+            finally:
+                self._file.close()
+            if exc_type is None:
+                os.replace(self._tmp, self.path)
+                _httpcache.written(self.path)
+            elif os.path.exists(self._tmp):
+                os.unlink(self._tmp)
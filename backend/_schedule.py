@@ -0,0 +1,105 @@
+"""
+Расписание по частоте обновления лент (generate.py --due-only).
+
+После каждого прогона generate.py записывает наблюдение по каждому скрипту:
+изменилась ли лента (счётчик items.changed — новые и изменённые записи из
+_feedstore; 0 — страница ответила 304 или записи те же). По последним
+наблюдениям оценивается интенсивность изменений λ как у пуассоновского
+процесса, наблюдаемого с интервалом I (оценка Cho & Garcia-Molina):
+
+    λ = -ln((n - X + 0.5) / (n + 0.5)) / I,
+
+где n — число наблюдений, X — сколько из них застали изменение. Скрипт «пора
+запускать», если с последнего успешного прогона прошло не меньше 1/λ (минус
+DUE_SLACK_S — cron запускает не секунда в секунду) или больше max_staleness.
+Без оценки (меньше MIN_OBSERVATIONS наблюдений, скрипт не сообщает
+items.changed, прошлый прогон упал) скрипт запускается всегда.
+"""
+from __future__ import annotations
+import math
+import time
+
+import _store
+
+DB_NAME = "schedule.sqlite"
+HISTORY = 200           # наблюдений на скрипт
+MIN_OBSERVATIONS = 3
+DUE_SLACK_S = 300.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS observations (
+    script  TEXT NOT NULL,
+    ts      REAL NOT NULL,
+    ok      INTEGER NOT NULL,
+    changed INTEGER,
+    PRIMARY KEY (script, ts)
+);
+"""
+
+def _conn():
+    return _store.connect(DB_NAME, SCHEMA)
+
+def record(script: str, ts: float, ok: bool, changed: bool | None) -> None:
+    """Наблюдение по итогам прогона; changed=None — скрипт не сообщил об изменениях."""
+    conn = _conn()
+    conn.execute("INSERT OR REPLACE INTO observations (script, ts, ok, changed) VALUES (?, ?, ?, ?)",
+                 (script, ts, int(ok), None if changed is None else int(changed)))
+    conn.execute(
+        "DELETE FROM observations WHERE script = ? AND ts NOT IN "
+        "(SELECT ts FROM observations WHERE script = ? ORDER BY ts DESC LIMIT ?)",
+        (script, script, HISTORY),
+    )
+
+def estimate(script: str) -> dict:
+    """Оценка частоты изменений скрипта по сохранённым наблюдениям."""
+    rows = _conn().execute(
+        "SELECT ts, ok, changed FROM observations WHERE script = ? ORDER BY ts", (script,)
+    ).fetchall()
+    ok_rows = [(ts, changed) for ts, ok, changed in rows if ok]
+    seen = [(ts, changed) for ts, changed in ok_rows if changed is not None]
+    est = {
+        "observations": len(seen),
+        "changes": sum(c for _, c in seen),
+        "last_run": seen[-1][0] if seen else None,
+        "last_change": next((ts for ts, c in reversed(seen) if c), None),
+        "last_ok": bool(rows[-1][1]) if rows else None,
+        "signal": bool(seen) or not ok_rows,
+        "rate_per_h": None,
+        "interval_s": None,
+    }
+    if len(seen) < MIN_OBSERVATIONS:
+        return est
+    n = len(seen) - 1  # первое наблюдение открывает ряд, интервалов на одно меньше
+    changes = sum(c for _, c in seen[1:])
+    mean_interval = (seen[-1][0] - seen[0][0]) / n
+    if mean_interval <= 0:
+        return est
+    rate = -math.log((n - changes + 0.5) / (n + 0.5)) / mean_interval
+    est["rate_per_h"] = round(rate * 3600, 4)
+    est["interval_s"] = round(1 / rate, 1) if rate > 0 else None
+    return est
+
+def due(script: str, now: float, max_staleness_s: float) -> dict:
+    """
+    Решение для одного скрипта: {"due": bool, "reason": str, "next_due": ts | None, **estimate}.
+    """
+    est = estimate(script)
+    if est["last_ok"] is False:
+        return {**est, "due": True, "reason": "прошлый прогон не удался", "next_due": None}
+    if not est["signal"]:
+        return {**est, "due": True, "reason": "скрипт не сообщает об изменениях", "next_due": None}
+    if est["rate_per_h"] is None:
+        return {**est, "due": True, "reason": "мало наблюдений", "next_due": None}
+    since = now - est["last_run"]
+    wait = min(est["interval_s"] or math.inf, max_staleness_s)
+    next_due = est["last_run"] + wait
+    if since >= max_staleness_s:
+        return {**est, "due": True, "reason": f"не обновлялась {since / 3600:.1f} ч", "next_due": next_due}
+    if since + DUE_SLACK_S >= wait:
+        return {**est, "due": True, "reason": "ожидается изменение", "next_due": next_due}
+    return {**est, "due": False, "reason": f"следующее изменение через {(wait - since) / 3600:.1f} ч",
+            "next_due": next_due}
+
+def plan(scripts: list[str], max_staleness_s: float, now: float | None = None) -> dict[str, dict]:
+    now = time.time() if now is None else now
+    return {s: due(s, now, max_staleness_s) for s in scripts}
@@ -0,0 +1,41 @@
+"""
+Постоянное хранилище служебных данных бэкендов (SQLite в .cache/).
+
+Каталог задаётся PARSER_CACHE_DIR (по умолчанию .cache/ в корне репозитория,
+в CI он сохраняется между прогонами через actions/cache). Соединения
+открываются по одному на поток: бэкенды в generate.py работают в пуле потоков,
+а sqlite3.Connection между потоками делить нельзя.
+"""
+from __future__ import annotations
+import os
+import sqlite3
+import threading
+from pathlib import Path
+
+CACHE_DIR_ENV = "PARSER_CACHE_DIR"
+
+_local = threading.local()
+
+def cache_dir() -> Path:
+    d = Path(os.environ.get(CACHE_DIR_ENV) or Path(__file__).resolve().parent.parent / ".cache")
+    d.mkdir(parents=True, exist_ok=True)
+    return d
+
+def connect(name: str, schema: str = "") -> sqlite3.Connection:
+    """
+    Соединение с .cache/<name> для текущего потока. schema выполняется один раз
+    при открытии (CREATE TABLE IF NOT EXISTS ...).
+    """
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    path = str(cache_dir() / name)
+    conn = conns.get(path)
+    if conn is None:
+        conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        if schema:
+            conn.executescript(schema)
+        conns[path] = conn
+    return conn
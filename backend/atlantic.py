@@ -1,22 +1,21 @@
-import requests
-from bs4 import BeautifulSoup
-from feedgen.feed import FeedGenerator
-from datetime import datetime, timezone
-
-def parse_date(date_str: str) -> datetime:
-    # Пример: '2025-07-22T13:30:00Z'
-    try:
-        return datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-    except Exception:
-        return datetime.now(timezone.utc)
+import _dates
+import _fetch
+import _http
+import _parse
+import _feedstore
+
+# Поддерево со статьями — остальная страница не разбирается (см. _parse.soup)
+PARSE_ONLY = 'article.CollectionArticleCard_root__8scmn'
 
 def generate():
     url = 'https://www.theatlantic.com/category/features/'
-    response = requests.get(url)
+    response = _fetch.fetch(url, expect=r'CollectionArticleCard', conditional=True)
+    if _http.unchanged(response, 'atlantic.xml'):
+        return  # индекс не изменился (304) — лента уже актуальна
     response.encoding = 'utf-8'
-    soup = BeautifulSoup(response.text, 'html.parser')
+    soup = _parse.soup(response.text, only=PARSE_ONLY)
 
-    fg = FeedGenerator()
+    fg = _feedstore.Feed('atlantic')
     fg.title('The Atlantic — Features')
     fg.link(href=url, rel='alternate')
     fg.description('Latest features from The Atlantic')
@@ -36,7 +35,7 @@ def generate():
         # Дата публикации (datetime в атрибуте)
         time_tag = art.select_one('time.CollectionArticleCard_datePublished__eg6_v')
         pub_date_str = time_tag['datetime'] if time_tag and time_tag.has_attr('datetime') else None
-        pub_date = parse_date(pub_date_str) if pub_date_str else datetime.now(timezone.utc)
+        pub_date = _dates.parse_or_now(pub_date_str, 'atlantic')  # '2025-07-22T13:30:00Z'
 
         if not (title and link):
             continue
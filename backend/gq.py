@@ -1,63 +1,48 @@
-import requests
-from bs4 import BeautifulSoup
-from feedgen.feed import FeedGenerator
-from datetime import datetime, timezone
+import _dates
+import _extract
+import _fetch
+import _http
+import _parse
+import _feedstore
 import re
 
-def parse_date(date_str: str) -> datetime:
-    """
-    Преобразует дату вроде 'July 21, 2025' в datetime.
-    """
-    try:
-        return datetime.strptime(date_str.strip(), "%B %d, %Y").replace(tzinfo=timezone.utc)
-    except Exception:
-        print(f"[WARN] Не удалось распарсить дату: '{date_str}'")
-        return datetime.now(timezone.utc)
+# Поддерево со статьями — остальная страница не разбирается (см. _parse.soup)
+PARSE_ONLY = "div.summary-list__item"
+
+# Карточка профиля на индексе (см. _extract.Spec)
+SPEC = _extract.Spec(PARSE_ONLY, {
+    "title": "a.SummaryItemHedLink-cxRzVg",
+    "link": "a.SummaryItemHedLink-cxRzVg@href",
+    "image": "picture img@src",
+    "teaser": ".summary-item__dek",
+    "author": "span[data-testid='BylineName']",
+    "date": "time.summary-item__publish-date",
+    "category": ".rubric__name",
+})
 
 def generate():
     url = "https://www.gq.com/about/profiles"
-    response = requests.get(url)
-    soup = BeautifulSoup(response.text, "html.parser")
+    response = _fetch.fetch(url, expect=r"summary-list__item", conditional=True)
+    if _http.unchanged(response, "gq.xml"):
+        return  # индекс не изменился (304) — лента уже актуальна
+    soup = _parse.soup(response.text, only=PARSE_ONLY)
 
-    fg = FeedGenerator()
+    fg = _feedstore.Feed('gq')
     fg.title("GQ — Profiles")
     fg.link(href=url, rel="alternate")
     fg.description("Fresh profiles from GQ")
     fg.language("en")
 
     # Каждый профиль — div c классом summary-list__item
-    articles = soup.select("div.summary-list__item")
-
-    for art in articles:
-        # Заголовок
-        title_tag = art.select_one("a.SummaryItemHedLink-cxRzVg")
-        title = title_tag.get_text(strip=True) if title_tag else None
-
-        # Ссылка
-        link = title_tag["href"] if title_tag and title_tag.has_attr("href") else None
+    for row in SPEC.extract(soup):
+        title, link = row["title"], row["link"]
         if link and not link.startswith("http"):
             link = "https://www.gq.com" + link
-
-        # Картинка
-        img_tag = art.select_one("picture img")
-        img_url = img_tag["src"] if img_tag and img_tag.has_attr("src") else None
-
-        # Описание
-        teaser_tag = art.select_one(".summary-item__dek")
-        teaser = teaser_tag.get_text(strip=True) if teaser_tag else ""
-
-        # Автор
-        author_tag = art.select_one("span[data-testid='BylineName']")
-        author = author_tag.get_text(strip=True) if author_tag else ""
-
-        # Дата публикации
-        date_tag = art.select_one("time.summary-item__publish-date")
-        date_str = date_tag.get_text(strip=True) if date_tag else ""
-        pub_date = parse_date(date_str) if date_str else datetime.now(timezone.utc)
-
-        # Рубрика (категория)
-        category_tag = art.select_one(".rubric__name")
-        category = category_tag.get_text(strip=True) if category_tag else ""
+        img_url = row["image"]
+        teaser = row["teaser"] or ""
+        author = row["author"] or ""
+        pub_date = _dates.parse_or_now(row["date"], "gq")  # 'July 21, 2025'
+        category = row["category"] or ""
 
         if not (title and link):
             continue
@@ -1,50 +1,46 @@
-import requests
-from bs4 import BeautifulSoup
-from feedgen.feed import FeedGenerator
-from datetime import datetime, timezone
+import _dates
+import _extract
+import _fetch
+import _http
+import _parse
+import _feedstore
 import re
 
-def parse_ny_date(date_str: str) -> datetime:
-    """
-    Пример: 'July 21, 2025'
-    """
-    try:
-        return datetime.strptime(date_str.strip(), "%B %d, %Y").replace(tzinfo=timezone.utc)
-    except Exception:
-        return datetime.now(timezone.utc)
+# Поддерево со статьями — остальная страница не разбирается (см. _parse.soup)
+PARSE_ONLY = 'div.summary-list__item'
+
+# Карточка материала на индексе (см. _extract.Spec)
+SPEC = _extract.Spec(PARSE_ONLY, {
+    'title': 'a.summary-item__hed-link h3',
+    'link': 'a.summary-item__hed-link@href',
+    'description': 'div.summary-item__dek',
+    # Дата публикации — в текстовом формате
+    'date': 'time.summary-item__publish-date',
+})
 
 def generate():
     url = 'https://www.newyorker.com/magazine/reporting'
-    response = requests.get(url)
+    response = _fetch.fetch(url, expect=r'summary-list__item', conditional=True)
+    if _http.unchanged(response, 'newyorker.xml'):
+        return  # индекс не изменился (304) — лента уже актуальна
     response.encoding = 'utf-8'
-    soup = BeautifulSoup(response.text, 'html.parser')
+    soup = _parse.soup(response.text, only=PARSE_ONLY)
 
-    fg = FeedGenerator()
+    fg = _feedstore.Feed('newyorker')
     fg.title('The New Yorker — Reporting')
     fg.link(href=url, rel='alternate')
     fg.description('Latest reporting from The New Yorker')
     fg.language('en')
 
     # Каждый материал — div с классом summary-list__item
-    articles = soup.select('div.summary-list__item')
-    for art in articles:
-        # Заголовок
-        title_tag = art.select_one('a.summary-item__hed-link h3')
-        title = title_tag.get_text(strip=True) if title_tag else None
+    for row in SPEC.extract(soup):
+        title = row['title']
         # Ссылка (относительная)
-        link_tag = art.select_one('a.summary-item__hed-link')
-        link = link_tag['href'] if link_tag and link_tag.has_attr('href') else None
+        link = row['link']
         if link and not link.startswith('http'):
             link = 'https://www.newyorker.com' + link
-
-        # Описание
-        desc_tag = art.select_one('div.summary-item__dek')
-        description = desc_tag.get_text(strip=True) if desc_tag else ''
-
-        # Дата публикации — это последний <time> внутри блока (она в текстовом формате)
-        time_tag = art.select_one('time.summary-item__publish-date')
-        pub_date_str = time_tag.get_text(strip=True) if time_tag else None
-        pub_date = parse_ny_date(pub_date_str) if pub_date_str else datetime.now(timezone.utc)
+        description = row['description'] or ''
+        pub_date = _dates.parse_or_now(row['date'], 'newyorker')  # 'July 21, 2025'
 
         if not (title and link):
             continue
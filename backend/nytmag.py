@@ -1,23 +1,21 @@
-import requests
-from bs4 import BeautifulSoup
-from feedgen.feed import FeedGenerator
-from datetime import datetime, timezone
+import _dates
+import _fetch
+import _http
+import _feedstore
 import re
 
-def parse_nyt_date_from_url(url: str) -> datetime:
-    m = re.search(r'/(\d{4})/(\d{2})/(\d{2})/', url)
-    if m:
-        year, month, day = map(int, m.groups())
-        return datetime(year, month, day, 12, 0, tzinfo=timezone.utc)
-    return datetime.now(timezone.utc)
+# Поддерево со статьями — остальная страница не разбирается (см. _parse.soup)
+PARSE_ONLY = 'article'
 
 def generate():
     url = 'https://www.nytimes.com/international/section/magazine'
-    response = requests.get(url)
+    response = _fetch.fetch(url, expect=r'/\d{4}/\d{2}/\d{2}/magazine/', conditional=True)
+    if _http.unchanged(response, 'nytmag.xml'):
+        return  # индекс не изменился (304) — лента уже актуальна
     response.encoding = 'utf-8'
-    soup = BeautifulSoup(response.text, 'html.parser')
+    soup = _fetch.parsed(response, only=PARSE_ONLY)  # nyt и nytmag делят одно дерево
 
-    fg = FeedGenerator()
+    fg = _feedstore.Feed('nytmag')
     fg.title('NYT — Magazine')
     fg.link(href=url, rel='alternate')
     fg.description('Latest stories from NYT Magazine')
@@ -46,7 +44,7 @@ def generate():
             desc_tag = art.find('p', attrs={'class': re.compile('css-.*')})
         description = desc_tag.get_text(strip=True) if desc_tag else ''
         # Дата из url
-        pub_date = parse_nyt_date_from_url(link)
+        pub_date = _dates.from_url_or_now(link, 'nytmag')
         # Добавляем в rss
         fe = fg.add_entry()
         fe.title(title)
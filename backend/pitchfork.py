@@ -1,42 +1,76 @@
-import requests
-from bs4 import BeautifulSoup
-from feedgen.feed import FeedGenerator
+import _dates
+import _details
+import _extract
+import _fetch
+import _http
+import _parse
+import _feedstore
 from datetime import datetime, timezone
 from urllib.parse import urljoin
 import time
 
-def parse_date(date_str: str) -> datetime:
-    """Парсит ISO-даты с часовым поясом, возвращает UTC"""
-    try:
-        dt = datetime.fromisoformat(date_str)
-        return dt.astimezone(timezone.utc)
-    except Exception:
-        return datetime.now(timezone.utc)
+# Поддерево со статьями — остальная страница не разбирается (см. _parse.soup)
+PARSE_ONLY = "div.SummaryItemWrapper-ircKXK"
 
-def get_article_date(article_url: str) -> datetime:
-    """Переходит на страницу статьи и достает <time data-testid="ContentHeaderPublishDate">"""
+# Карточка статьи на индексе (см. _extract.Spec)
+SPEC = _extract.Spec(PARSE_ONLY, {
+    "title": "h3.SummaryItemHedBase-hnYOxl",
+    "link": "a.SummaryItemHedLink-cxRzVg@href",
+    "author": "span.BylineName-kqTBDS",
+    "description": "div.SummaryItemDek-IjVzD",
+    "rubric": "span.RubricName-gkORYq",
+    "image": "img.ResponsiveImageContainer-eNxvmU@src",
+})
+
+def fetch_article_date(article_url: str):
+    """Переходит на страницу статьи и достает <time data-testid="ContentHeaderPublishDate">; None при неудаче"""
     try:
-        r = requests.get(article_url, headers={"User-Agent": "Mozilla/5.0"}, timeout=10)
+        r = _http.get(article_url, timeout=10)
         r.raise_for_status()
-        s = BeautifulSoup(r.text, "html.parser")
+        s = _parse.soup(r.text, only='time[data-testid=ContentHeaderPublishDate]')
         time_tag = s.select_one('time[data-testid="ContentHeaderPublishDate"]')
         if time_tag and time_tag.has_attr("datetime"):
-            return parse_date(time_tag["datetime"])
+            dt = _dates.parse(time_tag["datetime"])  # ISO с часовым поясом
+            return dt.astimezone(timezone.utc) if dt else None
     except Exception as e:
         print(f"⚠️  Failed to get date from {article_url}: {e}")
-    return datetime.now(timezone.utc)
+    return None
+
+def get_article_date(article_url: str) -> datetime:
+    return fetch_article_date(article_url) or _dates.now("pitchfork")
+
+def get_article_dates(article_urls) -> dict:
+    """
+    {url: datetime}. Даты берутся из постоянного кэша (_details); на сайт
+    ходим только за новыми статьями, с паузой между запросами.
+    """
+    def fetch(urls):
+        found = {}
+        for i, article_url in enumerate(urls):
+            if i:
+                time.sleep(1)  # чтобы не перегружать сервер
+            dt = fetch_article_date(article_url)
+            found[article_url] = {"published": dt.isoformat()} if dt else None
+        return found
+
+    cached = _details.lookup_many(article_urls, fetch)
+    return {
+        u: datetime.fromisoformat(d["published"]) if d else _dates.now("pitchfork")
+        for u, d in cached.items()
+    }
 
 def generate():
     base_url = "https://pitchfork.com"
     url = f"{base_url}/features/"
-    headers = {"User-Agent": "Mozilla/5.0"}
-    response = requests.get(url, headers=headers)
+    response = _fetch.fetch(url, expect=r"SummaryItemWrapper", conditional=True)
+    if _http.unchanged(response, "../pitchfork.xml"):
+        return  # индекс не изменился (304) — лента уже актуальна
     response.raise_for_status()
 
-    soup = BeautifulSoup(response.text, "html.parser")
-    articles = soup.select("div.SummaryItemWrapper-ircKXK")
+    soup = _parse.soup(response.text, only=PARSE_ONLY)
+    articles = SPEC.items(soup)
 
-    fg = FeedGenerator()
+    fg = _feedstore.Feed('pitchfork')
     fg.id(url)
     fg.title("Pitchfork — Features")
     fg.link(href=url, rel="alternate")
@@ -45,26 +79,25 @@ def generate():
 
     print(f"📰 Found {len(articles)} articles. Fetching dates...")
 
+    entries = []
     for art in articles[:15]:  # ограничим до 15 записей
-        title_tag = art.select_one("h3.SummaryItemHedBase-hnYOxl")
-        link_tag = art.select_one("a.SummaryItemHedLink-cxRzVg")
-        author_tag = art.select_one("span.BylineName-kqTBDS")
-        desc_tag = art.select_one("div.SummaryItemDek-IjVzD")
-        rubric_tag = art.select_one("span.RubricName-gkORYq")
-        img_tag = art.select_one("img.ResponsiveImageContainer-eNxvmU")
-
-        if not (title_tag and link_tag):
+        row = SPEC.extract_item(art)
+        if row["title"] is None or row["link"] is None:
             continue
 
-        title = title_tag.get_text(strip=True)
-        link = urljoin(base_url, link_tag.get("href"))
-        author = author_tag.get_text(strip=True) if author_tag else ""
-        rubric = rubric_tag.get_text(strip=True) if rubric_tag else ""
-        description = desc_tag.get_text(strip=True) if desc_tag else ""
-        image_url = img_tag.get("src") if img_tag and img_tag.has_attr("src") else ""
+        title = row["title"]
+        link = urljoin(base_url, row["link"])
+        author = row["author"] or ""
+        rubric = row["rubric"] or ""
+        description = row["description"] or ""
+        image_url = row["image"] or ""
+
+        entries.append((title, link, author, rubric, description, image_url))
+
+    pub_dates = get_article_dates([e[1] for e in entries])
 
-        pub_date = get_article_date(link)
-        time.sleep(1)  # чтобы не перегружать сервер
+    for title, link, author, rubric, description, image_url in entries:
+        pub_date = pub_dates[link]
 
         fe = fg.add_entry()
         fe.id(link)
@@ -1,46 +1,78 @@
-import re, json, time, csv, datetime as dt
-from typing import List, Dict, Optional
-import requests
+import os, re, json, time, csv, datetime as dt
+from contextlib import ExitStack
+from typing import Iterable, Iterator, List, Dict, Optional
+from urllib.parse import urlsplit
+import httpx
 from bs4 import BeautifulSoup
 
+import _crawl
+import _deadline
+import _http
+import _metrics
+import _parse
+import _rss
+
 BASE = "https://www.reuters.com"
 
-# Основная лента и архивы по годам (при необходимости добавляй новые годы)
-INDEX_URLS = [
-    f"{BASE}/investigates/section/homepage/",
-    f"{BASE}/investigates/section/reuters-investigates-2025/",
-    f"{BASE}/investigates/section/reuters-investigates-2024/",
-    f"{BASE}/investigates/section/reuters-investigates-2023/",
-]
-
-UA = ("Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 "
-      "(KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36")
-
-session = requests.Session()
-session.headers.update({
-    "User-Agent": UA,
-    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-    "Accept-Language": "en-US,en;q=0.9",
+SITE = "reuters"  # ключ состояния обхода в _crawl
+FIRST_ARCHIVE_YEAR = 2015
+
+def index_urls(year: Optional[int] = None) -> List[str]:
+    """Основная лента и архивы reuters-investigates-<год> от текущего года до FIRST_ARCHIVE_YEAR."""
+    year = year or dt.date.today().year
+    return [f"{BASE}/investigates/section/homepage/"] + [
+        f"{BASE}/investigates/section/reuters-investigates-{y}/" for y in range(year, FIRST_ARCHIVE_YEAR - 1, -1)
+    ]
+
+INDEX_URLS = index_urls()
+
+# UA/Accept/Accept-Language берутся из общего клиента (_http.DEFAULT_HEADERS)
+HEADERS = {
     "Referer": "https://www.reuters.com/",
     "Upgrade-Insecure-Requests": "1",
-})
+}
 
-def get(url: str, tries: int = 3, sleep: float = 1.0) -> requests.Response:
+def get(url: str, tries: int = 3, sleep: float = 1.0, conditional: bool = False) -> httpx.Response:
     for i in range(tries):
-        r = session.get(url, timeout=20)
+        r = _http.get(url, headers=HEADERS, timeout=20, conditional=conditional)
         if r.status_code == 200:
             return r
         time.sleep(sleep * (i + 1))
     r.raise_for_status()
     return r  # for type checkers
 
+def get_all(urls: List[str], concurrency: int = 4, tries: int = 3, sleep: float = 1.0,
+            conditional: bool = False) -> List[Optional[httpx.Response]]:
+    """
+    Параллельный аналог get(): качает urls не больше concurrency одновременно,
+    неудачные (не 200 или ошибка сети) повторяет раундами с нарастающей паузой.
+    Возвращает ответы в порядке urls; None — если URL так и не скачался.
+    """
+    results: List[Optional[httpx.Response]] = [None] * len(urls)
+    pending = list(range(len(urls)))
+    for i in range(tries):
+        if i:
+            time.sleep(sleep * i)
+        resps = _http.get_many([urls[j] for j in pending], headers=HEADERS, timeout=20,
+                               concurrency=concurrency, conditional=conditional)
+        failed = []
+        for j, r in zip(pending, resps):
+            if isinstance(r, httpx.Response) and r.status_code == 200:
+                results[j] = r
+            else:
+                failed.append(j)
+        pending = failed
+        if not pending:
+            break
+    return results
+
 def extract_article_links_from_index(html: str) -> List[str]:
     """
     Берём все <a>, чьи href ведут на /investigates/special-report/...,
     /investigates/article/... или /investigates/story/...
     (иногда структуры меняются — поэтому берём шире с фильтром).
     """
-    soup = BeautifulSoup(html, "html.parser")
+    soup = _parse.soup(html, only="a[href]")
     links = set()
     for a in soup.find_all("a", href=True):
         href = a["href"]
@@ -60,6 +92,10 @@ def extract_article_links_from_index(html: str) -> List[str]:
                 links.add(full)
     return sorted(links)
 
+def _is_news_article(obj: Dict) -> bool:
+    t = obj.get("@type")
+    return t == "NewsArticle" or (isinstance(t, list) and "NewsArticle" in t)
+
 def pick_newsarticle_jsonld(soup: BeautifulSoup) -> Optional[Dict]:
     """
     Находим JSON-LD блок(и); возвращаем тот, где @type == NewsArticle.
@@ -72,11 +108,14 @@ def pick_newsarticle_jsonld(soup: BeautifulSoup) -> Optional[Dict]:
             continue
         candidates = data if isinstance(data, list) else [data]
         for obj in candidates:
-            t = obj.get("@type")
-            if t == "NewsArticle" or (isinstance(t, list) and "NewsArticle" in t):
+            if isinstance(obj, dict) and _is_news_article(obj):
                 return obj
     return None
 
+def pick_newsarticle_jsonld_raw(html: str) -> Optional[Dict]:
+    """То же по сырому HTML, без дерева (_parse.jsonld)."""
+    return next((obj for obj in _parse.jsonld(html) if _is_news_article(obj)), None)
+
 def normalize_authors(js: Dict) -> List[str]:
     authors = []
     a = js.get("author")
@@ -112,9 +151,31 @@ def parse_article(url: str) -> Optional[Dict]:
         r = get(url)
     except Exception:
         return None
-    soup = BeautifulSoup(r.text, "html.parser")
+    return parse_article_html(url, r.text)
+
+def parse_article_html(url: str, html: str) -> Optional[Dict]:
+    """
+    Быстрый путь: если в JSON-LD есть заголовок и articleBody, дерево не
+    строится. Иначе (промах) — полный DOM, JSON-LD из него и текст из абзацев.
+    Счётчики articles.parsed / articles.jsonld_hits / articles.parse_s
+    попадают в отчёт generate.py.
+    """
+    t0 = time.perf_counter()
+    try:
+        return _parse_article_html(url, html)
+    finally:
+        _metrics.incr("articles.parsed")
+        _metrics.incr("articles.parse_s", time.perf_counter() - t0)
+
+def _parse_article_html(url: str, html: str) -> Optional[Dict]:
+    js = pick_newsarticle_jsonld_raw(html) or {}
+    soup = None
+    if js.get("headline") and js.get("articleBody"):
+        _metrics.incr("articles.jsonld_hits")
+    else:
+        soup = _parse.soup(html)
+        js = js or pick_newsarticle_jsonld(soup) or {}
 
-    js = pick_newsarticle_jsonld(soup) or {}
     headline = js.get("headline")
     date_published = js.get("datePublished")
     date_modified = js.get("dateModified")
@@ -150,82 +211,248 @@ def parse_article(url: str) -> Optional[Dict]:
         "scraped_at": dt.datetime.utcnow().isoformat() + "Z",
     }
 
-def crawl_investigations(limit: int = 30, sleep: float = 0.8) -> List[Dict]:
+def crawl(max_fetches: int = 100, sleep: float = 0.8, concurrency: int = 4,
+          rate: Optional[float] = None) -> Dict[str, int]:
     """
-    Обходим несколько индексов /investigates/section/...,
-    собираем ссылки и парсим статьи.
+    Один шаг обхода с сохранённым состоянием (_crawl): ссылки со всех
+    индексов ставятся во фронтир, если статьи ещё нет в индексе seen; туда же
+    попадают статьи, которым пора перепроверки. Затем качается не больше
+    max_fetches статей из фронтира — сначала новые. Каждая разобранная статья
+    сразу сохраняется и снимается с фронтира: если прогон прервётся (срок,
+    429), следующий продолжит с оставшихся, а уже скачанное не повторит.
+
+    Страницы качаются параллельно (concurrency запросов одновременно), частоту
+    запросов к хосту ограничивает rate (запросов/с; по умолчанию 1/sleep).
     """
+    if rate is None:
+        rate = 1.0 / sleep if sleep > 0 else None
+    _http.set_rate_limit(urlsplit(BASE).hostname, rate)
+    started = time.time()
+
     links: List[str] = []
-    for idx_url in INDEX_URLS:
-        try:
-            idx = get(idx_url)
+    for idx in get_all(INDEX_URLS, concurrency=concurrency, conditional=True):
+        # и при 304 (тело из кэша): прошлый прогон мог прерваться до discover, а повтор ничего не дублирует
+        if idx is not None:
             links.extend(extract_article_links_from_index(idx.text))
-        except Exception:
-            continue
-    links = sorted(set(links))[:max(limit, 0)]
-
-    items: List[Dict] = []
-    for url in links:
-        item = parse_article(url)
-        if item:
-            items.append(item)
-        time.sleep(sleep)
-    return items
-
-def dump_json(items: List[Dict], path: str = "reuters_investigations.json"):
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(items, f, ensure_ascii=False, indent=2)
-    return path
+    stats = {
+        "discovered": _crawl.discover(SITE, links, started),
+        "rechecks": _crawl.schedule_rechecks(SITE, started),
+        "fetched": 0,
+        "changed": 0,
+        "failed": 0,
+    }
+
+    # Качаем пачками, чтобы в памяти не лежали сразу все HTML
+    batch = max(concurrency, 1) * 4
+    while stats["fetched"] + stats["failed"] < max_fetches:
+        urls = _crawl.next_batch(SITE, min(batch, max_fetches - stats["fetched"] - stats["failed"]), started)
+        if not urls:
+            break
+        for url, r in zip(urls, get_all(urls, concurrency=concurrency)):
+            item = parse_article_html(url, r.text) if r is not None else None
+            if item is None:
+                stats["failed"] += 1
+                _crawl.failed(SITE, url, "download failed" if r is None else "no headline")
+                continue
+            stats["fetched"] += 1
+            stats["changed"] += _crawl.done(SITE, url, item)
+    for k, v in stats.items():
+        _metrics.incr(f"crawl.{k}", v)
+    return {**stats, **_crawl.stats(SITE)}
+
+def iter_investigations(limit: int = 30, sleep: float = 0.8, concurrency: int = 4,
+                        rate: Optional[float] = None) -> Iterator[Dict]:
+    """
+    crawl() не больше чем на limit статей, затем limit самых свежих статей из
+    индекса (по datePublished) — по одной, без сети.
+    """
+    crawl(max_fetches=limit, sleep=sleep, concurrency=concurrency, rate=rate)
+    yield from _crawl.items(SITE, limit)
 
-def dump_csv(items: List[Dict], path: str = "reuters_investigations.csv"):
-    fields = ["url","headline","description","authors","section","image",
+def crawl_investigations(limit: int = 30, sleep: float = 0.8, concurrency: int = 4,
+                         rate: Optional[float] = None) -> List[Dict]:
+    return list(iter_investigations(limit=limit, sleep=sleep, concurrency=concurrency, rate=rate))
+
+# --- Выходные файлы ---
+JSON_PATH = "reuters_investigations.json"
+JSONL_PATH = "reuters_investigations.jsonl"
+CSV_PATH = "reuters_investigations.csv"
+RSS_PATH = "reuters.xml"
+CSV_FIELDS = ["url","headline","description","authors","section","image",
               "date_published","date_modified","scraped_at","body"]
-    with open(path, "w", encoding="utf-8", newline="") as f:
-        w = csv.DictWriter(f, fieldnames=fields)
-        w.writeheader()
+
+class _Sink:
+    """
+    Выход, в который статьи пишутся по одной: файл path + ".tmp", который
+    подменяет path только при успешном выходе из with (как _rss.RssWriter) —
+    прерванный прогон оставляет прежний файл.
+    """
+    newline = None
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+
+    def __enter__(self):
+        _deadline.check()
+        self.f = open(self.path + ".tmp", "w", encoding="utf-8", newline=self.newline)
+        self.begin()
+        return self
+
+    def begin(self) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+    def write(self, it: Dict) -> None:
+        with _metrics.phase("write"):
+            self._write(it)
+        self.count += 1
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        with _metrics.phase("write"):
+            try:
+                if exc_type is None:
+                    self.end()
+            finally:
+                self.f.close()
+            if exc_type is None:
+                os.replace(self.path + ".tmp", self.path)
+            else:
+                os.unlink(self.path + ".tmp")
+
+class JsonlSink(_Sink):
+    def _write(self, it: Dict) -> None:
+        self.f.write(json.dumps(it, ensure_ascii=False) + "\n")
+
+class JsonArraySink(_Sink):
+    """Массив JSON байт в байт как json.dump(items, indent=2), но по одной статье."""
+
+    def begin(self) -> None:
+        self.f.write("[")
+
+    def _write(self, it: Dict) -> None:
+        body = json.dumps(it, ensure_ascii=False, indent=2).replace("\n", "\n  ")
+        self.f.write(("," if self.count else "") + "\n  " + body)
+
+    def end(self) -> None:
+        self.f.write("\n]" if self.count else "]")
+
+class CsvSink(_Sink):
+    newline = ""
+
+    def begin(self) -> None:
+        self.w = csv.writer(self.f)
+        self.w.writerow(CSV_FIELDS)
+
+    def _write(self, it: Dict) -> None:
+        self.w.writerow([", ".join(it.get("authors", []) or []) if k == "authors" else it.get(k)
+                         for k in CSV_FIELDS])
+
+def dump_json(items: List[Dict], path: str = JSON_PATH):
+    with JsonArraySink(path) as sink:
         for it in items:
-            row = it.copy()
-            row["authors"] = ", ".join(row.get("authors", []) or [])
-            w.writerow(row)
+            sink.write(it)
     return path
 
-# --- (опционально) RSS ---
-def build_rss(items: List[Dict], path: str = "reuters.xml",
-              feed_title="Reuters Investigations (unofficial)",
-              feed_link=f"{BASE}/investigates/section/homepage/",
-              feed_desc="Unofficial feed of Reuters Investigations scraped for personal use."):
+def dump_csv(items: List[Dict], path: str = CSV_PATH):
+    with CsvSink(path) as sink:
+        for it in items:
+            sink.write(it)
+    return path
+
+# --- RSS ---
+FEED_TITLE = "Reuters Investigations (unofficial)"
+FEED_LINK = f"{BASE}/investigates/section/homepage/"
+FEED_DESC = "Unofficial feed of Reuters Investigations scraped for personal use."
+
+def _pubdate(it: Dict) -> Optional[dt.datetime]:
+    # Как раньше с feedgen: дата без часового пояса в ленту не попадает
     try:
-        from feedgen.feed import FeedGenerator
-    except ImportError:
-        print("pip install feedgen для RSS")
+        d = dt.datetime.fromisoformat((it.get("date_published") or "").replace("Z",""))
+    except ValueError:
         return None
-    fg = FeedGenerator()
-    fg.id(feed_link)
-    fg.title(feed_title)
-    fg.link(href=feed_link, rel="alternate")
-    fg.language("en")
-    fg.description(feed_desc)
-
-    for it in items:
-        fe = fg.add_entry()
-        fe.id(it["url"])
-        fe.title(it["headline"])
-        fe.link(href=it["url"])
-        if it.get("description"):
-            fe.description(it["description"])
-        try:
-            dt_pub = dt.datetime.fromisoformat((it.get("date_published") or "").replace("Z",""))
-            fe.pubDate(dt_pub)
-        except Exception:
-            pass
-        fe.content(it.get("body") or "")
-    fg.rss_str(pretty=True)
-    fg.rss_file(path)
+    return d if d.tzinfo is not None else None
+
+def rss_item(w: _rss.RssWriter, it: Dict) -> None:
+    w.item(
+        title=it["headline"],
+        link=it["url"],
+        guid=it["url"],
+        description=it.get("description") or None,
+        content=it.get("body") or "",
+        pubdate=_pubdate(it),
+    )
+
+def build_rss(items: List[Dict], path: str = RSS_PATH,
+              feed_title=FEED_TITLE, feed_link=FEED_LINK, feed_desc=FEED_DESC):
+    """
+    Пишет ленту потоково (_rss.RssWriter): полные тексты статей не собираются
+    в одно lxml-дерево. Порядок — как у feedgen (add_entry добавлял в начало),
+    поэтому items идут с конца.
+    """
+    with _rss.RssWriter(path, title=feed_title, link=feed_link, description=feed_desc, language="en") as w:
+        for it in reversed(items):
+            rss_item(w, it)
     return path
 
+def previous_keys(jsonl_path: str = JSONL_PATH, json_path: str = JSON_PATH) -> set:
+    """(url, date_modified) статей прошлого прогона: из JSONL построчно, иначе из JSON."""
+    try:
+        with open(jsonl_path, encoding="utf-8") as f:
+            return {(it.get("url"), it.get("date_modified")) for it in map(json.loads, f)}
+    except (OSError, ValueError):
+        pass
+    try:
+        with open(json_path, encoding="utf-8") as f:
+            return {(it.get("url"), it.get("date_modified")) for it in json.load(f)}
+    except (OSError, ValueError):
+        return set()
+
+def write_outputs(items: Iterable[Dict], jsonl_path: str = JSONL_PATH, json_path: str = JSON_PATH,
+                  csv_path: str = CSV_PATH, rss_path: str = RSS_PATH,
+                  last_build: Optional[dt.datetime] = None) -> Dict[str, int]:
+    """
+    Один проход: каждая статья сразу уходит в JSONL, JSON, CSV и RSS, список
+    статей не копится — память ограничена текущей статьёй (и пачкой HTML,
+    которую качает iter_investigations). Статьи в ленте идут в порядке
+    поступления. Все файлы подменяются только после успешного обхода.
+    Возвращает {"items": …, "changed": …} — changed считается по (url,
+    dateModified) прошлого прогона, для _schedule. last_build — lastBuildDate
+    ленты (см. _rss.RssWriter).
+    """
+    old = previous_keys(jsonl_path, json_path)
+    stats = {"items": 0, "changed": 0}
+    with ExitStack() as stack:
+        sinks = [stack.enter_context(JsonlSink(jsonl_path)),
+                 stack.enter_context(JsonArraySink(json_path)),
+                 stack.enter_context(CsvSink(csv_path))]
+        rss = stack.enter_context(_rss.RssWriter(rss_path, title=FEED_TITLE, link=FEED_LINK,
+                                                 description=FEED_DESC, language="en",
+                                                 last_build=last_build))
+        for it in items:
+            for sink in sinks:
+                sink.write(it)
+            rss_item(rss, it)
+            stats["items"] += 1
+            stats["changed"] += (it.get("url"), it.get("date_modified")) not in old
+    return stats
+
+def generate(limit: int = 40, max_fetches: int = 100):
+    crawled = crawl(max_fetches=max_fetches, concurrency=4, rate=4.0)
+    changed = _crawl.last_changed(SITE, limit)
+    stats = write_outputs(_crawl.items(SITE, limit),
+                          last_build=dt.datetime.fromtimestamp(changed, dt.timezone.utc) if changed else None)
+    print(f"Collected {stats['items']} items (fetched {crawled['fetched']}, changed {crawled['changed']}, "
+          f"failed {crawled['failed']}; known {crawled['seen']}, left in frontier {crawled['frontier']})")
+    _metrics.incr("items.changed", stats["changed"])  # для _schedule
+
 if __name__ == "__main__":
-    items = crawl_investigations(limit=40, sleep=0.8)
-    print(f"Collected {len(items)} items")
-    dump_json(items)
-    dump_csv(items)
-    build_rss(items)
+    import argparse
+    ap = argparse.ArgumentParser(description="Reuters Investigations → JSONL, JSON, CSV and RSS.")
+    ap.add_argument("--limit", type=int, default=40, help="Newest articles to write (default: 40)")
+    ap.add_argument("--max-fetches", type=int, default=100,
+                    help="Max article downloads this run; the rest stays in the frontier (default: 100)")
+    args = ap.parse_args()
+    generate(limit=args.limit, max_fetches=args.max_fetches)
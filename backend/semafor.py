@@ -1,23 +1,19 @@
-import requests
-from bs4 import BeautifulSoup
-from feedgen.feed import FeedGenerator
-from datetime import datetime, timezone
+import _dates
+import _fetch
+import _http
+import _parse
+import _feedstore
 import re
 
-def parse_semafor_date_from_url(url: str) -> datetime:
-    m = re.search(r'/(\d{2})/(\d{2})/(\d{4})/', url)
-    if m:
-        month, day, year = map(int, m.groups())
-        return datetime(year, month, day, 12, 0, tzinfo=timezone.utc)
-    return datetime.now(timezone.utc)
-
 def generate():
     url = 'https://www.semafor.com/vertical/media'
-    response = requests.get(url)
+    response = _fetch.fetch(url, expect=r'/article/\d{2}/\d{2}/\d{4}/', conditional=True)
+    if _http.unchanged(response, 'semafor.xml'):
+        return  # индекс не изменился (304) — лента уже актуальна
     response.encoding = 'utf-8'
-    soup = BeautifulSoup(response.text, 'html.parser')
+    soup = _parse.soup(response.text)
 
-    fg = FeedGenerator()
+    fg = _feedstore.Feed('semafor')
     fg.title('Semafor — Media')
     fg.link(href=url, rel='alternate')
     fg.description('Latest media stories from Semafor')
@@ -52,7 +48,7 @@ def generate():
             description = intro_div.get_text(strip=True)
 
         # Дата из url
-        pub_date = parse_semafor_date_from_url(link)
+        pub_date = _dates.from_url_or_now(link, 'semafor', order='mdy')
 
         fe = fg.add_entry()
         fe.title(title)
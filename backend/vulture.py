@@ -1,58 +1,22 @@
-import requests
-from bs4 import BeautifulSoup
-from feedgen.feed import FeedGenerator
-from datetime import datetime, timezone
+import _dates
+import _fetch
+import _http
+import _parse
+import _feedstore
 import re
 
-# Словари для месяцев
-MONTHS_RU = {
-    'января': 1, 'февраля': 2, 'марта': 3, 'апреля': 4, 'мая': 5, 'июня': 6,
-    'июля': 7, 'августа': 8, 'сентября': 9, 'октября': 10, 'ноября': 11, 'декабря': 12,
-}
-MONTHS_EN = {
-    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
-    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12,
-}
-
-def parse_date(date_str: str) -> datetime:
-    """
-    Поддержка форматов:
-      - 'July 18, 2025'
-      - 'Feb. 26, 2024'
-      - '11 июля, 2025, 17:21' (оставлено на будущее)
-    """
-    date_str = date_str.strip()
-    # Английский формат 'July 18, 2025' или 'Feb. 26, 2024'
-    match = re.match(r'([A-Za-z]+)\.?\s+(\d{1,2}),\s+(\d{4})', date_str)
-    if match:
-        month_raw = match.group(1).lower()[:3]
-        month = MONTHS_EN.get(month_raw)
-        if month:
-            day = int(match.group(2))
-            year = int(match.group(3))
-            return datetime(year, month, day, 12, 0, tzinfo=timezone.utc)
-    # Русский формат (оставлен на случай других лент)
-    match = re.match(
-        r"(\d{1,2})\s+([а-яА-ЯёЁ]+)[,]?\s*(\d{4})[,]?\s*(\d{1,2})?:?(\d{2})?",
-        date_str
-    )
-    if match:
-        day = int(match.group(1))
-        month = MONTHS_RU.get(match.group(2).lower())
-        year = int(match.group(3))
-        hour = int(match.group(4) or 12)
-        minute = int(match.group(5) or 0)
-        return datetime(year, month, day, hour, minute, tzinfo=timezone.utc)
-    print(f"[WARN] Не удалось распарсить дату: '{date_str}'")
-    return datetime.now(timezone.utc)
+# Поддерево со статьями — остальная страница не разбирается (см. _parse.soup)
+PARSE_ONLY = 'ol.paginated-feed-list-wrapper'
 
 def generate():
     url = 'https://www.vulture.com/tags/profile/'
-    response = requests.get(url)
+    response = _fetch.fetch(url, expect=r'paginated-feed-list-wrapper', conditional=True)
+    if _http.unchanged(response, 'vulture.xml'):
+        return  # индекс не изменился (304) — лента уже актуальна
     response.encoding = 'utf-8'
-    soup = BeautifulSoup(response.text, 'html.parser')
+    soup = _parse.soup(response.text, only=PARSE_ONLY)
 
-    fg = FeedGenerator()
+    fg = _feedstore.Feed('vulture')
     fg.title('Vulture — Profile')
     fg.link(href=url, rel='alternate')
     fg.description('Latest profiles from Vulture')
@@ -72,7 +36,8 @@ def generate():
         # Date
         date_tag = art.select_one('time.paginate-time')
         date_str = date_tag.get_text(strip=True) if date_tag else None
-        pub_date = parse_date(date_str) if date_str else datetime.now(timezone.utc)
+        # 'July 18, 2025', 'Feb. 26, 2024'; время на сайте не указано — полдень, как раньше
+        pub_date = _dates.parse_or_now(date_str, 'vulture', default_hour=12)
 
         # Description
         teaser_tag = art.select_one('.teaser')
@@ -1,68 +1,98 @@
-import requests
-from bs4 import BeautifulSoup
-from feedgen.feed import FeedGenerator
-from datetime import datetime, timezone
+import _dates
+import _details
+import _extract
+import _fetch
+import _http
+import _parse
+import _feedstore
+from datetime import datetime
+
+# Поддерево со статьями — остальная страница не разбирается (см. _parse.soup)
+PARSE_ONLY = "div.SummaryItemWrapper-ircKXK"
+
+# Карточка статьи на индексе (см. _extract.Spec)
+SPEC = _extract.Spec(PARSE_ONLY, {
+    "title": "a.SummaryItemHedLink-cxRzVg",
+    "link": "a.SummaryItemHedLink-cxRzVg@href",
+    "description": "div.summary-item__dek",
+    "author": "span.BylineName-kqTBDS",
+    "image": "img.responsive-image__image@src",
+})
 
 def parse_wired_date(date_str):
     # Поддержка двух форматов: "07.23.2025 07:00 AM" и "Mar 25, 2025 6:00 AM"
-    for fmt in ("%m.%d.%Y %I:%M %p", "%b %d, %Y %I:%M %p"):
-        try:
-            return datetime.strptime(date_str, fmt).replace(tzinfo=timezone.utc)
-        except Exception:
-            continue
-    print(f"[WARN] Не удалось распарсить дату: {date_str}")
+    dt = _dates.parse(date_str)
+    if dt is None:
+        print(f"[WARN] Не удалось распарсить дату: {date_str}")
+    return dt
+
+def extract_pubdate(html):
+    soup = _parse.soup(html, only="time")
+    # Первый вариант: <time data-testid="PublishedTimestamp">...</time>
+    time_tag = soup.find("time", attrs={"data-testid": "PublishedTimestamp"})
+    # Второй вариант: просто <time>
+    if not time_tag:
+        time_tag = soup.find("time")
+    if time_tag and time_tag.text.strip():
+        return parse_wired_date(time_tag.text.strip())
     return None
 
 def get_article_pubdate(article_url):
     try:
-        resp = requests.get(article_url, timeout=10)
-        soup = BeautifulSoup(resp.text, "html.parser")
-        # Первый вариант: <time data-testid="PublishedTimestamp">...</time>
-        time_tag = soup.find("time", attrs={"data-testid": "PublishedTimestamp"})
-        # Второй вариант: просто <time>
-        if not time_tag:
-            time_tag = soup.find("time")
-        if time_tag and time_tag.text.strip():
-            dt = parse_wired_date(time_tag.text.strip())
-            if dt:
-                return dt
+        return extract_pubdate(_http.get(article_url, timeout=10).text)
     except Exception as ex:
         print(f"[WARN] Не удалось получить дату из {article_url}: {ex}")
     return None
 
+def get_article_pubdates(article_urls):
+    """
+    {url: datetime | None}. Даты берутся из постоянного кэша (_details); из сети
+    параллельно качаются только статьи, которых там ещё нет.
+    """
+    def fetch(urls):
+        found = {}
+        for article_url, resp in zip(urls, _http.get_many(urls, timeout=10)):
+            if isinstance(resp, Exception):
+                print(f"[WARN] Не удалось получить дату из {article_url}: {resp}")
+                continue
+            dt = extract_pubdate(resp.text)
+            found[article_url] = {"published": dt.isoformat()} if dt else None
+        return found
+
+    cached = _details.lookup_many(article_urls, fetch)
+    return {
+        u: datetime.fromisoformat(d["published"]) if d else None
+        for u, d in cached.items()
+    }
+
 def generate():
     url = "https://www.wired.com/category/big-story/"
-    response = requests.get(url)
-    soup = BeautifulSoup(response.text, "html.parser")
+    response = _fetch.fetch(url, expect=r"SummaryItemWrapper", conditional=True)
+    if _http.unchanged(response, "wired.xml"):
+        return  # индекс не изменился (304) — лента уже актуальна
+    soup = _parse.soup(response.text, only=PARSE_ONLY)
 
-    fg = FeedGenerator()
+    fg = _feedstore.Feed('wired')
     fg.title("WIRED — Big Story")
     fg.link(href=url, rel="alternate")
     fg.description("Big stories from WIRED magazine")
     fg.language("en")
 
-    articles = soup.select("div.SummaryItemWrapper-ircKXK")
-
-    for art in articles:
-        a_tag = art.select_one("a.SummaryItemHedLink-cxRzVg")
-        if not a_tag:
+    items = []
+    for row in SPEC.extract(soup):
+        title, link = row["title"], row["link"]
+        if title is None or not link:
             continue
-        title = a_tag.get_text(strip=True)
-        link = a_tag["href"]
-        if link and not link.startswith("http"):
+        if not link.startswith("http"):
             link = "https://www.wired.com" + link
 
-        desc_tag = art.select_one("div.summary-item__dek")
-        description = desc_tag.get_text(strip=True) if desc_tag else ""
-
-        author_tag = art.select_one("span.BylineName-kqTBDS")
-        author = author_tag.get_text(strip=True) if author_tag else ""
+        items.append((title, link, row["description"] or "", row["author"] or "", row["image"]))
 
-        img_tag = art.select_one("img.responsive-image__image")
-        img_url = img_tag["src"] if img_tag and img_tag.has_attr("src") else None
+    # Получаем pubDate со страниц самих статей (все запросы идут параллельно)
+    pub_dates = get_article_pubdates([it[1] for it in items])
 
-        # Получаем pubDate со страницы самой статьи!
-        pub_date = get_article_pubdate(link)
+    for title, link, description, author, img_url in items:
+        pub_date = pub_dates.get(link)
         if not pub_date:
             print(f"[WARN] Не удалось получить дату для {link}")
             continue
@@ -1,30 +1,20 @@
-from playwright.sync_api import sync_playwright
-from bs4 import BeautifulSoup
-from feedgen.feed import FeedGenerator
-from datetime import datetime, timezone
+import _dates
+import _fetch
+import _parse
+import _feedstore
 import re
 import os
 
-def parse_wp_date_from_url(url: str) -> datetime:
-    m = re.search(r'/investigations/(\d{4})/(\d{2})/(\d{2})/', url)
-    if m:
-        year, month, day = map(int, m.groups())
-        return datetime(year, month, day, 12, 0, tzinfo=timezone.utc)
-    return datetime.now(timezone.utc)
-
 def generate():
     url = "https://www.washingtonpost.com/national/investigations/"
 
-    with sync_playwright() as p:
-        browser = p.firefox.launch(headless=True)
-        page = browser.new_page()
-        page.goto(url, timeout=60000, wait_until="domcontentloaded")
-        html = page.content()
-        browser.close()
+    # Сначала обычный HTTP; браузер (общий на все секции WaPo) — только если
+    # сайт отдал заглушку или в HTML нет ссылок на статьи
+    html = _fetch.fetch(url, expect=r'/investigations/\d{4}/\d{2}/\d{2}/', wait_for='a[href*="/investigations/20"]', timeout=60).text
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = _parse.soup(html)
 
-    fg = FeedGenerator()
+    fg = _feedstore.Feed('wapo_inv')
     fg.title("Washington Post — Investigations")
     fg.link(href=url, rel="alternate")
     fg.description("Latest investigations from Washington Post")
@@ -48,7 +38,7 @@ def generate():
         desc_tag = link_tag.find_parent().find_next_sibling("p")
         description = desc_tag.get_text(strip=True) if desc_tag else ""
 
-        pub_date = parse_wp_date_from_url(link)
+        pub_date = _dates.from_url_or_now(link, 'wapo_inv')
 
         fe = fg.add_entry()
         fe.title(title)
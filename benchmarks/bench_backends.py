@@ -0,0 +1,184 @@
+"""
+Офлайн-бенчмарк пути «разбор → лента» для каждого бэкенда.
+
+Бэкенды копируются во временный каталог (их выходные файлы не трогают репозиторий)
+и запускаются как обычно, но общий HTTP-клиент (_http) подменяется на
+httpx.MockTransport, который отдаёт страницы из benchmarks/fixtures/. Сеть и
+браузер не нужны: для WaPo фикстура — это то, что вернул бы page.content().
+
+Для каждого бэкенда печатаются ops/s, сборки мусора поколения 0 за операцию
+(давление аллокаций), прирост живых блоков памяти и пик памяти (tracemalloc).
+Результат сравнивается с benchmarks/baseline.json; регрессия больше --threshold
+даёт код выхода 1.
+
+    python benchmarks/bench_backends.py                  # прогон и сравнение
+    python benchmarks/bench_backends.py --save-baseline  # записать новую базу
+    python benchmarks/bench_backends.py wired reuters    # только выбранные
+"""
+from __future__ import annotations
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import re
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+FIXTURES = HERE / "fixtures"
+BASELINE = HERE / "baseline.json"
+
+# Копия backend/ во временном каталоге: ../*.xml у pitchfork и WaPo попадут туда же
+WORKDIR = Path(tempfile.mkdtemp(prefix="bench_backends_"))
+BACKEND = WORKDIR / "backend"
+shutil.copytree(HERE.parent / "backend", BACKEND, ignore=shutil.ignore_patterns("__pycache__", "*.xml", "*.json", "*.csv"))
+os.environ["PARSER_CACHE_DIR"] = str(WORKDIR / "cache")
+sys.path.insert(0, str(BACKEND))
+
+import httpx  # noqa: E402
+
+import _fetch  # noqa: E402
+import _http  # noqa: E402
+
+# Порядок важен: сначала конкретные индексы, потом шаблоны статей
+ROUTES = [
+    (r"theatlantic\.com/category/features", "atlantic_index.html"),
+    (r"gq\.com/about/profiles", "gq_index.html"),
+    (r"newyorker\.com/magazine/reporting", "newyorker_index.html"),
+    (r"nytimes\.com/international/section/magazine", "nyt_index.html"),
+    (r"semafor\.com/vertical/media", "semafor_index.html"),
+    (r"vulture\.com/tags/profile", "vulture_index.html"),
+    (r"wired\.com/category/big-story", "wired_index.html"),
+    (r"wired\.com/story/", "wired_article.html"),
+    (r"pitchfork\.com/features", "pitchfork_index.html"),
+    (r"pitchfork\.com/story/", "pitchfork_article.html"),
+    (r"washingtonpost\.com/national/investigations", "wp_inv_index.html"),
+    (r"washingtonpost\.com/personal-tech/$", "wp_tech_index.html"),
+    (r"washingtonpost\.com/internet-culture/$", "wp_internet_index.html"),
+    (r"reuters\.com/investigates/section/", "reuters_index.html"),
+    (r"reuters\.com/investigates/", "reuters_article.html"),
+]
+_ROUTES = [(re.compile(p), name) for p, name in ROUTES]
+_PAGES: dict[str, bytes] = {}
+
+def _serve(request: httpx.Request) -> httpx.Response:
+    url = str(request.url)
+    for rx, name in _ROUTES:
+        if rx.search(url):
+            if name not in _PAGES:
+                _PAGES[name] = (FIXTURES / name).read_bytes()
+            return httpx.Response(200, headers={"content-type": "text/html; charset=utf-8"},
+                                  content=_PAGES[name])
+    return httpx.Response(404, content=b"no fixture")
+
+def install_fixture_transport() -> None:
+    _http._client = httpx.AsyncClient(transport=httpx.MockTransport(_serve),
+                                      headers=_http.DEFAULT_HEADERS, follow_redirects=True)
+
+def _reuters_op(mod):
+    import _crawl
+    import _store
+
+    def op():
+        # состояние обхода переживает прогоны: без сброса со второй операции качать было бы нечего
+        conn = _store.connect(_crawl.DB_NAME, _crawl.SCHEMA)
+        for table in ("frontier", "seen"):
+            conn.execute(f"DELETE FROM {table} WHERE site = ?", (mod.SITE,))
+        mod.write_outputs(mod.iter_investigations(limit=30, concurrency=4, rate=0))
+    return op
+
+BACKENDS = ["atlantic", "gq", "newyorker", "nyt", "nytmag", "pitchfork", "reuters", "semafor",
+            "vulture", "wired", "wp_internet", "wp_inv", "wp_tech"]
+CUSTOM_OPS = {"reuters": _reuters_op}
+
+def bench(name: str, min_time: float) -> dict:
+    import importlib
+    mod = importlib.import_module(name)
+    backend_op = CUSTOM_OPS.get(name, lambda m: m.generate)(mod)
+
+    def op():
+        _fetch.new_run()  # каждая операция — отдельный прогон, без общих загрузок
+        backend_op()
+    sink = io.StringIO()
+    with contextlib.redirect_stdout(sink):
+        op()  # прогрев: импорты, кэш дат статей (_details) — как в обычном часовом прогоне
+        times = []
+        gc0 = gc.get_stats()[0]["collections"]
+        blocks = sys.getallocatedblocks()
+        t_end = time.perf_counter() + min_time
+        while not times or time.perf_counter() < t_end:
+            t0 = time.perf_counter()
+            op()
+            times.append(time.perf_counter() - t0)
+        n = len(times)
+        gc0 = (gc.get_stats()[0]["collections"] - gc0) / n
+        blocks = (sys.getallocatedblocks() - blocks) / n
+        tracemalloc.start()
+        op()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return {
+        "ops_per_s": round(1.0 / statistics.median(times), 2),
+        "median_ms": round(statistics.median(times) * 1000, 2),
+        "runs": n,
+        "gc0_per_op": round(gc0, 1),
+        "net_blocks_per_op": round(blocks),
+        "peak_kb": peak // 1024,
+    }
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    problems = []
+    for name, r in results.items():
+        b = baseline.get(name)
+        if not b:
+            continue
+        if r["ops_per_s"] < b["ops_per_s"] * (1 - threshold):
+            problems.append(f"{name}: ops/s {b['ops_per_s']} → {r['ops_per_s']}")
+        if r["peak_kb"] > b["peak_kb"] * (1 + threshold):
+            problems.append(f"{name}: peak {b['peak_kb']} KB → {r['peak_kb']} KB")
+    return problems
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("backends", nargs="*", default=BACKENDS)
+    ap.add_argument("--min-time", type=float, default=1.0, help="Seconds of measured runs per backend")
+    ap.add_argument("--threshold", type=float, default=0.25, help="Allowed regression vs baseline (0.25 = 25%%)")
+    ap.add_argument("--save-baseline", action="store_true")
+    args = ap.parse_args()
+
+    install_fixture_transport()
+    os.chdir(BACKEND)
+    results = {}
+    print(f"{'backend':<12} {'ops/s':>8} {'ms':>8} {'gc0/op':>7} {'blocks/op':>10} {'peak KB':>8}")
+    try:
+        for name in args.backends:
+            r = results[name] = bench(name, args.min_time)
+            print(f"{name:<12} {r['ops_per_s']:>8} {r['median_ms']:>8} {r['gc0_per_op']:>7} "
+                  f"{r['net_blocks_per_op']:>10} {r['peak_kb']:>8}")
+    finally:
+        os.chdir(HERE)
+        shutil.rmtree(WORKDIR, ignore_errors=True)
+
+    if args.save_baseline:
+        stored = json.loads(BASELINE.read_text(encoding="utf-8")) if BASELINE.exists() else {}
+        stored.update(results)
+        BASELINE.write_text(json.dumps(dict(sorted(stored.items())), indent=2) + "\n", encoding="utf-8")
+        print(f"\nBaseline saved: {BASELINE}")
+        return 0
+    if not BASELINE.exists():
+        print("\nNo baseline yet (run with --save-baseline).")
+        return 0
+    problems = compare(results, json.loads(BASELINE.read_text(encoding="utf-8")), args.threshold)
+    for p in problems:
+        print(f"REGRESSION {p}")
+    return 1 if problems else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,157 @@
+"""
+Пропускная способность разбора дат: прежние функции бэкендов против _dates.
+
+Корпус — benchmarks/fixtures/dates.tsv (источник и строка в форматах, которые
+встречаются на сайтах; для nyt/semafor/wapo — URL статьи). Каждый проход
+разбирает корпус целиком, как это делает часовой прогон всех бэкендов:
+  legacy    — функции, как они были написаны в бэкендах (strptime в try/except и т. д.);
+  _dates    — без memo (parse.__wrapped__): fromisoformat и скомпилированные шаблоны;
+  memo      — обычный _dates.parse с lru_cache (строки повторяются между прогонами).
+Результаты сверяются со старыми функциями.
+
+    python benchmarks/bench_dates.py --repeat 50
+"""
+from __future__ import annotations
+import argparse
+import re
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent / "backend"))
+
+import _dates  # noqa: E402
+
+# --- прежние реализации (до _dates) ---
+MONTHS_EN = _dates.MONTHS_EN
+MONTHS_RU = _dates.MONTHS_RU
+
+def legacy_iso(s):  # atlantic
+    try:
+        return datetime.fromisoformat(s.replace('Z', '+00:00'))
+    except Exception:
+        return None
+
+def legacy_pitchfork(s):
+    try:
+        return datetime.fromisoformat(s).astimezone(timezone.utc)
+    except Exception:
+        return None
+
+def legacy_month_name(s):  # gq, newyorker
+    try:
+        return datetime.strptime(s.strip(), "%B %d, %Y").replace(tzinfo=timezone.utc)
+    except Exception:
+        return None
+
+def legacy_vulture(s):
+    s = s.strip()
+    m = re.match(r'([A-Za-z]+)\.?\s+(\d{1,2}),\s+(\d{4})', s)
+    if m:
+        month = MONTHS_EN.get(m.group(1).lower()[:3])
+        if month:
+            return datetime(int(m.group(3)), month, int(m.group(2)), 12, 0, tzinfo=timezone.utc)
+    m = re.match(r"(\d{1,2})\s+([а-яА-ЯёЁ]+)[,]?\s*(\d{4})[,]?\s*(\d{1,2})?:?(\d{2})?", s)
+    if m:
+        return datetime(int(m.group(3)), MONTHS_RU.get(m.group(2).lower()), int(m.group(1)),
+                        int(m.group(4) or 12), int(m.group(5) or 0), tzinfo=timezone.utc)
+    return None
+
+def legacy_wired(s):
+    for fmt in ("%m.%d.%Y %I:%M %p", "%b %d, %Y %I:%M %p"):
+        try:
+            return datetime.strptime(s, fmt).replace(tzinfo=timezone.utc)
+        except Exception:
+            continue
+    return None
+
+def legacy_url(pattern, order):
+    rx = pattern
+
+    def parse(url):
+        m = re.search(rx, url)
+        if not m:
+            return None
+        a, b, c = map(int, m.groups())
+        y, mo, d = (c, a, b) if order == "mdy" else (a, b, c)
+        return datetime(y, mo, d, 12, 0, tzinfo=timezone.utc)
+    return parse
+
+# источник → (прежняя функция, та же операция через _dates с кэшем / без)
+def _new(parse):
+    return {
+        "atlantic": lambda s: parse(s),
+        "pitchfork": lambda s: (lambda d: d.astimezone(timezone.utc) if d else None)(parse(s)),
+        "gq": lambda s: parse(s),
+        "newyorker": lambda s: parse(s),
+        "vulture": lambda s: parse(s, 12),
+        "ru": lambda s: parse(s, 12),
+        "wired": lambda s: parse(s),
+        "nyt": lambda s: _dates.from_url(s),
+        "semafor": lambda s: _dates.from_url(s, "mdy"),
+        "wapo": lambda s: _dates.from_url(s),
+    }
+
+LEGACY = {
+    "atlantic": legacy_iso,
+    "pitchfork": legacy_pitchfork,
+    "gq": legacy_month_name,
+    "newyorker": legacy_month_name,
+    "vulture": legacy_vulture,
+    "ru": legacy_vulture,
+    "wired": legacy_wired,
+    "nyt": legacy_url(r'/(\d{4})/(\d{2})/(\d{2})/', "ymd"),
+    "semafor": legacy_url(r'/(\d{2})/(\d{2})/(\d{4})/', "mdy"),
+    "wapo": legacy_url(r'(\d{4})[/-](\d{2})[/-](\d{2})', "ymd"),
+}
+
+def load(path: Path) -> list[tuple[str, str]]:
+    rows = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        if line and not line.startswith("#"):
+            src, s = line.split("\t", 1)
+            rows.append((src, s))
+    return rows
+
+def throughput(rows, table, repeat: int, before=None) -> float:
+    calls = [(table[src], s) for src, s in rows]
+    times = []
+    for _ in range(repeat):
+        if before:
+            before()
+        t0 = time.perf_counter()
+        for fn, s in calls:
+            fn(s)
+        times.append(time.perf_counter() - t0)
+    return len(calls) / statistics.median(times)
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--corpus", type=Path, default=HERE / "fixtures" / "dates.tsv")
+    ap.add_argument("--repeat", type=int, default=50)
+    args = ap.parse_args()
+
+    rows = load(args.corpus)
+    memo = _new(_dates.parse)
+    plain = _new(_dates.parse.__wrapped__)
+    mismatches = [(src, s) for src, s in rows if LEGACY[src](s) != memo[src](s)]
+    for src, s in mismatches:
+        print(f"MISMATCH {src}: {s!r}: {LEGACY[src](s)} != {memo[src](s)}")
+
+    results = [
+        ("legacy", throughput(rows, LEGACY, args.repeat)),
+        ("_dates", throughput(rows, plain, args.repeat)),
+        ("memo (cold)", throughput(rows, memo, args.repeat, before=_dates.parse.cache_clear)),
+        ("memo (warm)", throughput(rows, memo, args.repeat)),
+    ]
+    print(f"{len(rows)} строк, {len({s for _, s in rows})} уникальных")
+    base = results[0][1]
+    for label, per_s in results:
+        print(f"{label:<12} {per_s:>12,.0f} строк/с  x{per_s / base:.1f}")
+    return 1 if mismatches else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
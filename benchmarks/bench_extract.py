@@ -0,0 +1,109 @@
+"""
+Извлечение полей карточек: прежний код (select_one на каждое поле) против
+_extract.Spec (селекторы скомпилированы заранее, один обход карточки).
+
+Для wired, gq, pitchfork и newyorker берётся фикстура индекса, дерево строится
+один раз, затем замеряется время на одну карточку в обоих вариантах. Результаты
+обоих вариантов сравниваются поле в поле.
+
+    python benchmarks/bench_extract.py --repeat 20
+"""
+from __future__ import annotations
+import argparse
+import importlib
+import statistics
+import sys
+import time
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent / "backend"))
+
+import _parse  # noqa: E402
+
+def _text(tag):
+    return tag.get_text(strip=True) if tag else None
+
+def _attr(tag, name):
+    return tag[name] if tag and tag.has_attr(name) else None
+
+# Извлечение полей так, как оно было написано в бэкендах до перехода на _extract
+def legacy_wired(art):
+    a_tag = art.select_one("a.SummaryItemHedLink-cxRzVg")
+    return {
+        "title": _text(a_tag),
+        "link": _attr(a_tag, "href"),
+        "description": _text(art.select_one("div.summary-item__dek")),
+        "author": _text(art.select_one("span.BylineName-kqTBDS")),
+        "image": _attr(art.select_one("img.responsive-image__image"), "src"),
+    }
+
+def legacy_gq(art):
+    title_tag = art.select_one("a.SummaryItemHedLink-cxRzVg")
+    return {
+        "title": _text(title_tag),
+        "link": _attr(title_tag, "href"),
+        "image": _attr(art.select_one("picture img"), "src"),
+        "teaser": _text(art.select_one(".summary-item__dek")),
+        "author": _text(art.select_one("span[data-testid='BylineName']")),
+        "date": _text(art.select_one("time.summary-item__publish-date")),
+        "category": _text(art.select_one(".rubric__name")),
+    }
+
+def legacy_pitchfork(art):
+    return {
+        "title": _text(art.select_one("h3.SummaryItemHedBase-hnYOxl")),
+        "link": _attr(art.select_one("a.SummaryItemHedLink-cxRzVg"), "href"),
+        "author": _text(art.select_one("span.BylineName-kqTBDS")),
+        "description": _text(art.select_one("div.SummaryItemDek-IjVzD")),
+        "rubric": _text(art.select_one("span.RubricName-gkORYq")),
+        "image": _attr(art.select_one("img.ResponsiveImageContainer-eNxvmU"), "src"),
+    }
+
+def legacy_newyorker(art):
+    return {
+        "title": _text(art.select_one("a.summary-item__hed-link h3")),
+        "link": _attr(art.select_one("a.summary-item__hed-link"), "href"),
+        "description": _text(art.select_one("div.summary-item__dek")),
+        "date": _text(art.select_one("time.summary-item__publish-date")),
+    }
+
+BACKENDS = {
+    "wired": ("wired_index.html", legacy_wired),
+    "gq": ("gq_index.html", legacy_gq),
+    "pitchfork": ("pitchfork_index.html", legacy_pitchfork),
+    "newyorker": ("newyorker_index.html", legacy_newyorker),
+}
+
+def per_item_us(fn, items, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for it in items:
+            fn(it)
+        times.append((time.perf_counter() - t0) / len(items) * 1e6)
+    return statistics.median(times)
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--fixtures", type=Path, default=HERE / "fixtures")
+    ap.add_argument("--repeat", type=int, default=20)
+    ap.add_argument("backends", nargs="*", default=list(BACKENDS))
+    args = ap.parse_args()
+
+    ok = True
+    print(f"{'backend':<10} {'items':>6} {'select_one µs':>14} {'Spec µs':>9} {'speedup':>8}  same")
+    for name in args.backends:
+        page, legacy = BACKENDS[name]
+        spec = importlib.import_module(name).SPEC
+        soup = _parse.soup((args.fixtures / page).read_text(encoding="utf-8"), only=spec.item)
+        items = spec.items(soup)
+        same = all(legacy(it) == spec.extract_item(it) for it in items)
+        ok &= same
+        old = per_item_us(legacy, items, args.repeat)
+        new = per_item_us(spec.extract_item, items, args.repeat)
+        print(f"{name:<10} {len(items):>6} {old:>14.1f} {new:>9.1f} {old / new:>7.1f}x  {'yes' if same else 'NO'}")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    raise SystemExit(main())
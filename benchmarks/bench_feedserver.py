@@ -0,0 +1,189 @@
+"""
+Нагрузочный тест feedserver.py (generate.py serve) локальным клиентом.
+
+Ленты — *.xml из корня репозитория (копии во временном каталоге, сжатые
+варианты готовятся feedserver.precompress, как после generate.py
+--precompress). Сервер запускается отдельным процессом; клиент — conc
+keep-alive соединений на asyncio, каждое шлёт запросы подряд в течение
+--seconds. Сценарии:
+
+    identity — полное тело без сжатия
+    gzip     — Accept-Encoding: gzip
+    br       — Accept-Encoding: br (если установлен brotli)
+    304      — If-None-Match с текущим ETag
+
+Для сравнения те же identity и условные (If-Modified-Since) запросы к
+python -m http.server. Перед замером проверяется, что ответы корректны:
+распакованное тело совпадает с файлом, ETag стабилен, 304 без тела и только
+по тегу отдаваемого варианта.
+
+    python benchmarks/bench_feedserver.py --seconds 3 --conc 32
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import gzip
+import http.client
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+ROOT = HERE.parent
+sys.path.insert(0, str(ROOT))
+
+import feedserver
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start(cmd: list[str], port: int, cwd: Path) -> subprocess.Popen:
+    proc = subprocess.Popen(cmd, cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    for _ in range(100):
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            return proc
+        except OSError:
+            time.sleep(0.05)
+    proc.kill()
+    raise RuntimeError(f"сервер не поднялся: {cmd}")
+
+def check(port: int, name: str, original: bytes) -> str:
+    """Корректность ответов; возвращает ETag полного тела."""
+    def req(headers):
+        c = http.client.HTTPConnection("127.0.0.1", port)
+        c.request("GET", f"/{name}", headers=headers)
+        r = c.getresponse()
+        body = r.read()
+        c.close()
+        return r, body
+    r, body = req({})
+    assert r.status == 200 and body == original, "identity"
+    etag = r.getheader("ETag")
+    assert r.getheader("Vary") == "Accept-Encoding"
+    r, body = req({"Accept-Encoding": "gzip"})
+    assert r.getheader("Content-Encoding") == "gzip" and gzip.decompress(body) == original, "gzip"
+    gz_etag = r.getheader("ETag")
+    assert gz_etag != etag, "у сжатого варианта свой ETag"
+    if feedserver.brotli is not None:
+        r, body = req({"Accept-Encoding": "gzip;q=0.5, br"})
+        assert r.getheader("Content-Encoding") == "br" and feedserver.brotli.decompress(body) == original, "br"
+    r, body = req({"Accept-Encoding": "br;q=0, gzip;q=0, identity"})
+    assert r.getheader("Content-Encoding") is None and body == original, "q=0"
+    for tag in (etag, f'W/{etag}', f'"x", {r.getheader("ETag")}'):
+        r, body = req({"If-None-Match": tag})
+        assert r.status == 304 and body == b"", f"304 для {tag}"
+    r, _ = req({"If-None-Match": '"other"'})
+    assert r.status == 200, "чужой ETag"
+    r, _ = req({"If-None-Match": gz_etag})
+    assert r.status == 200 and r.getheader("ETag") == etag, "тег gzip-варианта для ответа без сжатия"
+    r, _ = req({"If-None-Match": gz_etag, "Accept-Encoding": "gzip"})
+    assert r.status == 304 and r.getheader("ETag") == gz_etag, "304 для gzip-варианта"
+    r, _ = req({})
+    assert r.getheader("ETag") == etag, "ETag стабилен"
+    return etag
+
+async def _client(port: int, paths: list[str], headers: str, until: float, counts: list[int]) -> None:
+    reader = writer = None
+    i = 0
+    while time.perf_counter() < until:
+        if writer is None:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        path = paths[i % len(paths)]
+        i += 1
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n{headers}\r\n".encode())
+        head = await reader.readuntil(b"\r\n\r\n")
+        length = 0
+        close = head.startswith(b"HTTP/1.0")
+        for line in head.split(b"\r\n")[1:]:
+            k, _, v = line.partition(b":")
+            k = k.strip().lower()
+            if k == b"content-length":
+                length = int(v)
+            elif k == b"connection":
+                close = v.strip().lower() == b"close"
+        if length:
+            await reader.readexactly(length)
+        counts[int(head[9:12])] += 1
+        if close:
+            writer.close()
+            reader = writer = None
+    if writer is not None:
+        writer.close()
+
+def load(port: int, paths: list[str], headers: dict[str, str], seconds: float, conc: int) -> tuple[float, dict]:
+    hdr = "".join(f"{k}: {v}\r\n" for k, v in headers.items())
+    counts = [0] * 600
+
+    async def go():
+        until = time.perf_counter() + seconds
+        await asyncio.gather(*(_client(port, paths, hdr, until, counts) for _ in range(conc)))
+
+    t0 = time.perf_counter()
+    asyncio.run(go())
+    elapsed = time.perf_counter() - t0
+    statuses = {code: n for code, n in enumerate(counts) if n}
+    return sum(statuses.values()) / elapsed, statuses
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--seconds", type=float, default=3.0)
+    ap.add_argument("--conc", type=int, default=32, help="Concurrent keep-alive connections")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        feeds = sorted(ROOT.glob("*.xml"))
+        for p in feeds:
+            shutil.copy2(p, tmp / p.name)
+        pc = feedserver.precompress(tmp, sorted(tmp.glob("*.xml")))
+        print(f"Лент: {len(feeds)}, {pc['bytes_in'] // 1024} КБ; сжатых вариантов {pc['written']} "
+              f"({pc['bytes_out'] // 1024} КБ)")
+        paths = [f"/{p.name}" for p in feeds]
+
+        port = free_port()
+        proc = start([sys.executable, str(ROOT / "generate.py"), "serve", "--dir", str(tmp),
+                      "--port", str(port)], port, tmp)
+        try:
+            etags = {}
+            for p in feeds:
+                etags[p.name] = check(port, p.name, p.read_bytes())
+            print("Проверка ответов: ok")
+            # If-None-Match для одной ленты: 304 без тела
+            one = [paths[0]]
+            scenarios = [
+                ("feedserver", "identity", paths, {}),
+                ("feedserver", "gzip", paths, {"Accept-Encoding": "gzip"}),
+                ("feedserver", "304", one, {"If-None-Match": etags[feeds[0].name]}),
+            ]
+            if feedserver.brotli is not None:
+                scenarios.insert(2, ("feedserver", "br", paths, {"Accept-Encoding": "br, gzip"}))
+            rows = [(srv, name, *load(port, ps, h, args.seconds, args.conc)) for srv, name, ps, h in scenarios]
+        finally:
+            proc.terminate()
+            proc.wait()
+
+        port = free_port()
+        proc = start([sys.executable, "-m", "http.server", str(port), "--bind", "127.0.0.1",
+                      "--directory", str(tmp)], port, tmp)
+        try:
+            ims = {"If-Modified-Since": "Sun, 01 Jan 2090 00:00:00 GMT"}
+            rows.append(("http.server", "identity", *load(port, paths, {}, args.seconds, args.conc)))
+            rows.append(("http.server", "304", *load(port, [paths[0]], ims, args.seconds, args.conc)))
+        finally:
+            proc.terminate()
+            proc.wait()
+
+    print(f"\n{'server':<12} {'scenario':<9} {'req/s':>9}  statuses")
+    for srv, name, rps, statuses in rows:
+        print(f"{srv:<12} {name:<9} {rps:>9.0f}  {statuses}")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
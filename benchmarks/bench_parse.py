@@ -0,0 +1,85 @@
+"""
+Сравнение разбора индексных страниц: html.parser vs lxml vs lxml + PARSE_ONLY.
+
+Для каждого бэкенда берётся сохранённая страница benchmarks/fixtures/<name>_index.html
+и разбирается тремя способами; печатаются медианное время, пиковая память
+(tracemalloc) и сколько элементов PARSE_ONLY нашлось (должно совпадать).
+
+    python benchmarks/bench_parse.py --repeat 5
+"""
+from __future__ import annotations
+import argparse
+import gc
+import importlib
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent / "backend"))
+
+import _parse  # noqa: E402
+
+# бэкенд → файл с его индексной страницей (nyt и nytmag читают одну и ту же)
+PAGES = {
+    "atlantic": "atlantic_index.html",
+    "gq": "gq_index.html",
+    "newyorker": "newyorker_index.html",
+    "nyt": "nyt_index.html",
+    "nytmag": "nyt_index.html",
+    "pitchfork": "pitchfork_index.html",
+    "semafor": "semafor_index.html",
+    "vulture": "vulture_index.html",
+    "wired": "wired_index.html",
+    "wp_internet": "wp_internet_index.html",
+    "wp_inv": "wp_inv_index.html",
+    "wp_tech": "wp_tech_index.html",
+}
+
+def measure(fn, repeat: int) -> tuple[float, int, object]:
+    """Медианное время (мс) и пик памяти (байты) одного вызова fn()."""
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    gc.collect()
+    tracemalloc.start()
+    result = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(times), peak, result
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--fixtures", type=Path, default=HERE / "fixtures")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("backends", nargs="*", default=sorted(PAGES))
+    args = ap.parse_args()
+
+    print(f"{'backend':<12} {'mode':<22} {'ms':>8} {'peak KB':>9} {'items':>6}")
+    for name in args.backends:
+        html = (args.fixtures / PAGES[name]).read_text(encoding="utf-8")
+        only = getattr(importlib.import_module(name), "PARSE_ONLY", None)
+        modes = [
+            ("html.parser", lambda: BeautifulSoup(html, "html.parser")),
+            ("lxml", lambda: _parse.soup(html, parser="lxml")),
+        ]
+        if only:
+            modes.append(("lxml + PARSE_ONLY", lambda: _parse.soup(html, only=only, parser="lxml")))
+        base_ms = None
+        for label, fn in modes:
+            ms, peak, soup = measure(fn, args.repeat)
+            items = len(soup.select(only)) if only else len(soup.find_all("a"))
+            base_ms = base_ms or ms
+            print(f"{name:<12} {label:<22} {ms:>8.1f} {peak // 1024:>9} {items:>6}"
+                  + (f"  x{base_ms / ms:.1f}" if ms != base_ms else ""))
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,109 @@
+"""
+Бенчмарк reuters.crawl_investigations против локального stub-сервера.
+
+Сервер отдаёт индексные страницы со ссылками на статьи и сами статьи с JSON-LD,
+каждый ответ — с искусственной задержкой (--latency), как у настоящего сайта.
+Для каждого уровня параллельности печатаем время обхода и статей/с (каждый
+уровень — с чистым состоянием обхода). Затем — возобновление: обход прерывается
+на половине (--max-fetches), следующий прогон докачивает остальное, а третий
+не качает ни одной статьи.
+
+    python benchmarks/bench_reuters_crawl.py --articles 40 --latency 0.3 --levels 1 2 4 8
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND))
+os.environ.setdefault("PARSER_CACHE_DIR", tempfile.mkdtemp(prefix="bench_cache_"))
+
+def make_handler(n_articles: int, latency: float, body_kb: int):
+    body = ("Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 18 * body_kb).strip()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            time.sleep(latency)
+            if self.path.startswith("/investigates/section/"):
+                links = "".join(
+                    f'<a href="/investigates/special-report/story-{i:05d}/">Story {i}</a>'
+                    for i in range(n_articles)
+                )
+                html = f"<html><body>{links}</body></html>"
+            elif self.path.startswith("/investigates/special-report/story-"):
+                slug = self.path.rstrip("/").rsplit("/", 1)[-1]
+                ld = json.dumps({
+                    "@type": "NewsArticle",
+                    "headline": slug.replace("-", " ").title(),
+                    "datePublished": "2025-01-01T00:00:00Z",
+                    "dateModified": "2025-01-02T00:00:00Z",
+                    "author": [{"name": "Stub Author"}],
+                    "articleBody": body,
+                })
+                html = (f'<html><head><title>{slug}</title>'
+                        f'<script type="application/ld+json">{ld}</script></head>'
+                        f"<body><main><p>{body}</p></main></body></html>")
+            else:
+                self.send_error(404)
+                return
+            data = html.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    return Handler
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--articles", type=int, default=40)
+    ap.add_argument("--latency", type=float, default=0.3, help="Server-side delay per response, seconds")
+    ap.add_argument("--body-kb", type=int, default=8, help="Approximate article body size, KB")
+    ap.add_argument("--levels", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    ap.add_argument("--rate", type=float, default=None, help="Per-host request cap (req/s); default: none")
+    args = ap.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(args.articles, args.latency, args.body_kb))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    import reuters
+    reuters.BASE = base
+    reuters.INDEX_URLS = [f"{base}/investigates/section/homepage/",
+                          f"{base}/investigates/section/reuters-investigates-2025/"]
+
+    print(f"{'concurrency':>11} {'items':>6} {'seconds':>8} {'items/s':>8}")
+    for level in args.levels:
+        os.environ["PARSER_CACHE_DIR"] = tempfile.mkdtemp(prefix="bench_cache_")
+        t0 = time.perf_counter()
+        items = reuters.crawl_investigations(limit=args.articles, concurrency=level,
+                                             rate=args.rate or 0)
+        elapsed = time.perf_counter() - t0
+        print(f"{level:>11} {len(items):>6} {elapsed:>8.2f} {len(items) / elapsed:>8.2f}")
+
+    os.environ["PARSER_CACHE_DIR"] = tempfile.mkdtemp(prefix="bench_cache_")
+    level = args.levels[-1]
+    print(f"\n{'run':<12} {'fetched':>8} {'known':>6} {'frontier':>9} {'seconds':>8}")
+    for name, budget in (("interrupted", args.articles // 2), ("resumed", args.articles), ("next", args.articles)):
+        t0 = time.perf_counter()
+        st = reuters.crawl(max_fetches=budget, concurrency=level, rate=args.rate or 0)
+        print(f"{name:<12} {st['fetched']:>8} {st['seen']:>6} {st['frontier']:>9} {time.perf_counter() - t0:>8.2f}")
+    server.shutdown()
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,101 @@
+"""
+Выходные файлы Reuters: прежний путь (список всех статей, затем dump_json с
+indent=2, dump_csv и build_rss — три прохода) против reuters.write_outputs
+(один проход, каждая статья сразу в JSONL, JSON, CSV и RSS).
+
+Статьи синтетические, с полным текстом; источник — генератор, как
+iter_investigations. Каждый замер в отдельном процессе, меряется пик памяти
+Python-объектов (tracemalloc): у прежнего пути он растёт с числом статей, у
+потокового — нет.
+
+    python benchmarks/bench_reuters_output.py --items 500 2000 5000 --body-kb 20
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent / "backend"))
+
+WORDS = ("the of and to in a is that for it as was with be by on not he this are or his from at "
+         "which but have an they you were her she there been one all we their has would when").split()
+
+def iter_items(n: int, body_kb: int):
+    rnd = random.Random(n)
+    for i in range(n):
+        body = []
+        size = 0
+        while size < body_kb * 1024:
+            p = " ".join(rnd.choice(WORDS) for _ in range(60))
+            body.append(p)
+            size += len(p)
+        yield {
+            "url": f"https://www.reuters.com/investigates/special-report/item-{i}/",
+            "headline": f"Investigation {i}",
+            "description": " ".join(rnd.choice(WORDS) for _ in range(30)),
+            "authors": ["Jane Doe", "John Roe"],
+            "section": "Special Reports",
+            "image": None,
+            "date_published": "2025-06-12T10:00:00+00:00",
+            "date_modified": "2025-06-13T08:00:00+00:00",
+            "body": "\n\n".join(body),
+            "scraped_at": "2025-06-14T00:00:00Z",
+        }
+
+def child(mode: str, n: int, body_kb: int, directory: str) -> None:
+    import reuters
+    os.chdir(directory)
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    if mode == "lists":
+        items = list(iter_items(n, body_kb))
+        reuters.dump_json(items)
+        reuters.dump_csv(items)
+        reuters.build_rss(items)
+    else:
+        reuters.write_outputs(iter_items(n, body_kb))
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    print(json.dumps({"s": elapsed, "peak_kb": peak // 1024}))
+
+def run(mode: str, n: int, body_kb: int, directory: str) -> dict:
+    out = subprocess.run([sys.executable, __file__, "--child", mode, str(n), str(body_kb), directory],
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--items", type=int, nargs="+", default=[500, 2000, 5000])
+    ap.add_argument("--body-kb", type=int, default=20)
+    ap.add_argument("--child", nargs=4, metavar=("MODE", "N", "KB", "DIR"), help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.child:
+        mode, n, kb, directory = args.child
+        child(mode, int(n), int(kb), directory)
+        return 0
+
+    ok = True
+    print(f"{'items':>6} {'body KB':>8} {'mode':<7} {'s':>7} {'peak MB':>8}")
+    for n in args.items:
+        outputs = {}
+        for mode in ("lists", "stream"):
+            with tempfile.TemporaryDirectory() as tmp:
+                r = run(mode, n, args.body_kb, tmp)
+                outputs[mode] = {name: Path(tmp, name).read_bytes()
+                                 for name in ("reuters_investigations.json", "reuters_investigations.csv")}
+            print(f"{n:>6} {args.body_kb:>8} {mode:<7} {r['s']:>7.2f} {r['peak_kb'] / 1024:>8.1f}")
+        same = outputs["lists"] == outputs["stream"]
+        ok &= same
+        print(f"{'':>6} {'':>8} {'json/csv':<7} {'identical' if same else 'DIFFERENT'}")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    raise SystemExit(main())
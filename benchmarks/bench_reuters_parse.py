@@ -0,0 +1,90 @@
+"""
+Разбор статьи Reuters: прежний путь (полное дерево, JSON-LD из него) против
+быстрого пути reuters.parse_article_html (JSON-LD из сырого HTML, дерево только
+при промахе).
+
+Страница — benchmarks/fixtures/reuters_article.html как есть (попадание) и она же
+без articleBody в JSON-LD (промах: текст берётся из абзацев). Печатаются
+медианное время на статью и совпадение результатов с прежним путём; в конце —
+доля попаданий и среднее время из счётчиков _metrics, как в отчёте generate.py.
+
+    python benchmarks/bench_reuters_parse.py --repeat 20
+"""
+from __future__ import annotations
+import argparse
+import json
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent / "backend"))
+
+import _metrics  # noqa: E402
+import _parse  # noqa: E402
+import reuters  # noqa: E402
+
+URL = "https://www.reuters.com/investigates/special-report/fixture/"
+
+def legacy_parse(url: str, html: str) -> dict | None:
+    """reuters.parse_article_html до быстрого пути — для сравнения."""
+    soup = _parse.soup(html)
+    js = reuters.pick_newsarticle_jsonld(soup) or {}
+    headline = js.get("headline")
+    image = js["image"].get("url") if isinstance(js.get("image"), dict) else js.get("image")
+    body = js.get("articleBody") or reuters.extract_text_fallback(soup)
+    if not headline:
+        t = soup.find("title")
+        headline = t.get_text(strip=True) if t else None
+    if not headline:
+        return None
+    return {
+        "url": url, "headline": headline, "description": js.get("description"),
+        "authors": reuters.normalize_authors(js), "section": js.get("articleSection"), "image": image,
+        "date_published": js.get("datePublished"), "date_modified": js.get("dateModified"), "body": body,
+    }
+
+def without_body(html: str) -> str:
+    def strip(m: re.Match) -> str:
+        data = json.loads(m.group(2))
+        for obj in data if isinstance(data, list) else [data]:
+            obj.pop("articleBody", None)
+        return m.group(1) + json.dumps(data) + m.group(3)
+    return re.sub(r'(<script type="application/ld\+json">)(.*?)(</script>)', strip, html, flags=re.S)
+
+def median_ms(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(times)
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--fixture", type=Path, default=HERE / "fixtures" / "reuters_article.html")
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+
+    page = args.fixture.read_text(encoding="utf-8")
+    ok = True
+    print(f"{'page':<10} {'legacy ms':>10} {'fast ms':>9} {'speedup':>8}  result")
+    with _metrics.scope():
+        for name, html in (("hit", page), ("miss", without_body(page))):
+            old = median_ms(lambda: legacy_parse(URL, html), args.repeat)
+            new = median_ms(lambda: reuters.parse_article_html(URL, html), args.repeat)
+            a = legacy_parse(URL, html)
+            b = reuters.parse_article_html(URL, html)
+            b.pop("scraped_at")
+            same = a == b
+            ok &= same
+            print(f"{name:<10} {old:>10.2f} {new:>9.2f} {old / new:>7.1f}x  {'identical' if same else 'DIFFERENT'}")
+        m = _metrics.snapshot()
+    print(f"\nСчётчики: статей {int(m['articles.parsed'])}, из JSON-LD {int(m.get('articles.jsonld_hits', 0))}, "
+          f"{m['articles.parse_s'] / m['articles.parsed'] * 1000:.2f} мс на статью")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    raise SystemExit(main())
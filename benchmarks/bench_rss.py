@@ -0,0 +1,127 @@
+"""
+Сравнение записи полнотекстовой ленты: feedgen (как раньше в reuters.build_rss)
+против потокового _rss.RssWriter (нынешний reuters.build_rss).
+
+Каждый замер — в отдельном процессе: lxml выделяет память мимо tracemalloc,
+поэтому меряется пиковый RSS процесса (ru_maxrss) сверх того, что уже заняли
+сами статьи. Заодно проверяется, что обе ленты совпадают байт в байт
+(кроме lastBuildDate).
+
+    python benchmarks/bench_rss.py --items 500 2000 5000 --body-kb 20
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import random
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent / "backend"))
+
+WORDS = ("the of and to in a is that for it as was with be by on not he this are or his from at "
+         "which but have an they you were her she there been one all we their has would when").split()
+
+def make_items(n: int, body_kb: int) -> list[dict]:
+    rnd = random.Random(n)
+    items = []
+    for i in range(n):
+        body = []
+        size = 0
+        while size < body_kb * 1024:
+            p = " ".join(rnd.choice(WORDS) for _ in range(60)) + " <&> "
+            body.append(p)
+            size += len(p)
+        items.append({
+            "url": f"https://www.reuters.com/investigates/special-report/item-{i}/",
+            "headline": f"Investigation {i}: " + " ".join(rnd.choice(WORDS) for _ in range(8)),
+            "description": " ".join(rnd.choice(WORDS) for _ in range(30)),
+            "date_published": f"2025-{1 + i % 12:02d}-{1 + i % 28:02d}T10:00:00+00:00" if i % 3 else
+                              f"2025-{1 + i % 12:02d}-{1 + i % 28:02d}T10:00:00Z",
+            "body": "\n\n".join(body),
+        })
+    return items
+
+def legacy_build_rss(items: list[dict], path: str) -> None:
+    """reuters.build_rss до перехода на _rss — для сравнения."""
+    import datetime as dt
+    from feedgen.feed import FeedGenerator
+    import reuters
+    feed_link = f"{reuters.BASE}/investigates/section/homepage/"
+    fg = FeedGenerator()
+    fg.id(feed_link)
+    fg.title("Reuters Investigations (unofficial)")
+    fg.link(href=feed_link, rel="alternate")
+    fg.language("en")
+    fg.description("Unofficial feed of Reuters Investigations scraped for personal use.")
+    for it in items:
+        fe = fg.add_entry()
+        fe.id(it["url"])
+        fe.title(it["headline"])
+        fe.link(href=it["url"])
+        if it.get("description"):
+            fe.description(it["description"])
+        try:
+            fe.pubDate(dt.datetime.fromisoformat((it.get("date_published") or "").replace("Z", "")))
+        except Exception:
+            pass
+        fe.content(it.get("body") or "")
+    fg.rss_str(pretty=True)
+    fg.rss_file(path)
+
+def child(mode: str, n: int, body_kb: int, path: str) -> None:
+    import reuters
+    items = make_items(n, body_kb)
+    base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    t0 = time.perf_counter()
+    if mode == "feedgen":
+        legacy_build_rss(items, path)
+    else:
+        reuters.build_rss(items, path)
+    elapsed = time.perf_counter() - t0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"s": elapsed, "extra_kb": peak - base}))
+
+def run(mode: str, n: int, body_kb: int, path: str) -> dict:
+    out = subprocess.run([sys.executable, __file__, "--child", mode, str(n), str(body_kb), path],
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def _strip_build_date(data: bytes) -> bytes:
+    return re.sub(rb"<lastBuildDate>.*?</lastBuildDate>", b"", data)
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--items", type=int, nargs="+", default=[500, 2000, 5000])
+    ap.add_argument("--body-kb", type=int, default=20)
+    ap.add_argument("--child", nargs=4, metavar=("MODE", "N", "KB", "PATH"), help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.child:
+        mode, n, kb, path = args.child
+        child(mode, int(n), int(kb), path)
+        return 0
+
+    ok = True
+    print(f"{'items':>6} {'body KB':>8} {'mode':<8} {'s':>7} {'extra RSS MB':>13} {'file MB':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.items:
+            paths = {}
+            for mode in ("feedgen", "stream"):
+                paths[mode] = os.path.join(tmp, f"{mode}.xml")
+                r = run(mode, n, args.body_kb, paths[mode])
+                print(f"{n:>6} {args.body_kb:>8} {mode:<8} {r['s']:>7.2f} {r['extra_kb'] / 1024:>13.1f} "
+                      f"{os.path.getsize(paths[mode]) / 2**20:>8.1f}")
+            same = (_strip_build_date(Path(paths["feedgen"]).read_bytes())
+                    == _strip_build_date(Path(paths["stream"]).read_bytes()))
+            ok &= same
+            print(f"{'':>6} {'':>8} {'output':<8} {'identical' if same else 'DIFFERENT'}")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,347 @@
+"""
+HTTP-сервер готовых лент (generate.py serve).
+
+Отдаёт *.xml / *.json / *.jsonl / *.csv из каталога выходных файлов:
+
+  • ETag строгий, из sha256 содержимого ("<hash>", "<hash>-gzip", "<hash>-br" —
+    у каждого сжатого представления свой); If-None-Match и If-Modified-Since →
+    304 без тела, If-None-Match — только по тегу того представления, которое
+    ушло бы в ответ;
+  • gzip/brotli по Accept-Encoding; сжатые варианты берутся готовыми из
+    <каталог>/.precompressed/<sha256>.gz|.br (их пишет generate.py --precompress),
+    а если их нет — сжимаются при загрузке ленты на быстром уровне;
+  • ленты держатся в памяти (LRU, не больше --cache-mb), файл на диске
+    перепроверяется по stat не чаще раза в STAT_INTERVAL_S; stat, чтение и
+    сжатие идут в потоке (asyncio.to_thread), не задерживая остальные запросы;
+  • HTTP/1.1 keep-alive на asyncio, без потоков на соединение.
+
+    python generate.py serve --dir . --port 8080
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import gzip
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:  # без brotli отдаём gzip
+    brotli = None
+
+PRECOMPRESSED_DIR = ".precompressed"
+CONTENT_TYPES = {
+    ".xml": "application/rss+xml; charset=utf-8",
+    ".json": "application/json; charset=utf-8",
+    ".jsonl": "application/x-ndjson; charset=utf-8",
+    ".csv": "text/csv; charset=utf-8",
+}
+STAT_INTERVAL_S = 1.0
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 64 * 1024    # тело запроса больше этого не дочитывается — соединение закрывается
+ENCODINGS = ("br", "gzip")  # в порядке предпочтения при равном q
+_SUFFIX = {"gzip": ".gz", "br": ".br"}
+
+def compress(data: bytes, encoding: str, fast: bool = False) -> bytes:
+    """Максимальное сжатие для --precompress; fast — для ленты без готового варианта."""
+    if encoding == "gzip":
+        return gzip.compress(data, 6 if fast else 9, mtime=0)
+    return brotli.compress(data, quality=5 if fast else 11)
+
+def _available(encoding: str) -> bool:
+    return encoding == "gzip" or brotli is not None
+
+def precompress(directory: Path, paths: list[Path]) -> dict:
+    """
+    Сжатые варианты для обновлённых лент (вызывается из generate.py после
+    сбора) и удаление вариантов, которые больше не соответствуют ни одному файлу.
+    """
+    store = directory / PRECOMPRESSED_DIR
+    store.mkdir(exist_ok=True)
+    stats = {"written": 0, "removed": 0, "bytes_in": 0, "bytes_out": 0}
+    for p in paths:
+        if p.suffix not in CONTENT_TYPES:
+            continue
+        data = p.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()
+        for enc in ENCODINGS:
+            if not _available(enc):
+                continue
+            target = store / f"{digest}{_SUFFIX[enc]}"
+            if target.exists():
+                continue
+            packed = compress(data, enc)
+            tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+            tmp.write_bytes(packed)
+            os.replace(tmp, target)
+            stats["written"] += 1
+            stats["bytes_in"] += len(data)
+            stats["bytes_out"] += len(packed)
+    live = {hashlib.sha256(p.read_bytes()).hexdigest()
+            for p in directory.iterdir() if p.suffix in CONTENT_TYPES and p.is_file()}
+    for v in store.iterdir():
+        if v.name.split(".", 1)[0] not in live and not v.name.startswith("."):
+            v.unlink()
+            stats["removed"] += 1
+    return stats
+
+class Feed:
+    """Одна лента в памяти: тело, сжатые варианты и валидаторы."""
+
+    def __init__(self, path: Path, st: os.stat_result):
+        data = path.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()
+        self.mtime_ns = st.st_mtime_ns
+        self.size = st.st_size
+        self.checked = time.monotonic()
+        self.content_type = CONTENT_TYPES[path.suffix]
+        self.last_modified = formatdate(st.st_mtime, usegmt=True)
+        self.mtime = int(st.st_mtime)
+        self.etag = f'"{digest[:32]}"'
+        self.bodies = {"identity": data}
+        store = path.parent / PRECOMPRESSED_DIR
+        for enc in ENCODINGS:
+            if not _available(enc):
+                continue
+            try:
+                packed = (store / f"{digest}{_SUFFIX[enc]}").read_bytes()
+            except OSError:
+                packed = compress(data, enc, fast=True)
+            if len(packed) < len(data):
+                self.bodies[enc] = packed
+
+    @property
+    def nbytes(self) -> int:
+        return sum(len(b) for b in self.bodies.values())
+
+    def etag_for(self, encoding: str) -> str:
+        return self.etag if encoding == "identity" else f"{self.etag[:-1]}-{encoding}\""
+
+def _load(path: Path, feed: Feed | None) -> Feed | None:
+    """Лента с диска: прежняя, если файл не менялся, None — если его нет. Выполняется в потоке."""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    if feed is not None and feed.mtime_ns == st.st_mtime_ns and feed.size == st.st_size:
+        return feed
+    return Feed(path, st)
+
+class FeedCache:
+    """LRU лент в памяти, не больше max_bytes (тела всех вариантов)."""
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._feeds: OrderedDict[str, Feed] = OrderedDict()
+        self._bytes = 0
+        self._loading: dict[str, asyncio.Future] = {}
+        self.stats = {"hits": 0, "loads": 0, "evictions": 0}
+
+    def names(self) -> list[str]:
+        return sorted(p.name for p in self.root.iterdir()
+                      if p.suffix in CONTENT_TYPES and p.is_file() and not p.name.startswith("."))
+
+    async def get(self, name: str) -> Feed | None:
+        if "/" in name or name.startswith(".") or Path(name).suffix not in CONTENT_TYPES:
+            return None
+        feed = self._feeds.get(name)
+        if feed is not None and time.monotonic() - feed.checked < STAT_INTERVAL_S:
+            self._feeds.move_to_end(name)
+            self.stats["hits"] += 1
+            return feed
+        # одновременные запросы одной ленты ждут одну загрузку; shield — чтобы
+        # оборванное соединение не отменило её для остальных
+        task = self._loading.get(name)
+        if task is None:
+            task = self._loading[name] = asyncio.ensure_future(self._refresh(name, feed))
+        return await asyncio.shield(task)
+
+    async def _refresh(self, name: str, feed: Feed | None) -> Feed | None:
+        try:
+            fresh = await asyncio.to_thread(_load, self.root / name, feed)
+        finally:
+            del self._loading[name]
+        if fresh is None:
+            self._drop(name)
+            return None
+        if fresh is feed and name in self._feeds:
+            feed.checked = time.monotonic()
+            self._feeds.move_to_end(name)
+            self.stats["hits"] += 1
+            return feed
+        self._drop(name)
+        self.stats["loads"] += 1
+        self._feeds[name] = fresh
+        self._bytes += fresh.nbytes
+        while self._bytes > self.max_bytes and len(self._feeds) > 1:
+            old, _ = next(iter(self._feeds.items()))
+            self._drop(old)
+            self.stats["evictions"] += 1
+        return fresh
+
+    def _drop(self, name: str) -> None:
+        feed = self._feeds.pop(name, None)
+        if feed is not None:
+            self._bytes -= feed.nbytes
+
+def negotiate(accept: str | None, available) -> str:
+    """Кодировка ответа по Accept-Encoding: br/gzip, если клиент их принимает (q > 0)."""
+    if not accept:
+        return "identity"
+    q = {}
+    for part in accept.split(","):
+        token, _, params = part.strip().partition(";")
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        q[token.strip().lower()] = weight
+    best, best_q = "identity", 0.0
+    for enc in ENCODINGS:
+        weight = q.get(enc, q.get("*", 0.0))
+        if enc in available and weight > best_q:
+            best, best_q = enc, weight
+    return best
+
+def _not_modified(feed: Feed, headers: dict[str, str], encoding: str) -> bool:
+    inm = headers.get("if-none-match")
+    if inm is not None:
+        if inm.strip() == "*":
+            return True
+        # слабое сравнение (RFC 9110 §13.1.2): W/ не важен; тег другого варианта сжатия
+        # не подходит — у клиента в кэше не то представление, что ушло бы сейчас
+        tags = {t.strip().removeprefix("W/") for t in inm.split(",")}
+        return feed.etag_for(encoding) in tags
+    ims = headers.get("if-modified-since")
+    if ims:
+        try:
+            return feed.mtime <= int(parsedate_to_datetime(ims).timestamp())
+        except (TypeError, ValueError):
+            return False
+    return False
+
+def _response(status: str, headers: list[tuple[str, str]], body: bytes = b"") -> bytes:
+    head = f"HTTP/1.1 {status}\r\n" + "".join(f"{k}: {v}\r\n" for k, v in headers) + "\r\n"
+    return head.encode("latin-1") + body
+
+def _with_close(response: bytes) -> bytes:
+    """Тот же ответ с Connection: close (заголовок сразу после строки статуса)."""
+    status, sep, rest = response.partition(b"\r\n")
+    return status + b"\r\nConnection: close" + sep + rest
+
+class FeedServer:
+    def __init__(self, root: Path, max_bytes: int, max_age: int):
+        self.cache = FeedCache(root, max_bytes)
+        self.max_age = max_age
+        self.stats = {"requests": 0, "not_modified": 0, "gzip": 0, "br": 0, "identity": 0}
+
+    async def handle(self, method: str, target: str, headers: dict[str, str]) -> bytes:
+        """Ответ целиком: статус, заголовки и тело."""
+        self.stats["requests"] += 1
+        date = formatdate(usegmt=True)
+        if method not in ("GET", "HEAD"):
+            return _response("405 Method Not Allowed", [("Date", date), ("Allow", "GET, HEAD"),
+                                                         ("Content-Length", "0")])
+        path = target.split("?", 1)[0]
+        if path == "/":
+            body = "".join(f"{n}\n" for n in self.cache.names()).encode()
+            return _response("200 OK", [("Date", date), ("Content-Type", "text/plain; charset=utf-8"),
+                                        ("Content-Length", str(len(body)))],
+                             body if method == "GET" else b"")
+        feed = await self.cache.get(path.lstrip("/"))
+        if feed is None:
+            return _response("404 Not Found", [("Date", date), ("Content-Length", "0")])
+        encoding = negotiate(headers.get("accept-encoding"), feed.bodies)
+        common = [
+            ("Date", date),
+            ("ETag", feed.etag_for(encoding)),
+            ("Last-Modified", feed.last_modified),
+            ("Cache-Control", f"public, max-age={self.max_age}"),
+            ("Vary", "Accept-Encoding"),
+        ]
+        if _not_modified(feed, headers, encoding):
+            self.stats["not_modified"] += 1
+            return _response("304 Not Modified", common)
+        body = feed.bodies[encoding]
+        self.stats[encoding] += 1
+        extra = [("Content-Type", feed.content_type), ("Content-Length", str(len(body)))]
+        if encoding != "identity":
+            extra.append(("Content-Encoding", encoding))
+        return _response("200 OK", common + extra, body if method == "GET" else b"")
+
+    async def serve_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    raw = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    return
+                except asyncio.LimitOverrunError:
+                    writer.write(_response("431 Request Header Fields Too Large",
+                                           [("Content-Length", "0"), ("Connection", "close")]))
+                    return
+                lines = raw.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = lines[0].split(" ", 2)
+                except ValueError:
+                    writer.write(_response("400 Bad Request", [("Content-Length", "0"), ("Connection", "close")]))
+                    return
+                headers = {}
+                for line in lines[1:]:
+                    if line:
+                        k, _, v = line.partition(":")
+                        headers[k.strip().lower()] = v.strip()
+                # тело (POST/PUT, на которые ответ 405) дочитывается и выбрасывается, иначе
+                # его байты разберутся как следующий запрос; chunked или большое — закрываем
+                length = headers.get("content-length", "0")
+                keep = length.isdigit() and int(length) <= MAX_BODY_BYTES and "transfer-encoding" not in headers
+                if keep and int(length):
+                    try:
+                        await reader.readexactly(int(length))
+                    except (asyncio.IncompleteReadError, ConnectionError):
+                        return
+                response = await self.handle(method, target, headers)
+                writer.write(response if keep else _with_close(response))
+                await writer.drain()
+                conn = headers.get("connection", "").lower()
+                if not keep or conn == "close" or (version == "HTTP/1.0" and conn != "keep-alive"):
+                    return
+        finally:
+            writer.close()
+
+async def _serve(args: argparse.Namespace) -> None:
+    server = FeedServer(Path(args.dir).resolve(), args.cache_mb * 1024 * 1024, args.max_age)
+    srv = await asyncio.start_server(server.serve_client, args.host, args.port,
+                                     limit=MAX_HEADER_BYTES, backlog=1024)
+    addr = ", ".join(str(s.getsockname()) for s in srv.sockets)
+    print(f"🌐 Ленты из {server.cache.root} на {addr} (brotli: {'да' if brotli else 'нет'})", flush=True)
+    async with srv:
+        await srv.serve_forever()
+
+def build_parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(prog="generate.py serve", description="Serve generated feeds over HTTP.")
+    ap.add_argument("--dir", default="outputs", help="Directory with generated feeds (default: outputs)")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8080)
+    ap.add_argument("--cache-mb", type=int, default=64, help="Memory for hot feeds (default: 64)")
+    ap.add_argument("--max-age", type=int, default=60, help="Cache-Control max-age in seconds (default: 60)")
+    return ap
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
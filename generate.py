@@ -1,12 +1,51 @@
 from __future__ import annotations
 import argparse
+import ast
+import hashlib
+import importlib.util
+import io
 import json
+import math
+import os
+import random
+import shutil
+import signal
 import subprocess
 import sys
+import tempfile
+import threading
+import time
+import traceback
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import ExitStack
+from functools import lru_cache
+from glob import escape as glob_escape
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timezone
 
-DEFAULT_PATTERNS = ["*.json", "*.csv", "*.xml", "*.txt"]
+import feedserver
+import history
+
+DEFAULT_PATTERNS = ["*.json", "*.jsonl", "*.csv", "*.xml", "*.txt"]
+METRICS_FILE_ENV = "PARSER_METRICS_FILE"  # см. backend/_metrics.py
+PHASES = ("fetch", "parse", "render", "write")  # см. _metrics.phase
+DEADLINE_ENV = "PARSER_DEADLINE"  # см. backend/_deadline.py
+
+KILL_GRACE_S = 5.0  # после срока: столько ждём, пока бэкенд сам упрётся в _deadline
+TERM_GRACE_S = 3.0  # от SIGTERM до SIGKILL
+MIN_SLICE_S = 5.0   # скрипт без истории длительностей не запускаем, если от бюджета осталось меньше
+DAEMON_POLL_S = 5.0  # --daemon: как часто проверять изменения файлов бэкендов
+
+# backend/_metrics.py и backend/_deadline.py, если они есть в выбранном каталоге
+# (см. import_backend_helper)
+_metrics = None
+_deadline = None
+# in-process бэкенды, пережившие срок: их потоки не остановить, при выходе не ждём
+_abandoned = False
 
 def find_backend_dir(base: Path, cli_backend: str | None) -> Path:
     if cli_backend:
@@ -33,69 +72,876 @@ def list_scripts(backend_dir: Path) -> list[Path]:
         scripts.append(p)
     return scripts
 
-def run_script(script: Path, cwd: Path) -> dict:
-    started_at = datetime.utcnow().isoformat() + "Z"
-    proc = subprocess.run(
-        [sys.executable, str(script)],
-        cwd=str(cwd),
-        capture_output=True,
-        text=True
-    )
-    ended_at = datetime.utcnow().isoformat() + "Z"
+def import_backend_helper(backend_dir: Path, name: str):
+    """Импортирует служебный модуль бэкенда (backend/_*.py); None, если его нет."""
+    if str(backend_dir) not in sys.path:
+        sys.path.insert(0, str(backend_dir))
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+def read_child_metrics(path: Path) -> dict:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    finally:
+        path.unlink(missing_ok=True)
+
+def utc_now() -> str:
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+def _maxrss_kb(ru) -> int:
+    # Linux отдаёт ru_maxrss в КБ, macOS — в байтах
+    return ru.ru_maxrss // 1024 if sys.platform == "darwin" else ru.ru_maxrss
+
+def _descendants(pid: int) -> list[int]:
+    """
+    Все потомки pid по /proc (Linux; на других ОС — пусто). Нужны, потому что
+    браузер, запущенный драйвером Playwright, живёт в своей группе процессов.
+    """
+    children: dict[int, list[int]] = {}
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return []
+    for name in entries:
+        if not name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{name}/stat", "rb") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        ppid = int(stat.rsplit(b")", 1)[1].split()[1])
+        children.setdefault(ppid, []).append(int(name))
+    out, stack = [], [pid]
+    while stack:
+        for child in children.get(stack.pop(), []):
+            out.append(child)
+            stack.append(child)
+    return out
+
+def _signal_tree(pid: int, pids: list[int], sig: int) -> None:
+    try:
+        os.killpg(pid, sig)
+    except OSError:
+        pass
+    for p in pids:
+        try:
+            os.kill(p, sig)
+        except OSError:
+            pass
+
+def _wait_child(pid: int, until: float | None):
+    """os.wait4 не дольше чем до until (time.monotonic); None — процесс ещё жив."""
+    if until is None:
+        _, status, usage = os.wait4(pid, 0)
+        return status, usage
+    delay = 0.005
+    while True:
+        wpid, status, usage = os.wait4(pid, os.WNOHANG)
+        if wpid:
+            return status, usage
+        now = time.monotonic()
+        if now >= until:
+            return None
+        time.sleep(min(delay, until - now))
+        delay = min(delay * 2, 0.1)
+
+def kill_tree(pid: int):
+    """
+    Останавливает скрипт со всеми потомками: SIGTERM группе и каждому потомку,
+    через TERM_GRACE_S — SIGKILL тем, кто остался. Возвращает (status, usage).
+    """
+    pids = _descendants(pid)
+    _signal_tree(pid, pids, signal.SIGTERM)
+    waited = _wait_child(pid, time.monotonic() + TERM_GRACE_S)
+    # потомки, пережившие родителя (браузер), добиваются в любом случае
+    _signal_tree(pid, pids + _descendants(pid), signal.SIGKILL)
+    return waited or _wait_child(pid, None)
+
+def _limit_memory(pid: int, limit_mb: int) -> None:
+    """
+    Лимит памяти уже запущенному ребёнку. Не через preexec_fn: между fork и exec
+    в многопоточном процессе (пул run_all) он может зависнуть на чужой блокировке.
+    До prlimit ребёнок успевает только стартовать интерпретатор, а браузер,
+    который он запустит позже, лимит унаследует.
+    """
+    # RLIMIT_DATA, а не RLIMIT_AS: браузеры резервируют гигабайты адресов, не занимая памяти
+    limit = limit_mb * 1024 * 1024
+    try:
+        resource.prlimit(pid, resource.RLIMIT_DATA, (limit, limit))
+    except ProcessLookupError:
+        pass  # уже завершился
+
+def _status(returncode: int | None, timed_out: bool) -> str:
+    if timed_out:
+        return "timed_out"
+    return "ok" if returncode == 0 else "failed"
+
+def run_script(script: Path, cwd: Path, timeout: float | None = None, memory_mb: int | None = None) -> dict:
+    """
+    Запускает скрипт отдельным процессом. Ресурсы ребёнка (пиковый RSS, время
+    CPU) берутся из os.wait4 — ровно этого процесса, без соседей по пулу.
+
+    timeout — срок в секундах: он же передаётся ребёнку (PARSER_DEADLINE), а
+    если тот не уложился и за KILL_GRACE_S после срока, процесс убивается вместе
+    с потомками (kill_tree). memory_mb — лимит памяти данных процесса (и браузера,
+    который он запустит).
+    """
+    fd, metrics_path = tempfile.mkstemp(prefix=f"{script.stem}_", suffix=".metrics.json")
+    os.close(fd)
+    env = {**os.environ, METRICS_FILE_ENV: metrics_path}
+    if timeout is not None:
+        env[DEADLINE_ENV] = str(time.time() + timeout)
+    posix = hasattr(os, "wait4")
+    started_at = utc_now()
+    t0 = time.monotonic()
+    hard = None if timeout is None else t0 + timeout + KILL_GRACE_S
+    killed = False
+    with tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err:
+        proc = subprocess.Popen(
+            [sys.executable, str(script)],
+            cwd=str(cwd),
+            stdout=out,
+            stderr=err,
+            env=env,
+            start_new_session=posix,
+        )
+        if memory_mb and hasattr(resource, "prlimit"):
+            _limit_memory(proc.pid, memory_mb)
+        usage = None
+        if posix:
+            waited = _wait_child(proc.pid, hard)
+            if waited is None:
+                killed = True
+                waited = kill_tree(proc.pid)
+            status, usage = waited
+            proc.returncode = os.waitstatus_to_exitcode(status)
+        else:
+            try:
+                proc.wait(timeout=None if hard is None else max(hard - time.monotonic(), 0))
+            except subprocess.TimeoutExpired:
+                killed = True
+                proc.kill()
+                proc.wait()
+        t1 = time.monotonic()
+        out.seek(0)
+        err.seek(0)
+        stdout = out.read().decode("utf-8", "replace")
+        stderr = err.read().decode("utf-8", "replace")
+    ended_at = utc_now()
+    metrics = read_child_metrics(Path(metrics_path))
+    if killed:
+        stderr += f"\n[generate] Срок {timeout:.0f} с истёк — процесс остановлен вместе с потомками\n"
     return {
         "script": script.name,
+        "runner": "subprocess",
         "returncode": proc.returncode,
+        "status": _status(proc.returncode, killed or bool(metrics.get("deadline.exceeded"))),
+        "started_at": started_at,
+        "ended_at": ended_at,
+        "duration_s": round(t1 - t0, 3),
+        "cpu_s": round(usage.ru_utime + usage.ru_stime, 3) if usage else None,
+        "peak_rss_kb": _maxrss_kb(usage) if usage else None,
+        "_t0": t0,
+        "_t1": t1,
+        "metrics": metrics,
+        "stdout": stdout,
+        "stderr": stderr
+    }
+
+def has_entry_point(script: Path) -> bool:
+    """
+    True, если в модуле на верхнем уровне объявлена функция generate().
+    Такие скрипты можно импортировать без побочных эффектов и запускать в текущем
+    интерпретаторе; заглушки вроде gallup.py работают прямо при импорте.
+    """
+    try:
+        tree = ast.parse(script.read_text(encoding="utf-8"), filename=str(script))
+    except (OSError, SyntaxError, UnicodeDecodeError):
+        return False
+    return any(isinstance(node, ast.FunctionDef) and node.name == "generate" for node in tree.body)
+
+class _ThreadOutput(io.TextIOBase):
+    """
+    Подменяет sys.stdout/sys.stderr: каждый поток пишет в свой буфер (если он
+    назначен через capture()), остальные — в исходный поток.
+    """
+    def __init__(self, fallback):
+        self._fallback = fallback
+        self._local = threading.local()
+
+    def capture(self, buf: io.StringIO | None) -> None:
+        self._local.buf = buf
+
+    def write(self, s: str) -> int:
+        buf = getattr(self._local, "buf", None)
+        return (buf if buf is not None else self._fallback).write(s)
+
+    def flush(self) -> None:
+        buf = getattr(self._local, "buf", None)
+        (buf if buf is not None else self._fallback).flush()
+
+_stdout: _ThreadOutput | None = None
+_stderr: _ThreadOutput | None = None
+
+def _install_thread_output() -> None:
+    global _stdout, _stderr
+    if _stdout is None:
+        _stdout, _stderr = _ThreadOutput(sys.stdout), _ThreadOutput(sys.stderr)
+        sys.stdout, sys.stderr = _stdout, _stderr
+
+def _uninstall_thread_output() -> None:
+    global _stdout, _stderr
+    if _stdout is not None:
+        sys.stdout, sys.stderr = _stdout._fallback, _stderr._fallback
+        _stdout = _stderr = None
+
+def load_module(script: Path):
+    spec = importlib.util.spec_from_file_location(f"backend_{script.stem}", script)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+def run_module(script: Path, cwd: Path, timeout: float | None = None) -> dict:
+    """
+    Импортирует скрипт как модуль и вызывает его generate() в текущем процессе.
+    cwd должен быть уже выставлен вызывающим (os.chdir общий на весь процесс).
+    timeout — срок в секундах (_deadline.scope): сетевые ожидания и запись лент
+    после него бросают DeadlineExceeded. Поток убить нельзя — за зависшим
+    насовсем следит run_all.
+    """
+    out, err = io.StringIO(), io.StringIO()
+    _stdout.capture(out)
+    _stderr.capture(err)
+    started_at = utc_now()
+    t0 = time.monotonic()
+    cpu0 = time.thread_time()
+    import_s = None
+    returncode = 0
+    timed_out = False
+    counters: dict = {}
+    try:
+        mod = load_module(script)
+        import_s = time.monotonic() - t0
+        with ExitStack() as stack:
+            if _metrics is not None:
+                counters = stack.enter_context(_metrics.scope())
+            if _deadline is not None and timeout is not None:
+                stack.enter_context(_deadline.scope(timeout))
+            mod.generate()
+    except SystemExit as e:
+        returncode = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        if e.code is not None and not isinstance(e.code, int):
+            err.write(f"{e.code}\n")
+    except BaseException as e:
+        returncode = 1
+        timed_out = _deadline is not None and isinstance(e, _deadline.DeadlineExceeded)
+        err.write(traceback.format_exc())
+    finally:
+        _stdout.capture(None)
+        _stderr.capture(None)
+    t1 = time.monotonic()
+    ended_at = utc_now()
+    return {
+        "script": script.name,
+        "runner": "inprocess",
+        "returncode": returncode,
+        "status": _status(returncode, timed_out or bool(counters.get("deadline.exceeded"))),
         "started_at": started_at,
         "ended_at": ended_at,
-        "stdout": proc.stdout,
-        "stderr": proc.stderr
+        "duration_s": round(t1 - t0, 3),
+        "import_s": round(import_s, 3) if import_s is not None else None,
+        # CPU только этого потока: сеть (_http) и браузер работают в общих потоках;
+        # пиковая память у потока своя не бывает — см. "process" в отчёте
+        "cpu_s": round(time.thread_time() - cpu0, 3),
+        "peak_rss_kb": None,
+        "_t0": t0,
+        "_t1": t1,
+        "metrics": counters,
+        "stdout": out.getvalue(),
+        "stderr": err.getvalue()
+    }
+
+def http_cache_summary(totals: dict) -> dict:
+    hits = int(totals.get("http_cache.hits", 0))
+    misses = int(totals.get("http_cache.misses", 0))
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / (hits + misses), 3) if hits + misses else None,
+        "stores": int(totals.get("http_cache.stores", 0)),
+        "evictions": int(totals.get("http_cache.evictions", 0)),
+    }
+
+def coalescing_summary(totals: dict) -> dict:
+    fetches = int(totals.get("fetch.requests", 0))
+    avoided = int(totals.get("fetch.coalesced", 0))
+    return {
+        "fetches": fetches,
+        "network": fetches - avoided,
+        "duplicates_avoided": avoided,
+        "parses_shared": int(totals.get("parse.shared", 0)),
+    }
+
+def date_fallback_summary(totals: dict) -> dict:
+    """Сколько раз бэкенды подставили datetime.now() вместо даты (см. backend/_dates.py)."""
+    prefix = "dates.fallback_now."
+    by_source = {k[len(prefix):]: int(v) for k, v in sorted(totals.items()) if k.startswith(prefix)}
+    return {"total": sum(by_source.values()), "by_source": by_source}
+
+def article_parse_summary(totals: dict) -> dict:
+    """Разбор статей: доля попаданий в быстрый путь JSON-LD и время на статью (reuters)."""
+    parsed = int(totals.get("articles.parsed", 0))
+    hits = int(totals.get("articles.jsonld_hits", 0))
+    return {
+        "parsed": parsed,
+        "jsonld_hits": hits,
+        "hit_rate": round(hits / parsed, 3) if parsed else None,
+        "avg_parse_ms": round(totals.get("articles.parse_s", 0.0) / parsed * 1000, 2) if parsed else None,
     }
 
-def move_outputs(backend_dir: Path, out_dir: Path, patterns: list[str], mode: str) -> list[str]:
+def telemetry(result: dict) -> dict:
+    """Фазы, сеть, записи и ресурсы одного скрипта (из его счётчиков _metrics)."""
+    m = result["metrics"]
+    phases = {p: round(m.get(f"phase.{p}_s", 0.0), 3) for p in PHASES}
+    # разбор полей, сборка записей, ожидание чужих загрузок и т. п.
+    phases["other"] = round(max(result["duration_s"] - sum(phases.values()), 0.0), 3)
+    return {
+        "phases_s": phases,
+        "requests": int(m.get("http.requests", 0)),
+        "bytes": int(m.get("http.bytes", 0)),
+        "items": int(m.get("items.produced", 0)),
+        "cpu_s": result.get("cpu_s"),
+        "peak_rss_kb": result.get("peak_rss_kb"),
+    }
+
+def telemetry_summary(results: list[dict]) -> dict:
+    phases = {p: 0.0 for p in (*PHASES, "other")}
+    for r in results:
+        for p, v in r["telemetry"]["phases_s"].items():
+            phases[p] += v
+    slowest = sorted(results, key=lambda r: r["duration_s"], reverse=True)[:5]
+    out = {
+        "phases_s": {p: round(v, 3) for p, v in phases.items()},
+        "requests": sum(r["telemetry"]["requests"] for r in results),
+        "bytes": sum(r["telemetry"]["bytes"] for r in results),
+        "items": sum(r["telemetry"]["items"] for r in results),
+        "slowest": [
+            {"script": r["script"], "duration_s": r["duration_s"],
+             "phase": max(r["telemetry"]["phases_s"].items(), key=lambda kv: kv[1])[0]}
+            for r in slowest
+        ],
+    }
+    if resource is not None:
+        own = resource.getrusage(resource.RUSAGE_SELF)
+        children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        out["process"] = {
+            "peak_rss_kb": _maxrss_kb(own),
+            "cpu_s": round(own.ru_utime + own.ru_stime, 3),
+            "children_peak_rss_kb": _maxrss_kb(children),
+            "children_cpu_s": round(children.ru_utime + children.ru_stime, 3),
+        }
+    return out
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def write_metrics_textfile(report: dict, path: Path, fmt: str = "prometheus") -> None:
+    """
+    Метрики прогона в текстовом формате Prometheus (для textfile collector
+    node_exporter) или OpenMetrics. Файл подменяется атомарно — коллектор
+    не увидит его наполовину записанным.
+    """
+    series: dict[str, tuple[str, list[str]]] = {}
+
+    def add(name: str, help_: str, labels: dict, value) -> None:
+        if value is None:
+            return
+        lbl = ",".join(f'{k}="{_label(str(v))}"' for k, v in labels.items())
+        series.setdefault(name, (help_, []))[1].append(f"{name}{{{lbl}}} {value}" if lbl else f"{name} {value}")
+
+    for r in report["results"]:
+        s = {"script": r["script"]}
+        t = r["telemetry"]
+        add("parser_backend_duration_seconds", "Wall time of the backend in the last run.", s, r["duration_s"])
+        add("parser_backend_success", "1 if the backend exited with code 0.", s, int(r["returncode"] == 0))
+        for p, v in t["phases_s"].items():
+            add("parser_backend_phase_seconds", "Time spent per phase (fetch/parse/render/write/other).",
+                {**s, "phase": p}, v)
+        add("parser_backend_http_requests", "HTTP requests made by the backend.", s, t["requests"])
+        add("parser_backend_http_bytes", "Bytes downloaded by the backend.", s, t["bytes"])
+        add("parser_backend_items", "Feed items produced by the backend.", s, t["items"])
+        add("parser_backend_cpu_seconds", "CPU time of the backend (own thread for in-process runs).", s, t["cpu_s"])
+        if t["peak_rss_kb"] is not None:
+            add("parser_backend_peak_rss_bytes", "Peak RSS of the backend process.", s, t["peak_rss_kb"] * 1024)
+    add("parser_run_duration_seconds", "Wall time of the whole run.", {}, report["wall_s"])
+    add("parser_run_failures", "Backends that failed in the last run.", {}, report["failures"])
+    add("parser_run_timestamp_seconds", "When the last run finished.", {}, round(time.time(), 3))
+
+    lines = []
+    for name, (help_, samples) in series.items():
+        lines.append(f"# HELP {name} {help_}")
+        lines.append(f"# TYPE {name} gauge")
+        lines.extend(samples)
+    if fmt == "openmetrics":
+        lines.append("# EOF")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    os.replace(tmp, path)
+
+@lru_cache(maxsize=1)
+def measure_interpreter_startup() -> float:
+    """Сколько стоит поднять пустой интерпретатор (один замер, без импортов)."""
+    t0 = time.monotonic()
+    subprocess.run([sys.executable, "-c", "pass"], capture_output=True)
+    return time.monotonic() - t0
+
+def startup_summary(results: list[dict], interpreter_s: float) -> dict:
+    """
+    Оценка сэкономленного старта: каждый in-process скрипт в отдельном процессе
+    заплатил бы за интерпретатор и холодный импорт зависимостей (≈ самый долгий
+    import_s в прогоне — его платит первый импортированный модуль).
+    """
+    imports = [r["import_s"] for r in results if r.get("runner") == "inprocess" and r.get("import_s") is not None]
+    if not imports:
+        return {"inprocess_scripts": 0, "estimated_saved_s": 0.0}
+    cold = max(imports)
+    would_pay = len(imports) * (interpreter_s + cold)
+    paid = sum(imports)
+    return {
+        "inprocess_scripts": len(imports),
+        "interpreter_startup_s": round(interpreter_s, 3),
+        "cold_import_s": round(cold, 3),
+        "inprocess_import_s": round(paid, 3),
+        "estimated_saved_s": round(max(would_pay - paid, 0.0), 3),
+    }
+
+def _ok_durations(results: list[dict]) -> dict[str, float]:
+    # в отчётах до --jobs (как закоммиченный generate_report.json) duration_s нет
+    return {r["script"]: r["duration_s"] for r in results
+            if r.get("status", "ok") == "ok" and r.get("returncode") == 0
+            and isinstance(r.get("duration_s"), (int, float))}
+
+def previous_durations(report_path: Path) -> dict[str, float]:
+    """
+    Длительность скриптов по прошлым отчётам — оценка для планирования. Берётся
+    из поля durations (последний успешный прогон каждого скрипта, даже если в
+    прошлый раз его пропустили по --due-only), у старых отчётов — из results.
+    Отчёт, который не удаётся прочитать в этом виде, — как будто его нет.
+    """
+    try:
+        report = json.loads(report_path.read_text(encoding="utf-8"))
+        durations = {**_ok_durations(report.get("results") or []), **(report.get("durations") or {})}
+    except (OSError, ValueError, TypeError, AttributeError, KeyError):
+        return {}
+    return {name: d for name, d in durations.items() if isinstance(d, (int, float))}
+
+def merge_durations(previous: dict[str, float], results: list[dict], backend_dir: Path) -> dict[str, float]:
+    """Прошлые длительности, обновлённые успешными скриптами этого прогона; удалённые скрипты выпадают."""
+    merged = {**previous, **_ok_durations(results)}
+    return {name: d for name, d in sorted(merged.items()) if (backend_dir / name).is_file()}
+
+def schedule(scripts: list[Path], expected: dict[str, float]) -> list[int]:
+    """
+    Порядок запуска: сначала самые долгие по прошлому прогону (неизвестные —
+    первыми), чтобы к концу бюджета оставались короткие скрипты.
+    """
+    return sorted(range(len(scripts)), key=lambda i: -expected.get(scripts[i].name, math.inf))
+
+def _stub_result(script: Path, runner: str, status: str, t0: float, note: str) -> dict:
+    """Результат скрипта, который не запускался (skipped) или брошен после срока."""
+    t1 = time.monotonic()
+    return {
+        "script": script.name,
+        "runner": runner,
+        "returncode": None,
+        "status": status,
+        "started_at": None,
+        "ended_at": utc_now(),
+        "duration_s": round(t1 - t0, 3),
+        "cpu_s": None,
+        "peak_rss_kb": None,
+        "_t0": t0,
+        "_t1": t1,
+        "metrics": {},
+        "stdout": "",
+        "stderr": note + "\n",
+    }
+
+def _print_result(res: dict) -> None:
+    if res["status"] == "ok":
+        print(f"===== ✅ Успех: {res['script']} ({res['duration_s']:.1f} с) =====")
+    elif res["status"] == "timed_out":
+        print(f"===== ⏱ Превышен срок: {res['script']} ({res['duration_s']:.1f} с), прежняя лента сохранена =====")
+    elif res["status"] == "skipped":
+        print(f"===== ⏭ Пропущен: {res['script']} ({res['stderr'].strip()}) =====")
+    else:
+        print(f"===== ❗️ Ошибка: {res['script']} (код {res['returncode']}) =====")
+
+def run_all(scripts: list[Path], cwd: Path, jobs: int, runner: str = "auto",
+            timeout: float | None = None, script_timeouts: dict[str, float] | None = None,
+            budget: float | None = None, memory_mb: int | None = None,
+            expected: dict[str, float] | None = None) -> list[dict]:
+    """
+    Запускает скрипты пулом из `jobs` потоков. Скрипты с generate() (при runner='auto')
+    выполняются в этом же интерпретаторе, остальные — отдельными процессами.
+    Результаты возвращаются в порядке `scripts`, независимо от порядка завершения.
+
+    Сроки: timeout — на скрипт (script_timeouts — для отдельных скриптов по
+    имени), budget — на весь прогон. Скрипт получает срок min(свой, остаток
+    бюджета); если остатка не хватит на его обычную длительность (expected, из
+    прошлого отчёта; для новых скриптов — MIN_SLICE_S), он пропускается со
+    статусом skipped. Скрипты запускаются от долгих к коротким (schedule).
+    in-process скрипт, не вернувшийся за KILL_GRACE_S после срока, бросается
+    (timed_out): поток остановить нельзя, процесс завершится без ожидания его.
+    """
+    global _metrics, _deadline, _abandoned
+    expected = expected or {}
+    script_timeouts = script_timeouts or {}
+    inproc = {s for s in scripts if runner == "auto" and has_entry_point(s)}
+    if inproc:
+        _metrics = import_backend_helper(cwd, "_metrics")
+        _deadline = import_backend_helper(cwd, "_deadline")
+        fetch = import_backend_helper(cwd, "_fetch")
+        if fetch is not None:
+            fetch.new_run()  # общие загрузки — только в пределах этого прогона
+    results: list[dict | None] = [None] * len(scripts)
+    run_t0 = time.monotonic()
+    budget_end = None if budget is None else run_t0 + budget
+    started: dict[int, float] = {}
+    hard: dict[int, float] = {}  # in-process: когда бросать
+
+    def one(i: int) -> dict:
+        s = scripts[i]
+        kind = "inprocess" if s in inproc else "subprocess"
+        limit = script_timeouts.get(s.name, timeout)
+        t0 = time.monotonic()
+        if budget_end is not None:
+            left = budget_end - t0
+            usual = expected.get(s.name)
+            if left <= 0 or (usual > left if usual is not None else left < MIN_SLICE_S):
+                note = f"бюджет прогона: осталось {max(left, 0):.0f} с"
+                if usual is not None:
+                    note += f", обычно нужно {usual:.0f} с"
+                return _stub_result(s, kind, "skipped", t0, note)
+            limit = left if limit is None else min(limit, left)
+        started[i] = t0
+        if kind == "inprocess":
+            if limit is not None:
+                hard[i] = t0 + limit + KILL_GRACE_S
+            return run_module(s, cwd, timeout=limit)
+        return run_script(s, cwd, timeout=limit, memory_mb=memory_mb)
+
+    prev_cwd = os.getcwd()
+    if inproc:
+        _install_thread_output()
+        os.chdir(cwd)
+        if str(cwd) not in sys.path:
+            sys.path.insert(0, str(cwd))
+    pool = ThreadPoolExecutor(max_workers=max(jobs, 1))
+    poll = 0.5 if inproc and (timeout or script_timeouts or budget) else None
+    try:
+        futures = {pool.submit(one, i): i for i in schedule(scripts, expected)}
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=poll, return_when=FIRST_COMPLETED)
+            for fut in done:
+                results[futures[fut]] = fut.result()
+                _print_result(results[futures[fut]])
+            now = time.monotonic()
+            for fut in [f for f in pending if now > hard.get(futures[f], math.inf)]:
+                i = futures[fut]
+                pending.discard(fut)
+                _abandoned = True
+                results[i] = _stub_result(scripts[i], "inprocess", "timed_out", started[i],
+                                          "[generate] Срок истёк, generate() не вернулся — поток брошен")
+                _print_result(results[i])
+    finally:
+        # брошенные потоки ещё работают в cwd бэкендов — его не меняем и их не ждём
+        pool.shutdown(wait=not _abandoned, cancel_futures=_abandoned)
+        if inproc and not _abandoned:
+            os.chdir(prev_cwd)
+            _uninstall_thread_output()
+    return results
+
+def annotate_overlap(results: list[dict], run_t0: float) -> None:
+    """
+    Для каждого скрипта считает смещение старта от начала прогона и
+    overlap_s — сколько секунд он выполнялся одновременно хотя бы с одним другим.
+    """
+    spans = [(r["_t0"], r["_t1"]) for r in results]
+    for i, r in enumerate(results):
+        s0, s1 = spans[i]
+        others = sorted((max(a, s0), min(b, s1)) for j, (a, b) in enumerate(spans)
+                        if j != i and a < s1 and b > s0)
+        covered, cur_a, cur_b = 0.0, None, None
+        for a, b in others:
+            if cur_b is None or a > cur_b:
+                if cur_b is not None:
+                    covered += cur_b - cur_a
+                cur_a, cur_b = a, b
+            else:
+                cur_b = max(cur_b, b)
+        if cur_b is not None:
+            covered += cur_b - cur_a
+        r["start_offset_s"] = round(s0 - run_t0, 3)
+        r["overlap_s"] = round(covered, 3)
+        del r["_t0"], r["_t1"]
+
+COLLECT_INDEX = ".collect_index.json"  # в out_dir; см. move_outputs
+
+def file_digest(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def _stat_key(st: os.stat_result) -> list:
+    return [st.st_size, st.st_mtime_ns, st.st_ino]
+
+def _load_collect_index(out_dir: Path) -> dict:
+    try:
+        return json.loads((out_dir / COLLECT_INDEX).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+def _save_collect_index(out_dir: Path, index: dict) -> None:
+    tmp = out_dir / f"{COLLECT_INDEX}.{os.getpid()}.tmp"
+    tmp.write_text(json.dumps(index, ensure_ascii=False, indent=1, sort_keys=True), encoding="utf-8")
+    os.replace(tmp, out_dir / COLLECT_INDEX)
+
+def _latest_version(out_dir: Path, src: Path) -> tuple[int, Path | None]:
+    """Номер и путь последней версии в out_dir (name, name_1, name_2, ...); -1 — версий нет."""
+    found = [(0, out_dir / src.name)] if (out_dir / src.name).exists() else []
+    prefix, suffix = f"{src.stem}_", src.suffix
+    for p in out_dir.glob(f"{glob_escape(prefix)}*{glob_escape(suffix)}"):
+        n = p.name[len(prefix):len(p.name) - len(suffix)] if suffix else p.name[len(prefix):]
+        if n.isdigit():
+            found.append((int(n), p))
+    return max(found, key=lambda x: x[0]) if found else (-1, None)
+
+def _stage(src: Path, target: Path, link: bool, stats: dict) -> Path:
+    """Временный файл рядом с target: жёсткая ссылка на src или копия."""
+    tmp = target.with_name(f".{target.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.unlink(missing_ok=True)
+    if link:
+        try:
+            os.link(src, tmp)
+            stats["linked"] += 1
+            return tmp
+        except OSError:
+            pass  # другой диск или ФС без жёстких ссылок
+    shutil.copyfile(src, tmp)
+    stats["copied"] += 1
+    stats["bytes_written"] += tmp.stat().st_size
+    return tmp
+
+def move_outputs(backend_dir: Path, out_dir: Path, patterns: list[str], mode: str,
+                 stats: dict | None = None) -> list[str]:
     """
     mode:
       • 'overwrite' — перезаписывать файлы, если уже существуют
       • 'versioned' — добавлять _1, _2, ... (старое поведение)
       • 'skip'      — не трогать файл, если уже существует
+
+    Файл, содержимое которого не изменилось с прошлого сбора, пропускается. Для
+    этого out_dir/.collect_index.json хранит sha256, stat источника и номер
+    последней версии. Если stat совпал, файл даже не читается. Запись атомарная:
+    временный файл и os.replace. В 'overwrite' вместо копии ставится жёсткая
+    ссылка на файл бэкенда (если out_dir на том же диске). Версии в 'versioned'
+    копируются и не перезаписываются (os.link на свободное имя). Номер версии
+    берётся из индекса, а не перебором exists(). Параллельные сборы в один
+    out_dir сериализуются блокировкой.
+
+    stats (если передан) заполняется счётчиками: unchanged, linked, copied,
+    bytes_read, bytes_written.
     """
+    if mode not in ("overwrite", "versioned", "skip"):
+        raise SystemExit(f"Неизвестный collect-mode: {mode}")
     out_dir.mkdir(parents=True, exist_ok=True)
+    if stats is None:
+        stats = {}
+    for k in ("unchanged", "linked", "copied", "bytes_read", "bytes_written"):
+        stats.setdefault(k, 0)
     moved = []
-    for pat in patterns:
-        for p in backend_dir.glob(pat):
-            if not p.is_file():
-                continue
-            target = out_dir / p.name
-
-            if mode == "overwrite":
-                target.write_bytes(p.read_bytes())
-                moved.append(str(target.resolve()))
-            elif mode == "versioned":
-                t = target
-                idx = 1
-                while t.exists():
-                    t = out_dir / f"{p.stem}_{idx}{p.suffix}"
-                    idx += 1
-                t.write_bytes(p.read_bytes())
-                moved.append(str(t.resolve()))
-            elif mode == "skip":
-                if not target.exists():
-                    target.write_bytes(p.read_bytes())
+    with history.FileLock(out_dir / ".collect_index.lock"):
+        index = _load_collect_index(out_dir)
+        for pat in patterns:
+            for p in sorted(backend_dir.glob(pat)):
+                if not p.is_file():
+                    continue
+                target = out_dir / p.name
+                if p.resolve() == target.resolve():
+                    continue  # out_dir совпадает с каталогом бэкендов
+                if mode == "skip":
+                    if not target.exists():
+                        # копия, а не ссылка: файл в out_dir больше не должен меняться
+                        os.replace(_stage(p, target, False, stats), target)
+                        moved.append(str(target.resolve()))
+                    continue
+
+                st = p.stat()
+                entry = index.get(p.name)
+                if entry is None:
+                    # Первый сбор с индексом: узнаём, что уже лежит в out_dir
+                    if mode == "versioned":
+                        version, latest = _latest_version(out_dir, p)
+                    else:
+                        version, latest = 0, (target if target.exists() else None)
+                    entry = {"version": version, "sha256": None, "src": None}
+                    if latest is not None:
+                        entry["sha256"] = file_digest(latest)
+                        stats["bytes_read"] += latest.stat().st_size
+                    index[p.name] = entry
+                current = target if mode == "overwrite" else None
+                if entry["src"] == _stat_key(st) and (current is None or current.exists()):
+                    stats["unchanged"] += 1
+                    continue
+                digest = file_digest(p)
+                stats["bytes_read"] += st.st_size
+                entry["src"] = _stat_key(st)
+                if digest == entry["sha256"] and (current is None or current.exists()):
+                    stats["unchanged"] += 1
+                    continue
+
+                if mode == "overwrite":
+                    if not (target.exists() and os.path.samefile(p, target)):
+                        os.replace(_stage(p, target, True, stats), target)
+                    else:
+                        stats["linked"] += 1  # уже та же ссылка: бэкенд писал на месте
                     moved.append(str(target.resolve()))
-            else:
-                raise SystemExit(f"Неизвестный collect-mode: {mode}")
+                else:
+                    tmp = _stage(p, target, False, stats)
+                    version = entry["version"] + 1
+                    while True:
+                        t = target if version == 0 else out_dir / f"{p.stem}_{version}{p.suffix}"
+                        try:
+                            os.link(tmp, t)  # не затирает чужую версию
+                            break
+                        except FileExistsError:
+                            version += 1
+                    tmp.unlink()
+                    entry["version"] = version
+                    moved.append(str(t.resolve()))
+                entry["sha256"] = digest
+        _save_collect_index(out_dir, index)
     return moved
 
+def record_history(root: Path, paths: list[Path], keep_last: int, keep_daily: int) -> dict:
+    """Кладёт обновлённые выходные файлы в history.Store и применяет политику хранения."""
+    store = history.Store(root)
+    stats = {"root": str(root), "recorded": 0, "deduplicated": 0}
+    for p in paths:
+        # versioned: wired_3.xml — очередная версия wired.xml
+        name = p.name
+        stem, _, n = p.stem.rpartition("_")
+        if stem and n.isdigit() and (p.parent / f"{stem}{p.suffix}").exists():
+            name = f"{stem}{p.suffix}"
+        if store.record(p, feed=name) is None:
+            stats["deduplicated"] += 1
+        else:
+            stats["recorded"] += 1
+    stats.update(store.compact(keep_last, keep_daily))
+    return stats
+
+def record_observations(schedule_mod, results: list[dict], ts: float) -> None:
+    """Итоги прогона → наблюдения для _schedule (изменилась ли лента; см. items.changed)."""
+    for r in results:
+        if r["status"] == "skipped":
+            continue
+        changed = r["metrics"].get("items.changed")
+        schedule_mod.record(r["script"], ts, r["status"] == "ok", None if changed is None else changed > 0)
+
+def schedule_summary(plan: dict[str, dict], max_staleness_h: float) -> dict:
+    def iso(ts):
+        return datetime.fromtimestamp(ts, timezone.utc).isoformat().replace("+00:00", "Z") if ts else None
+    return {
+        "max_staleness_h": max_staleness_h,
+        "not_due": [name for name, p in plan.items() if not p["due"]],
+        "scripts": {
+            name: {
+                "due": p["due"],
+                "reason": p["reason"],
+                "observations": p["observations"],
+                "changes": p["changes"],
+                "rate_per_h": p["rate_per_h"],
+                "last_change": iso(p["last_change"]),
+                "next_due": iso(p["next_due"]),
+            }
+            for name, p in plan.items()
+        },
+    }
+
 def build_parser() -> argparse.ArgumentParser:
     ap = argparse.ArgumentParser(description="Run all python scripts in ./backend and generate a JSON report.")
     ap.add_argument("--backend", type=str, default=None, help="Path to backend directory (default: ./backend or ./backend/backend)")
-    ap.add_argument("--out-dir", type=str, default="outputs", help="Where to collect outputs (*.json, *.csv, *.xml, *.txt)")
+    ap.add_argument("--out-dir", type=str, default="outputs", help="Where to collect outputs (*.json, *.jsonl, *.csv, *.xml, *.txt)")
     ap.add_argument("--no-collect", action="store_true", help="Do not collect outputs")
     ap.add_argument("--collect-mode", type=str, choices=["overwrite", "versioned", "skip"], default="overwrite",
                     help="How to handle existing files in out-dir (default: overwrite)")
+    ap.add_argument("--jobs", "-j", type=int, default=1,
+                    help="How many scripts to run concurrently (default: 1 — sequentially)")
+    ap.add_argument("--runner", type=str, choices=["auto", "subprocess"], default="auto",
+                    help="auto: import scripts with generate() into this interpreter, "
+                         "run the rest as subprocesses; subprocess: one interpreter per script")
+    ap.add_argument("--timeout", type=float, default=600.0,
+                    help="Per-script deadline in seconds; a script that misses it is stopped together with its "
+                         "child processes and keeps its previous output (default: 600; 0 — no limit)")
+    ap.add_argument("--script-timeout", action="append", default=[], metavar="NAME=SECONDS",
+                    help="Deadline for one script, e.g. reuters.py=900 (repeatable)")
+    ap.add_argument("--budget", type=float, default=None,
+                    help="Wall-clock budget for the whole run in seconds: scripts that would not fit are skipped")
+    ap.add_argument("--memory-limit", type=int, default=None, metavar="MB",
+                    help="Data memory limit for scripts run as subprocesses, Linux only (see --runner)")
+    ap.add_argument("--due-only", action="store_true",
+                    help="Run only the scripts whose feed is expected to have changed, judging by "
+                         "how often it changed in previous runs (see backend/_schedule.py)")
+    ap.add_argument("--max-staleness", type=float, default=24.0, metavar="HOURS",
+                    help="With --due-only: run a script at least this often (default: 24)")
+    ap.add_argument("--daemon", action="store_true",
+                    help="Keep running: warm process, connections and browser; each script on its own interval")
+    ap.add_argument("--interval", type=float, default=15.0, metavar="MINUTES",
+                    help="With --daemon: default and minimum interval between runs of a script (default: 15)")
+    ap.add_argument("--script-interval", action="append", default=[], metavar="NAME=MINUTES",
+                    help="With --daemon: fixed interval for one script, e.g. semafor.py=5 (repeatable)")
+    ap.add_argument("--jitter", type=float, default=0.1,
+                    help="With --daemon: random spread of intervals, as a fraction (default: 0.1)")
+    ap.add_argument("--metrics-textfile", type=str, default=None,
+                    help="Also write per-backend telemetry to this file for Prometheus "
+                         "(node_exporter textfile collector)")
+    ap.add_argument("--metrics-format", type=str, choices=["prometheus", "openmetrics"], default="prometheus",
+                    help="Format of --metrics-textfile (default: prometheus)")
+    ap.add_argument("--history", type=str, default=None,
+                    help="Also record every updated output in this content-addressed history store "
+                         "(see history.py; off by default)")
+    ap.add_argument("--history-keep-last", type=int, default=0,
+                    help="Retention: keep the last N versions of each output (default: 0 — all)")
+    ap.add_argument("--history-keep-daily", type=int, default=0,
+                    help="Retention: also keep the last version of each of the last N days")
+    ap.add_argument("--precompress", action="store_true",
+                    help="Write gzip/brotli variants of updated outputs to <out-dir>/.precompressed "
+                         "for 'generate.py serve'")
     return ap
 
+def parse_script_timeouts(specs: list[str]) -> dict[str, float]:
+    script_timeouts = {}
+    for spec in specs:
+        name, sep, seconds = spec.partition("=")
+        if not sep:
+            raise SystemExit(f"--script-timeout: ожидается NAME=SECONDS, получено {spec!r}")
+        script_timeouts[name if name.endswith(".py") else f"{name}.py"] = float(seconds)
+    return script_timeouts
+
 def main(argv: list[str] | None = None) -> int:
     argv = argv if argv is not None else sys.argv[1:]
+    if argv[:1] == ["serve"]:
+        return feedserver.main(argv[1:])
     args = build_parser().parse_args(argv)
 
     here = Path(__file__).resolve().parent
@@ -106,45 +952,257 @@ def main(argv: list[str] | None = None) -> int:
         print("⚠️  В папке 'backend' не найдено исполняемых .py-файлов.")
         return 0
 
-    print("Найдены скрипты для запуска (в порядке выполнения):")
+    script_timeouts = parse_script_timeouts(args.script_timeout)
+    schedule_mod = import_backend_helper(backend_dir, "_schedule")
+    if args.daemon:
+        return daemon(args, here, backend_dir, script_timeouts, schedule_mod)
+
+    plan = None
+    if args.due_only:
+        if schedule_mod is None:
+            print("⚠️  --due-only: нет backend/_schedule.py, запускаются все скрипты.")
+        else:
+            plan = schedule_mod.plan([s.name for s in scripts], args.max_staleness * 3600)
+            fresh = [s for s in scripts if not plan[s.name]["due"]]
+            scripts = [s for s in scripts if plan[s.name]["due"]]
+            print(f"По расписанию: пора запускать {len(scripts)} из {len(scripts) + len(fresh)}")
+            for s in fresh:
+                print(f"  ◦ {s.name}: {plan[s.name]['reason']}")
+
+    return run_cycle(args, here, backend_dir, scripts, script_timeouts, schedule_mod, plan)
+
+def run_cycle(args: argparse.Namespace, here: Path, backend_dir: Path, scripts: list[Path],
+              script_timeouts: dict[str, float], schedule_mod=None, plan: dict | None = None) -> int:
+    """Один прогон: запуск скриптов, отчёт, наблюдения для расписания, сбор и история."""
+    jobs = max(args.jobs, 1)
+    print(f"Найдены скрипты для запуска (в порядке отчёта, параллельно: {jobs}):")
     for s in scripts:
         print("  •", s.name)
+    print()
 
-    results = []
-    failures = 0
-    for s in scripts:
-        print(f"\n===== ▶️  Запуск: {s.name} =====")
-        res = run_script(s, cwd=backend_dir)
-        results.append(res)
-        if res["returncode"] == 0:
-            print(f"===== ✅ Успех: {s.name} =====")
-        else:
-            print(f"===== ❗️ Ошибка: {s.name} (код {res['returncode']}) =====")
-            failures += 1
+    report_path = here / "generate_report.json"
+
+    expected = previous_durations(report_path)
+    run_started = time.time()
+    run_t0 = time.monotonic()
+    results = run_all(scripts, cwd=backend_dir, jobs=jobs, runner=args.runner,
+                      timeout=args.timeout or None, script_timeouts=script_timeouts,
+                      budget=args.budget, memory_mb=args.memory_limit,
+                      expected=expected)
+    wall_s = time.monotonic() - run_t0
+    startup = startup_summary(results, measure_interpreter_startup() if args.runner == "auto" else 0.0)
+    annotate_overlap(results, run_t0)
+    # по сроку (timed_out, skipped) — не ошибка: прежние ленты остаются, прогон коммитится
+    failures = sum(1 for r in results if r["status"] == "failed")
+    succeeded = sum(1 for r in results if r["status"] == "ok")
+    timed_out = [r["script"] for r in results if r["status"] == "timed_out"]
+    skipped = [r["script"] for r in results if r["status"] == "skipped"]
+    busy_s = sum(r["duration_s"] for r in results)
+    totals: dict = {}
+    for r in results:
+        for k, v in r["metrics"].items():
+            totals[k] = totals.get(k, 0) + v
+        r["telemetry"] = telemetry(r)
 
     report = {
         "backend_dir": str(backend_dir.resolve()),
         "total": len(scripts),
-        "success": len(scripts) - failures,
+        "success": succeeded,
         "failures": failures,
+        "jobs": jobs,
+        "wall_s": round(wall_s, 3),
+        "sum_duration_s": round(busy_s, 3),
+        "speedup": round(busy_s / wall_s, 2) if wall_s > 0 else None,
+        "limits": {
+            "timeout_s": args.timeout or None,
+            "script_timeouts_s": script_timeouts,
+            "budget_s": args.budget,
+            "memory_limit_mb": args.memory_limit,
+        },
+        "timed_out": timed_out,
+        "skipped": skipped,
+        "startup": startup,
+        "metrics": dict(sorted(totals.items())),
+        "http_cache": http_cache_summary(totals),
+        "coalescing": coalescing_summary(totals),
+        "date_fallbacks": date_fallback_summary(totals),
+        "article_parse": article_parse_summary(totals),
+        "telemetry": telemetry_summary(results),
+        "schedule": schedule_summary(plan, args.max_staleness) if plan is not None else None,
+        "durations": merge_durations(expected, results, backend_dir),
         "results": results
     }
 
-    report_path = here / "generate_report.json"
-    report_path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
-    print(f"\n📄 Отчёт сохранён в: {report_path}")
+    if schedule_mod is not None:
+        record_observations(schedule_mod, results, run_started)
 
     moved = []
     if not args.no_collect:
         out_dir = (here / args.out_dir).resolve()
-        moved = move_outputs(backend_dir, out_dir, DEFAULT_PATTERNS, args.collect_mode)
-        print(f"📦 Перемещено файлов: {len(moved)} → {out_dir} (mode={args.collect_mode})")
+        collect: dict = {}
+        moved = move_outputs(backend_dir, out_dir, DEFAULT_PATTERNS, args.collect_mode, stats=collect)
+        report["collect"] = {"mode": args.collect_mode, "updated": len(moved), **collect}
+        print(f"📦 Перемещено файлов: {len(moved)} → {out_dir} (mode={args.collect_mode}; "
+              f"без изменений: {collect['unchanged']}, записано {collect['bytes_written'] // 1024} КБ)")
+        if args.history:
+            report["history"] = record_history(here / args.history, [Path(m) for m in moved],
+                                               args.history_keep_last, args.history_keep_daily)
+            h = report["history"]
+            print(f"🗄  История: новых версий {h['recorded']}, совпали с последней {h['deduplicated']}, "
+                  f"удалено версий {h['versions_removed']} → {h['root']}")
+        if args.precompress:
+            report["precompress"] = feedserver.precompress(out_dir, [Path(m) for m in moved])
+            pc = report["precompress"]
+            print(f"🗜  Сжатые варианты: записано {pc['written']} ({pc['bytes_in'] // 1024} → "
+                  f"{pc['bytes_out'] // 1024} КБ), удалено устаревших {pc['removed']}")
+
+    if args.metrics_textfile:
+        write_metrics_textfile(report, here / args.metrics_textfile, args.metrics_format)
+
+    report_path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"\n📄 Отчёт сохранён в: {report_path}")
 
     print("\n===== Итог =====")
     print(f"Всего скриптов: {len(scripts)}")
-    print(f"Успешно:       {len(scripts) - failures}")
+    print(f"Успешно:       {succeeded}")
     print(f"С ошибками:    {failures}")
+    if timed_out or skipped:
+        print(f"По сроку:      превысили {len(timed_out)} ({', '.join(timed_out) or '—'}), "
+              f"пропущены {len(skipped)} ({', '.join(skipped) or '—'}); их прежние ленты не тронуты")
+    print(f"Время прогона: {wall_s:.1f} с (сумма по скриптам: {busy_s:.1f} с)")
+    if startup["inprocess_scripts"]:
+        print(f"In-process:    {startup['inprocess_scripts']} скриптов, "
+              f"сэкономлено на старте ≈ {startup['estimated_saved_s']:.2f} с")
+    if totals.get("http_cache.hits") or totals.get("http_cache.misses"):
+        hc = report["http_cache"]
+        print(f"HTTP-кэш:      попаданий {hc['hits']}, промахов {hc['misses']}")
+    if totals.get("fetch.coalesced"):
+        co = report["coalescing"]
+        print(f"Общие загрузки: {co['duplicates_avoided']} из {co['fetches']} без сети, "
+              f"разборов сэкономлено: {co['parses_shared']}")
+    if report["date_fallbacks"]["total"]:
+        df = report["date_fallbacks"]
+        print(f"Даты:          {df['total']} записей без даты (взято текущее время): "
+              + ", ".join(f"{k} {v}" for k, v in df["by_source"].items()))
+    if report["article_parse"]["parsed"]:
+        pa = report["article_parse"]
+        print(f"Статьи:        {pa['parsed']}, из JSON-LD без DOM {pa['jsonld_hits']} "
+              f"({pa['hit_rate']:.0%}), {pa['avg_parse_ms']} мс на статью")
+    tm = report["telemetry"]
+    print("Фазы:          " + ", ".join(f"{p} {v:.1f} с" for p, v in tm["phases_s"].items())
+          + (f"; дольше всех {tm['slowest'][0]['script']} ({tm['slowest'][0]['phase']})" if tm["slowest"] else ""))
+    if totals.get("http.requests"):
+        print(f"HTTP:          {int(totals['http.requests'])} запросов, "
+              f"{int(totals.get('http.bytes', 0)) // 1024} КБ, "
+              f"соединений новых/повторных: {int(totals.get('http.connections_new', 0))}"
+              f"/{int(totals.get('http.connections_reused', 0))}")
     return 1 if failures else 0
 
+def interval_for(name: str, args: argparse.Namespace, intervals: dict[str, float], schedule_mod) -> float:
+    """
+    Интервал скрипта в режиме демона (с): задан явно (--script-interval), иначе
+    выученный _schedule в пределах [--interval, --max-staleness], иначе --interval.
+    """
+    if name in intervals:
+        return intervals[name]
+    base = args.interval * 60
+    if schedule_mod is not None:
+        learned = schedule_mod.estimate(name)["interval_s"]
+        if learned:
+            return min(max(learned, base), args.max_staleness * 3600)
+    return base
+
+def _helpers_signature(backend_dir: Path) -> dict[str, int]:
+    return {p.name: p.stat().st_mtime_ns for p in backend_dir.glob("_*.py")}
+
+def _restart() -> None:
+    """
+    Перезапуск процесса с теми же аргументами: новые общие модули бэкендов, чистое состояние.
+    После брошенного потока пул и браузер не закрываются: close() ждёт петлю
+    _http, которую, возможно, и держит этот поток. execv всё равно закроет
+    их соединения и каналы к драйверу браузера, и тот завершится сам.
+    """
+    for name in () if _abandoned else ("_browser", "_http"):
+        mod = sys.modules.get(name)
+        if mod is not None:
+            try:
+                mod.close()
+            except Exception:
+                pass
+    sys.stdout.flush()
+    sys.stderr.flush()
+    os.chdir(_start_cwd)
+    os.execv(sys.executable, [sys.executable, str(Path(__file__).resolve()), *sys.argv[1:]])
+
+def daemon(args: argparse.Namespace, here: Path, backend_dir: Path,
+           script_timeouts: dict[str, float], schedule_mod=None) -> int:
+    """
+    Долгоживущий режим: процесс, пул соединений _http и браузер остаются
+    тёплыми между прогонами, каждый скрипт запускается по своему интервалу
+    (interval_for) с разбросом ±jitter, чтобы скрипты не сбивались в одну волну.
+
+    Изменённый или новый скрипт запускается сразу (модуль и так загружается
+    заново на каждом запуске). Если изменился общий модуль (backend/_*.py),
+    пришёл SIGHUP или поток бэкенда пришлось бросить после срока, процесс
+    перезапускается (execv) между прогонами. SIGTERM/SIGINT — выход после
+    текущего прогона.
+    """
+    intervals = {}
+    for spec in args.script_interval:
+        name, sep, minutes = spec.partition("=")
+        if not sep:
+            raise SystemExit(f"--script-interval: ожидается NAME=MINUTES, получено {spec!r}")
+        intervals[name if name.endswith(".py") else f"{name}.py"] = float(minutes) * 60
+
+    stop, reload = threading.Event(), threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    if hasattr(signal, "SIGHUP"):
+        signal.signal(signal.SIGHUP, lambda *_: reload.set())
+
+    helpers = _helpers_signature(backend_dir)
+    mtimes: dict[str, int] = {}
+    next_run: dict[str, float] = {}
+    print(f"🔁 Демон: интервал {args.interval:g} мин (±{args.jitter:.0%}), "
+          f"не реже раза в {args.max_staleness:g} ч; pid {os.getpid()}")
+    while not stop.is_set():
+        if reload.is_set() or _abandoned or _helpers_signature(backend_dir) != helpers:
+            print("🔄 Общие модули изменились (или SIGHUP) — перезапуск")
+            _restart()
+        now = time.time()
+        scripts = list_scripts(backend_dir)
+        for s in scripts:
+            m = s.stat().st_mtime_ns
+            if mtimes.get(s.name) != m:
+                if s.name in mtimes:
+                    print(f"🔄 {s.name} изменился — запуск вне очереди")
+                mtimes[s.name] = m
+                next_run[s.name] = now
+        due = [s for s in scripts if next_run[s.name] <= now]
+        if due:
+            try:
+                run_cycle(args, here, backend_dir, due, script_timeouts, schedule_mod)
+            except Exception:
+                traceback.print_exc()  # демон переживает сбой одного прогона (сбор, отчёт)
+            done = time.time()
+            for s in due:
+                interval = interval_for(s.name, args, intervals, schedule_mod)
+                next_run[s.name] = done + interval * random.uniform(1 - args.jitter, 1 + args.jitter)
+            upcoming = min((next_run[s.name], s.name) for s in scripts)
+            print(f"⏳ Следующий: {upcoming[1]} через {max(upcoming[0] - done, 0) / 60:.1f} мин\n")
+        wake = min((next_run[s.name] for s in scripts), default=now + DAEMON_POLL_S)
+        stop.wait(min(max(wake - time.time(), 0.1), DAEMON_POLL_S))
+    print("⏹ Демон остановлен")
+    return 0
+
+# Каталог запуска: --daemon возвращается в него перед перезапуском (execv)
+_start_cwd = os.getcwd()
+
 if __name__ == "__main__":
-    raise SystemExit(main())
+    code = main()
+    if _abandoned:
+        # поток бэкенда, пережившего срок, не остановить — выходим, не дожидаясь его
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(code)
+    raise SystemExit(code)
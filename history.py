@@ -0,0 +1,334 @@
+"""
+История выходных файлов: хранилище с адресацией по содержимому.
+
+Вместо полных копий wired_1.xml, wired_2.xml, ... каждая версия — ссылка на
+сжатый (zlib) блоб, названный по sha256 содержимого; одинаковые версии разных
+прогонов хранятся один раз.
+
+    <root>/objects/ab/cdef….z     — блоб (не меняется после записи)
+    <root>/refs/<файл>/HEAD       — номер последней версии
+    <root>/refs/<файл>/<N>.json   — {"sha256": …, "size": …, "stored_at": …}
+    <root>/refs/<файл>/index      — строки "<stored_at> <N>" для поиска по времени
+
+Версия N файла ищется по готовому пути, без перебора и без чтения остальной
+истории — время не зависит от её размера; версия на момент времени (--at) —
+двоичным поиском по index, который читается один раз и перечитывается, только
+когда меняется. Всё текстовое и неизменяемое, кроме HEAD и index, так что
+хранилище нормально живёт в git.
+
+Политика хранения (compact): последние keep_last версий каждого файла плюс
+последняя версия за каждый из keep_daily последних дней; блобы, на которые
+больше никто не ссылается, удаляются. Номера оставшихся версий не меняются.
+
+    python history.py list                      # файлы и число версий
+    python history.py list wired.xml            # версии файла
+    python history.py restore wired.xml 12 -o /tmp/wired.xml
+    python history.py restore wired.xml --at 2025-07-01 -o /tmp/wired.xml
+    python history.py compact --keep-last 20 --keep-daily 30
+    python history.py import outputs --remove   # перенести старые name_N.*
+"""
+from __future__ import annotations
+import argparse
+import bisect
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+import zlib
+from datetime import datetime, timezone
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows: без межпроцессной блокировки
+    fcntl = None
+
+DEFAULT_ROOT = "history"
+_VERSIONED_RE = re.compile(r"^(?P<stem>.+?)(?:_(?P<n>\d+))?(?P<suffix>\.[^.]+)$")
+
+class FileLock:
+    """Межпроцессная блокировка на время изменения каталога (flock на path)."""
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    def __enter__(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._f = open(self.path, "a+b")
+        if fcntl is not None:
+            fcntl.flock(self._f, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if fcntl is not None:
+            fcntl.flock(self._f, fcntl.LOCK_UN)
+        self._f.close()
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+class Store:
+    def __init__(self, root: str | Path = DEFAULT_ROOT):
+        self.root = Path(root)
+        self.objects = self.root / "objects"
+        self.refs = self.root / "refs"
+        # файл → ((mtime_ns, size) index, время версий по возрастанию, наибольший номер до него)
+        self._timelines: dict[str, tuple[tuple[int, int], list[float], list[int]]] = {}
+
+    def lock(self) -> FileLock:
+        return FileLock(self.root / ".lock")
+
+    # --- блобы ---
+    def _blob_path(self, sha: str) -> Path:
+        return self.objects / sha[:2] / f"{sha[2:]}.z"
+
+    def put_blob(self, data: bytes) -> str:
+        sha = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(sha)
+        if not path.exists():
+            _write_atomic(path, zlib.compress(data, 9))
+        return sha
+
+    def read_blob(self, sha: str) -> bytes:
+        return zlib.decompress(self._blob_path(sha).read_bytes())
+
+    # --- версии ---
+    def feeds(self) -> list[str]:
+        return sorted(p.name for p in self.refs.iterdir()) if self.refs.is_dir() else []
+
+    def latest(self, feed: str) -> int | None:
+        try:
+            return int((self.refs / feed / "HEAD").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def version(self, feed: str, n: int) -> dict | None:
+        try:
+            return json.loads((self.refs / feed / f"{n}.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def versions(self, feed: str) -> list[tuple[int, dict]]:
+        d = self.refs / feed
+        if not d.is_dir():
+            return []
+        out = []
+        for p in d.glob("*.json"):
+            if p.stem.isdigit():
+                out.append((int(p.stem), json.loads(p.read_text(encoding="utf-8"))))
+        return sorted(out, key=lambda x: x[0])
+
+    def record(self, path: Path, feed: str | None = None, stored_at: float | None = None) -> int | None:
+        """Добавляет содержимое path новой версией; None — совпадает с последней."""
+        feed = feed or path.name
+        data = path.read_bytes()
+        with self.lock():
+            last = self.latest(feed)
+            sha = self.put_blob(data)
+            if last is not None and (self.version(feed, last) or {}).get("sha256") == sha:
+                return None
+            n = 0 if last is None else last + 1
+            meta = {"sha256": sha, "size": len(data), "stored_at": stored_at or time.time()}
+            _write_atomic(self.refs / feed / f"{n}.json", json.dumps(meta).encode("utf-8"))
+            index = self._index_path(feed)
+            if n == 0 or index.exists():  # хранилищу без index его целиком соберёт _timeline
+                with open(index, "a", encoding="utf-8") as f:
+                    f.write(f"{meta['stored_at']!r} {n}\n")
+            _write_atomic(self.refs / feed / "HEAD", str(n).encode("utf-8"))
+        return n
+
+    def _index_path(self, feed: str) -> Path:
+        return self.refs / feed / "index"
+
+    def _write_index(self, feed: str, versions: list[tuple[int, dict]]) -> None:
+        _write_atomic(self._index_path(feed),
+                      "".join(f"{meta['stored_at']!r} {n}\n" for n, meta in versions).encode("utf-8"))
+
+    def _read_index(self, feed: str) -> tuple[tuple[int, int], list[tuple[float, int]]] | None:
+        """Строки index и его (mtime_ns, size); None — index нет, он оборван или отстал от HEAD."""
+        path = self._index_path(feed)
+        try:
+            st = path.stat()
+            rows = [(float(ts), int(n)) for ts, n in
+                    (line.split() for line in path.read_text(encoding="utf-8").splitlines())]
+        except (OSError, ValueError):
+            return None
+        if not rows or max(n for _, n in rows) != self.latest(feed):
+            return None
+        return (st.st_mtime_ns, st.st_size), rows
+
+    def _timeline(self, feed: str) -> tuple[list[float], list[int]]:
+        path = self._index_path(feed)
+        cached = self._timelines.get(feed)
+        if cached is not None:
+            try:
+                st = path.stat()
+            except OSError:
+                st = None
+            if st is not None and cached[0] == (st.st_mtime_ns, st.st_size):
+                return cached[1], cached[2]
+        loaded = self._read_index(feed)
+        if loaded is None:
+            with self.lock():
+                versions = self.versions(feed)
+                if not versions:
+                    return [], []
+                self._write_index(feed, versions)
+            loaded = self._read_index(feed)
+            if loaded is None:
+                return [], []
+        key, rows = loaded
+        # номера и время могут расходиться (import по mtime): на каждой позиции —
+        # наибольший номер среди версий, сохранённых не позже
+        rows.sort()
+        times, best, top = [], [], -1
+        for ts, n in rows:
+            top = max(top, n)
+            times.append(ts)
+            best.append(top)
+        self._timelines[feed] = (key, times, best)
+        return times, best
+
+    def at(self, feed: str, when: datetime) -> int | None:
+        """Последняя версия, сохранённая не позже when (двоичный поиск по index)."""
+        times, best = self._timeline(feed)
+        i = bisect.bisect_right(times, when.timestamp())
+        return best[i - 1] if i else None
+
+    def restore(self, feed: str, n: int | None, dest: Path) -> Path:
+        n = self.latest(feed) if n is None else n
+        meta = self.version(feed, n) if n is not None else None
+        if meta is None:
+            raise KeyError(f"{feed}: версии {n} нет")
+        _write_atomic(dest, self.read_blob(meta["sha256"]))
+        return dest
+
+    # --- обслуживание ---
+    def compact(self, keep_last: int = 0, keep_daily: int = 0, now: float | None = None) -> dict:
+        """
+        Удаляет версии вне политики (keep_last последних + по одной за каждый из
+        keep_daily последних дней; 0 — без ограничения по этому правилу, оба 0 —
+        ничего не удалять) и неиспользуемые блобы.
+        """
+        stats = {"versions_removed": 0, "blobs_removed": 0}
+        if not keep_last and not keep_daily:
+            return stats
+        now = now or time.time()
+        with self.lock():
+            for feed in self.feeds():
+                versions = self.versions(feed)
+                keep = {n for n, _ in versions[-keep_last:]} if keep_last else set()
+                if keep_daily:
+                    by_day: dict[str, int] = {}
+                    for n, meta in versions:
+                        if now - meta["stored_at"] <= keep_daily * 86400:
+                            day = datetime.fromtimestamp(meta["stored_at"], timezone.utc).date().isoformat()
+                            by_day[day] = n  # версии отсортированы — остаётся последняя за день
+                    keep.update(by_day.values())
+                if versions:
+                    keep.add(versions[-1][0])  # HEAD не удаляем никогда
+                for n, _ in versions:
+                    if n not in keep:
+                        (self.refs / feed / f"{n}.json").unlink()
+                        stats["versions_removed"] += 1
+                if versions:
+                    self._write_index(feed, [(n, meta) for n, meta in versions if n in keep])
+            stats["blobs_removed"] = self._gc()
+        return stats
+
+    def _gc(self) -> int:
+        used = {meta["sha256"] for feed in self.feeds() for _, meta in self.versions(feed)}
+        removed = 0
+        if not self.objects.is_dir():
+            return 0
+        for p in self.objects.glob("*/*.z"):
+            if p.parent.name + p.name[:-2] not in used:
+                p.unlink()
+                removed += 1
+        return removed
+
+    def import_dir(self, directory: Path, remove: bool = False) -> dict:
+        """
+        Переносит старые копии name.ext, name_1.ext, name_2.ext, ... (как их
+        раскладывал --collect-mode versioned) в хранилище, по порядку номеров.
+        """
+        groups: dict[str, list[tuple[int, Path]]] = {}
+        for p in directory.iterdir():
+            m = _VERSIONED_RE.match(p.name)
+            if not p.is_file() or p.name.startswith(".") or not m:
+                continue
+            groups.setdefault(m["stem"] + m["suffix"], []).append((int(m["n"] or 0), p))
+        stats = {"files": 0, "versions": 0}
+        for feed, items in sorted(groups.items()):
+            # 'reuters_investigations.csv' не должен стать версией 'reuters.csv'
+            if len(items) == 1 and items[0][0] and not (directory / feed).exists():
+                continue
+            for _, p in sorted(items, key=lambda x: x[0]):
+                stats["files"] += 1
+                if self.record(p, feed=feed, stored_at=p.stat().st_mtime) is not None:
+                    stats["versions"] += 1
+                if remove:
+                    p.unlink()
+        return stats
+
+def _fmt_ts(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%d %H:%M:%SZ")
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Content-addressed history of generated feeds.")
+    ap.add_argument("--root", default=DEFAULT_ROOT, help=f"History store directory (default: {DEFAULT_ROOT})")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p_list = sub.add_parser("list", help="List feeds, or versions of one feed")
+    p_list.add_argument("feed", nargs="?")
+    p_restore = sub.add_parser("restore", help="Write a stored version to a file")
+    p_restore.add_argument("feed")
+    p_restore.add_argument("version", nargs="?", type=int, help="Version number (default: latest)")
+    p_restore.add_argument("--at", help="Latest version stored at or before this UTC date/time (ISO)")
+    p_restore.add_argument("-o", "--output", help="Destination (default: ./<feed>)")
+    p_compact = sub.add_parser("compact", help="Apply retention policy and drop unused blobs")
+    p_compact.add_argument("--keep-last", type=int, default=0)
+    p_compact.add_argument("--keep-daily", type=int, default=0)
+    p_import = sub.add_parser("import", help="Import name_N.* copies from a directory (e.g. outputs/)")
+    p_import.add_argument("directory")
+    p_import.add_argument("--remove", action="store_true", help="Delete imported files")
+    args = ap.parse_args(argv)
+
+    store = Store(args.root)
+    if args.cmd == "list":
+        if args.feed is None:
+            for feed in store.feeds():
+                versions = store.versions(feed)
+                size = sum(m["size"] for _, m in versions)
+                print(f"{feed:<32} {len(versions):>5} версий, HEAD={store.latest(feed)}, {size // 1024} КБ без сжатия")
+        else:
+            for n, meta in store.versions(args.feed):
+                print(f"{n:>5}  {_fmt_ts(meta['stored_at'])}  {meta['size']:>9}  {meta['sha256'][:12]}")
+    elif args.cmd == "restore":
+        n = args.version
+        if args.at:
+            when = datetime.fromisoformat(args.at)
+            n = store.at(args.feed, when if when.tzinfo else when.replace(tzinfo=timezone.utc))
+            if n is None:
+                print(f"{args.feed}: нет версий до {args.at}", file=sys.stderr)
+                return 1
+        try:
+            dest = store.restore(args.feed, n, Path(args.output or args.feed))
+        except KeyError as e:
+            print(e.args[0], file=sys.stderr)
+            return 1
+        print(f"{args.feed} v{n if n is not None else store.latest(args.feed)} → {dest}")
+    elif args.cmd == "compact":
+        stats = store.compact(args.keep_last, args.keep_daily)
+        print(f"Удалено версий: {stats['versions_removed']}, блобов: {stats['blobs_removed']}")
+    elif args.cmd == "import":
+        stats = store.import_dir(Path(args.directory), remove=args.remove)
+        print(f"Файлов: {stats['files']}, новых версий: {stats['versions']}")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())